@@ -3,19 +3,30 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from scipy.stats import chi2_contingency, pearsonr, spearmanr, f_oneway
-import io
+import plotly.io as pio
+import os
+import re
+import json
 import base64
+import pickle
+import uuid
 import warnings
-warnings.filterwarnings('ignore')
-
-# Set page config
-st.set_page_config(
-    page_title="Analisis Data Survei",
-    page_icon="📊",
-    layout="wide",
-    initial_sidebar_state="expanded"
+from survey_core import (
+    OPTIMIZE_DTYPES, DATASET_DIR, DESCRIBE_QUANTILES, ANALYSIS_TYPE_NAMES, ORDINAL_MAX_UNIQUE, NOMINAL_MAX_UNIQUE,
+    SAMPLE_METHODS, SAMPLE_DEFAULT_ROWS, SUPPORTED_EXTENSIONS, read_table, excel_engine, list_sheets,
+    CSV_ENCODINGS, read_head, sniff_csv, head_sample, sample_dtypes, read_sample, load_column_sets, save_column_set,
+    determine_variable_type, hash_bytes, get_column_types, optimize_dtypes, LRUCache,
+    stream_csv_statistics, ColumnarDataset, select_columns, write_columnar, read_dtype_report,
+    determine_analysis_type, get_correlation_strength, automatic_association_analysis, load_profile,
+    all_pairs_association, parallel_pair_tests, association_strength_matrix, histogram_figure, box_figure,
+    sample_indices, sample_rows, MULTIPLE_TESTING_METHODS, pair_grid, pair_variables, correct_results,
+    hypothesis_report, list_wave_datasets, load_wave_state, append_wave, open_waves, wave_dataset_hash,
+    wave_state_path, stored_wave, prepare_wave,
+    incremental_pair_tests, RESAMPLE_DEFAULT, RESAMPLING_TYPES, resampling_inference, CONTINGENCY_DISPLAY_LEVELS,
+    OTHER_LEVEL, CORRELATION_METHODS, correlation_matrix, correlation_view, top_correlations, JobQueue,
+    DatasetRegistry, Trace, NULL_TRACE, chrome_trace
 )
+warnings.filterwarnings('ignore')
 
 # Multi-language translations
 TRANSLATIONS = {
@@ -60,6 +71,7 @@ TRANSLATIONS = {
         "select_variable_2": "Pilih variabel 2:",
         "analyze_chi_square": "Analisis Chi-Square",
         "contingency_table": "Tabel Kontingensi",
+        "contingency_collapsed": "level paling sering per variabel ditampilkan; level lain digabung ke",
         "chi_square_results": "Hasil Chi-Square",
         "significant": "Signifikan",
         "not_significant": "Tidak Signifikan",
@@ -135,7 +147,149 @@ TRANSLATIONS = {
         "group": "Grup",
         "role": "Peran",
         "project_overview": "🎯 Ikhtisar Proyek",
-        "contributions": "💪 Kontribusi"
+        "contributions": "💪 Kontribusi",
+        "cache_stats": "🗄️ Cache Dataset",
+        "cache_hits": "Hit",
+        "cache_misses": "Miss",
+        "cache_entries": "Dataset tersimpan",
+        "cache_memory": "Memori",
+        "registry_title": "Registry Dataset",
+        "registry_sessions": "Sesi aktif",
+        "registry_spills": "Spill ke disk",
+        "registry_evictions": "Dikeluarkan",
+        "registry_spill_idle": "💾 Spill dataset yang tidak dipakai",
+        "registry_empty": "Belum ada dataset di registry",
+        "cache_datasets": "Dataset",
+        "cache_results": "Hasil analisis",
+        "streaming_mode": "Mode streaming CSV (file besar)",
+        "streaming_help": "Baca CSV per potongan dan hitung statistik tanpa menyimpan seluruh baris di memori",
+        "rows_processed": "Baris diproses",
+        "streaming_chart_note": "Grafik dibuat dari sketsa kuantil (perkiraan).",
+        "streaming_association_note": "Analisis asosiasi membutuhkan data lengkap. Nonaktifkan mode streaming untuk menggunakannya.",
+        "approximate_mode": "Mode perkiraan (sketsa)",
+        "approximate_help": "Gunakan sketsa berukuran tetap untuk kardinalitas dan kategori teratas; memori tetap kecil pada puluhan juta baris",
+        "error_bounds": "Batas galat perkiraan",
+        "error_bounds_note": "Kuantil: galat peringkat pada keyakinan 99%. Kardinalitas: galat baku relatif. Frekuensi: nilai di luar tabel muncul paling banyak sebanyak galat frekuensi maks.",
+        "max_error": "Galat Maks",
+        "sample_preview": "Pratinjau dengan sampel",
+        "sample_preview_help": "Eksplorasi interaktif pada sampel; hasil akhir dapat dihitung ulang secara tepat pada data lengkap",
+        "sample_method": "Metode sampel",
+        "sample_reservoir": "Acak (reservoir)",
+        "sample_stratified": "Berstrata",
+        "sample_weighted": "Berbobot",
+        "sample_strata": "Kolom strata",
+        "sample_weight": "Kolom bobot",
+        "sample_no_column": "Tidak ada kolom yang sesuai untuk metode sampel ini.",
+        "sample_banner": "Pratinjau sampel",
+        "sample_banner_note": "Statistik, grafik, dan p-value analisis asosiasi dihitung pada sampel; statistik deskriptif tetap dari data lengkap.",
+        "recompute_exact": "🎯 Hitung Ulang Tepat (Data Lengkap)",
+        "recompute_running": "Menghitung pada data lengkap...",
+        "exact_result": "Hasil tepat dari data lengkap",
+        "background_jobs": "Jalankan analisis di latar belakang",
+        "background_help": "Analisis panjang berjalan di antrean pekerjaan sehingga aplikasi tetap responsif; hasilnya muncul di riwayat pekerjaan",
+        "csv_options": "⚙️ Opsi CSV",
+        "csv_delimiter": "Pemisah kolom",
+        "csv_encoding": "Encoding",
+        "csv_decimal": "Pemisah desimal",
+        "csv_pin_types": "Kunci tipe kolom dari blok pertama",
+        "csv_pin_help": "Tipe dari blok pertama dipakai untuk seluruh file sehingga tidak perlu ditebak ulang",
+        "csv_as_category": "Baca sebagai kategori",
+        "csv_detected_types": "Tipe kolom (blok pertama)",
+        "sheet_select": "Sheet yang dianalisis",
+        "sheet_help": "Hanya sheet terpilih yang dibaca; beberapa sheet digabung dan dibaca paralel",
+        "sheet_source_column": "Tambahkan kolom sumber sheet",
+        "sheet_none": "Pilih minimal satu sheet; sheet pertama dipakai",
+        "sheet_count": "sheet dalam workbook",
+        "projection": "🧩 Kolom yang Dimuat",
+        "projection_enable": "Muat kolom terpilih saja",
+        "projection_help": "Header dan sampel dibaca lebih dulu; hanya kolom terpilih yang dimuat, dan variabel yang dipilih di analisis asosiasi ditambahkan otomatis",
+        "projection_columns": "Kolom",
+        "projection_set": "Set kolom tersimpan",
+        "projection_set_name": "Nama set kolom",
+        "projection_save": "Simpan set kolom",
+        "projection_saved": "Set kolom disimpan",
+        "projection_none": "Pilih minimal satu kolom; semua kolom dimuat",
+        "projection_loaded": "kolom dimuat dari",
+        "projection_variable_type": "Tipe variabel (sampel)",
+        "instrumentation": "Instrumentasi kinerja",
+        "instrumentation_help": "Catat waktu wall/CPU, kenaikan puncak RSS dan ukuran payload tiap tahap pada setiap rerun",
+        "instrumentation_panel": "⏱️ Instrumentasi",
+        "trace_export": "📥 Ekspor trace",
+        "job_history": "Riwayat Pekerjaan",
+        "job_none": "Belum ada pekerjaan",
+        "job_queued": "Menunggu",
+        "job_running": "Berjalan",
+        "job_done": "Selesai",
+        "job_failed": "Gagal",
+        "job_cancelled": "Dibatalkan",
+        "job_cancel": "⏹️ Batalkan",
+        "job_show": "Tampilkan",
+        "job_pair": "Asosiasi",
+        "job_all_pairs": "Semua pasangan",
+        "columnar_store": "Simpan sebagai Parquet (kolumnar)",
+        "columnar_store_help": "Konversi file sekali ke Parquet dan baca hanya kolom yang dibutuhkan analisis",
+        "hidden_levels": "{levels:,} level lain ({rows:,} baris) tidak ditampilkan",
+        "wave_mode": "Mode gelombang (tambahkan ke dataset)",
+        "wave_mode_help": "Setiap file baru divalidasi terhadap skema dataset dan baru ditambahkan setelah dikonfirmasi; statistik diperbarui secara inkremental",
+        "wave_dataset": "Dataset gelombang",
+        "wave_new": "➕ Dataset baru",
+        "wave_name": "Nama dataset baru",
+        "wave_rejected": "Gelombang ditolak (skema tidak cocok)",
+        "wave_hash": "Hash gelombang",
+        "wave_append": "➕ Tambahkan gelombang",
+        "wave_schema_new": "Gelombang pertama menetapkan skema ({rows:,} baris, {columns} kolom)",
+        "wave_schema_ok": "Skema cocok ({rows:,} baris)",
+        "wave_widened": "Tipe kolom diperlebar: {columns}",
+        "wave_stored": "Upload ini sudah tersimpan sebagai gelombang {wave}",
+        "wave_appended": "Gelombang {wave} ditambahkan",
+        "wave_pending": "Periksa skema di sidebar lalu tekan \"Tambahkan gelombang\" untuk menyimpan gelombang pertama.",
+        "wave_history": "📅 Riwayat Gelombang",
+        "wave_note": "Statistik diperbarui per gelombang tanpa menghitung ulang seluruh riwayat; kuartil diperkirakan dari sketsa kuantil.",
+        "wave_incremental_note": "Korelasi Pearson, Chi-Square dan ANOVA dihitung dari statistik kumulatif gelombang; Spearman dihitung dari data.",
+        "memory_report": "💾 Optimasi Memori",
+        "memory_total": "Total memori",
+        "all_pairs_title": "🧮 Analisis Semua Pasangan",
+        "all_pairs_columns": "Pilih variabel yang dianalisis:",
+        "all_pairs_button": "Analisis Semua Pasangan",
+        "all_pairs_running": "Menganalisis semua pasangan variabel...",
+        "all_pairs_count": "Jumlah pasangan",
+        "all_pairs_heatmap": "Peta Kekuatan Asosiasi (|r|, |ρ|, Cramér's V, η)",
+        "corr_min_abs": "|r| minimum",
+        "corr_top_k": "Pasangan teratas",
+        "corr_top_k_help": "Hanya variabel dari k pasangan dengan |r| terbesar yang ditampilkan (0 = semua)",
+        "corr_cluster": "Kelompokkan variabel serupa",
+        "corr_shown": "variabel ditampilkan dari",
+        "corr_view_empty": "Tidak ada pasangan yang memenuhi filter",
+        "corr_top_pairs": "Pasangan dengan korelasi terkuat",
+        "all_pairs_download": "Download Hasil Semua Pasangan (CSV)",
+        "all_pairs_method": "Metode",
+        "all_pairs_batched": "Batch tervektorisasi (cepat)",
+        "all_pairs_parallel": "Uji eksak per pasangan (paralel)",
+        "all_pairs_workers": "Jumlah proses",
+        "all_pairs_mode": "Pasangan yang diuji",
+        "all_pairs_mode_all": "Semua pasangan variabel terpilih",
+        "all_pairs_mode_grid": "Grid: variabel terpilih × variabel lain",
+        "all_pairs_against": "Diuji terhadap:",
+        "all_pairs_alpha": "Tingkat signifikansi (α)",
+        "correction_method": "Koreksi uji berganda",
+        "correction_none": "Tanpa koreksi",
+        "correction_bonferroni": "Bonferroni",
+        "correction_holm": "Holm",
+        "correction_fdr_bh": "Benjamini-Hochberg (FDR)",
+        "all_pairs_report": "Download Laporan Uji (JSON)",
+        "resampling": "🎲 Inferensi Resampling",
+        "resampling_enable": "Hitung p-value permutasi dan interval bootstrap",
+        "resampling_help": "Tidak bergantung pada pendekatan asimtotik; cocok untuk subkelompok kecil",
+        "resampling_count": "Jumlah resample",
+        "resampling_seed": "Seed",
+        "resampling_early_stop": "Berhenti lebih awal saat p-value sudah stabil",
+        "resampling_running": "Menjalankan permutasi dan bootstrap...",
+        "resampling_untestable": "Pasangan ini tidak dapat diuji dengan resampling",
+        "permutation_p": "P-value permutasi",
+        "resampling_permutations": "permutasi",
+        "resampling_stopped": "berhenti lebih awal",
+        "bootstrap_ci": "Interval kepercayaan bootstrap",
+        "all_pairs_cancel_note": "Tekan Stop di pojok kanan atas untuk membatalkan."
     },
     "en": {
         "title": "Survey Data Analysis",
@@ -178,6 +332,7 @@ TRANSLATIONS = {
         "select_variable_2": "Select variable 2:",
         "analyze_chi_square": "Analyze Chi-Square",
         "contingency_table": "Contingency Table",
+        "contingency_collapsed": "most frequent levels per variable are shown; the other levels are summed into",
         "chi_square_results": "Chi-Square Results",
         "significant": "Significant",
         "not_significant": "Not Significant",
@@ -253,20 +408,158 @@ TRANSLATIONS = {
         "group": "Group",
         "role": "Role",
         "project_overview": "🎯 Project Overview",
-        "contributions": "💪 Contributions"
+        "contributions": "💪 Contributions",
+        "cache_stats": "🗄️ Dataset Cache",
+        "cache_hits": "Hits",
+        "cache_misses": "Misses",
+        "cache_entries": "Cached datasets",
+        "cache_memory": "Memory",
+        "registry_title": "Dataset Registry",
+        "registry_sessions": "Active sessions",
+        "registry_spills": "Spilled to disk",
+        "registry_evictions": "Evicted",
+        "registry_spill_idle": "💾 Spill idle datasets",
+        "registry_empty": "No datasets in the registry yet",
+        "cache_datasets": "Datasets",
+        "cache_results": "Analysis results",
+        "streaming_mode": "Streaming CSV mode (large files)",
+        "streaming_help": "Read the CSV in chunks and compute statistics without keeping every row in memory",
+        "rows_processed": "Rows processed",
+        "streaming_chart_note": "Charts are drawn from a quantile sketch (approximate).",
+        "streaming_association_note": "Association analysis needs the full data. Turn off streaming mode to use it.",
+        "approximate_mode": "Approximate mode (sketches)",
+        "approximate_help": "Use fixed-size sketches for cardinality and top categories; memory stays small on tens of millions of rows",
+        "error_bounds": "Approximation error bounds",
+        "error_bounds_note": "Quantiles: rank error at 99% confidence. Cardinality: relative standard error. Frequencies: values outside the table occur at most the max frequency error times.",
+        "max_error": "Max Error",
+        "sample_preview": "Preview on a sample",
+        "sample_preview_help": "Explore interactively on a sample; final results can be recomputed exactly on the full data",
+        "sample_method": "Sampling method",
+        "sample_reservoir": "Random (reservoir)",
+        "sample_stratified": "Stratified",
+        "sample_weighted": "Weighted",
+        "sample_strata": "Strata column",
+        "sample_weight": "Weight column",
+        "sample_no_column": "No suitable column for this sampling method.",
+        "sample_banner": "Sample preview",
+        "sample_banner_note": "Charts and association statistics and p-values are computed on the sample; descriptive statistics still come from the full data.",
+        "recompute_exact": "🎯 Recompute Exactly (Full Data)",
+        "recompute_running": "Computing on the full data...",
+        "exact_result": "Exact result from the full data",
+        "background_jobs": "Run analyses in the background",
+        "background_help": "Long analyses run on a job queue so the app stays responsive; results appear in the job history",
+        "csv_options": "⚙️ CSV Options",
+        "csv_delimiter": "Delimiter",
+        "csv_encoding": "Encoding",
+        "csv_decimal": "Decimal separator",
+        "csv_pin_types": "Pin column types from the first block",
+        "csv_pin_help": "Types seen in the first block are used for the whole file instead of being inferred again",
+        "csv_as_category": "Read as categorical",
+        "csv_detected_types": "Column types (first block)",
+        "sheet_select": "Sheets to analyze",
+        "sheet_help": "Only the selected sheets are read; several sheets are stacked and parsed in parallel",
+        "sheet_source_column": "Add a source-sheet column",
+        "sheet_none": "Select at least one sheet; the first sheet is used",
+        "sheet_count": "sheets in the workbook",
+        "projection": "🧩 Loaded Columns",
+        "projection_enable": "Load selected columns only",
+        "projection_help": "The header and a sample are read first; only the selected columns are loaded, and variables picked in the association analysis are added automatically",
+        "projection_columns": "Columns",
+        "projection_set": "Saved column set",
+        "projection_set_name": "Column set name",
+        "projection_save": "Save column set",
+        "projection_saved": "Column set saved",
+        "projection_none": "Select at least one column; all columns are loaded",
+        "projection_loaded": "columns loaded of",
+        "projection_variable_type": "Variable type (sample)",
+        "instrumentation": "Performance instrumentation",
+        "instrumentation_help": "Record wall/CPU time, peak RSS growth and payload size of each stage on every rerun",
+        "instrumentation_panel": "⏱️ Instrumentation",
+        "trace_export": "📥 Export trace",
+        "job_history": "Job History",
+        "job_none": "No jobs yet",
+        "job_queued": "Queued",
+        "job_running": "Running",
+        "job_done": "Done",
+        "job_failed": "Failed",
+        "job_cancelled": "Cancelled",
+        "job_cancel": "⏹️ Cancel",
+        "job_show": "Show",
+        "job_pair": "Association",
+        "job_all_pairs": "All pairs",
+        "columnar_store": "Store as Parquet (columnar)",
+        "columnar_store_help": "Convert the file to Parquet once and read only the columns each analysis needs",
+        "hidden_levels": "{levels:,} more levels ({rows:,} rows) not shown",
+        "wave_mode": "Wave mode (append to a dataset)",
+        "wave_mode_help": "Each new file is validated against the dataset schema and appended only once confirmed; statistics are updated incrementally",
+        "wave_dataset": "Wave dataset",
+        "wave_new": "➕ New dataset",
+        "wave_name": "New dataset name",
+        "wave_rejected": "Wave rejected (schema mismatch)",
+        "wave_hash": "Wave hash",
+        "wave_append": "➕ Append wave",
+        "wave_schema_new": "The first wave sets the schema ({rows:,} rows, {columns} columns)",
+        "wave_schema_ok": "Schema matches ({rows:,} rows)",
+        "wave_widened": "Column types widened: {columns}",
+        "wave_stored": "This upload is already stored as wave {wave}",
+        "wave_appended": "Wave {wave} appended",
+        "wave_pending": "Check the schema in the sidebar, then press \"Append wave\" to store the first wave.",
+        "wave_history": "📅 Wave History",
+        "wave_note": "Statistics are updated per wave without recomputing the full history; quartiles are estimated from quantile sketches.",
+        "wave_incremental_note": "Pearson, Chi-Square and ANOVA tests come from the cumulative wave statistics; Spearman is computed from the data.",
+        "memory_report": "💾 Memory Optimization",
+        "memory_total": "Total memory",
+        "all_pairs_title": "🧮 All-Pairs Analysis",
+        "all_pairs_columns": "Select variables to analyze:",
+        "all_pairs_button": "Analyze All Pairs",
+        "all_pairs_running": "Analyzing all variable pairs...",
+        "all_pairs_count": "Number of pairs",
+        "all_pairs_heatmap": "Association Strength Map (|r|, |ρ|, Cramér's V, η)",
+        "corr_min_abs": "Minimum |r|",
+        "corr_top_k": "Top pairs",
+        "corr_top_k_help": "Only variables from the k pairs with the largest |r| are shown (0 = all)",
+        "corr_cluster": "Cluster similar variables",
+        "corr_shown": "variables shown of",
+        "corr_view_empty": "No pairs pass the filter",
+        "corr_top_pairs": "Most strongly correlated pairs",
+        "all_pairs_download": "Download All-Pairs Results (CSV)",
+        "all_pairs_method": "Method",
+        "all_pairs_batched": "Vectorized batch (fast)",
+        "all_pairs_parallel": "Exact per-pair tests (parallel)",
+        "all_pairs_workers": "Worker processes",
+        "all_pairs_mode": "Pairs to test",
+        "all_pairs_mode_all": "All pairs of the selected variables",
+        "all_pairs_mode_grid": "Grid: selected variables × other variables",
+        "all_pairs_against": "Tested against:",
+        "all_pairs_alpha": "Significance level (α)",
+        "correction_method": "Multiple-testing correction",
+        "correction_none": "No correction",
+        "correction_bonferroni": "Bonferroni",
+        "correction_holm": "Holm",
+        "correction_fdr_bh": "Benjamini-Hochberg (FDR)",
+        "all_pairs_report": "Download Test Report (JSON)",
+        "resampling": "🎲 Resampling Inference",
+        "resampling_enable": "Compute permutation p-values and bootstrap intervals",
+        "resampling_help": "Does not rely on asymptotic approximations; suited to small subgroups",
+        "resampling_count": "Resamples",
+        "resampling_seed": "Seed",
+        "resampling_early_stop": "Stop early once the p-value is stable",
+        "resampling_running": "Running permutations and bootstrap...",
+        "resampling_untestable": "This pair cannot be tested by resampling",
+        "permutation_p": "Permutation p-value",
+        "resampling_permutations": "permutations",
+        "resampling_stopped": "stopped early",
+        "bootstrap_ci": "Bootstrap confidence interval",
+        "all_pairs_cancel_note": "Press Stop in the top-right corner to cancel."
     }
 }
 
-# Initialize session state for language
-if 'language' not in st.session_state:
-    st.session_state.language = 'id'
-
 def get_translation(key):
     """Get translation for current language"""
     return TRANSLATIONS[st.session_state.language].get(key, key)
 
 # Custom CSS
-st.markdown("""
+PAGE_CSS = """
 <style>
     /* Main container with glassmorphism effect */
     .main .block-container {
@@ -430,316 +723,812 @@ st.markdown("""
         visibility: hidden;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+def setup_page():
+    """Page config, language state and CSS; called from main() so importing this module has no side effects"""
+    st.set_page_config(
+        page_title="Analisis Data Survei",
+        page_icon="📊",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    
+    # Initialize session state for language
+    if 'language' not in st.session_state:
+        st.session_state.language = 'id'
+    
+    st.markdown(PAGE_CSS, unsafe_allow_html=True)
 
 # Helper functions
-def load_data(file):
-    """Load data from uploaded file"""
+def load_data(file, selection=None):
+    """Load data from uploaded file (with its sheet selection or CSV options)"""
     try:
-        if file.name.endswith('.xlsx'):
-            df = pd.read_excel(file)
-        elif file.name.endswith('.csv'):
-            df = pd.read_csv(file)
-        else:
+        if not file.name.endswith(SUPPORTED_EXTENSIONS):
             st.error(get_translation("error_no_file"))
             return None
-        return df
+        with current_trace().span("load_data"):
+            return read_table(file, file.name, **(selection or {}))
     except Exception as e:
         st.error(f"Error loading file: {str(e)}")
         return None
 
-def get_column_types(df):
-    """Identify numerical and categorical columns"""
-    numerical_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-    categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
-    return numerical_cols, categorical_cols
-
-def determine_variable_type(series):
-    """Determine variable type for automatic analysis"""
-    if pd.api.types.is_numeric_dtype(series):
-        if series.nunique() <= 10:
-            return "ordinal"
-        else:
-            return "continuous"
-    else:
-        if series.nunique() <= 5:
-            return "nominal"
-        else:
-            return "ordinal"
-
-def determine_analysis_type(var1_type, var2_type):
-    """Determine appropriate analysis type based on variable types"""
-    if var1_type == "nominal" and var2_type == "nominal":
-        return "chi_square"
-    elif var1_type == "nominal" and var2_type in ["ordinal", "continuous"]:
-        return "anova"
-    elif var1_type in ["ordinal", "continuous"] and var2_type == "nominal":
-        return "anova"
-    elif var1_type == "ordinal" and var2_type == "ordinal":
-        return "spearman"
-    elif var1_type in ["ordinal", "continuous"] and var2_type in ["ordinal", "continuous"]:
-        return "pearson"
-    else:
-        return "chi_square"
-
-def get_correlation_strength(correlation):
-    """Get correlation strength description"""
-    abs_corr = abs(correlation)
-    if abs_corr >= 0.8:
-        return "sangat kuat"
-    elif abs_corr >= 0.6:
-        return "kuat"
-    elif abs_corr >= 0.4:
-        return "sedang"
-    elif abs_corr >= 0.2:
-        return "lemah"
-    else:
-        return "sangat lemah"
+# Dataset cache
+DATASET_CACHE_MAX_BYTES = int(os.environ.get("SURVEY_CACHE_MAX_MB", "2048")) * 1024 * 1024
+ADMIN_VIEW = os.environ.get("SURVEY_ADMIN_VIEW", "0") == "1"
+
+@st.cache_resource
+def get_dataset_cache():
+    """Process-wide dataset registry shared by all sessions and reruns"""
+    return DatasetRegistry(DATASET_CACHE_MAX_BYTES)
+
+def session_holder():
+    """Stable id of this browser session for registry reference counts"""
+    if '_holder' not in st.session_state:
+        st.session_state['_holder'] = uuid.uuid4().hex
+    return st.session_state['_holder']
+
+def hold_dataset(key):
+    """Count this session as a user of a registry entry during the current run"""
+    st.session_state.setdefault('_held_datasets', set()).add(key)
+    get_dataset_cache().acquire(key, session_holder())
+
+def release_unused_datasets():
+    """Release the registry entries this run did not use (called at the end of every run)"""
+    get_dataset_cache().retain(session_holder(), st.session_state.pop('_held_datasets', set()))
+
+def get_file_hash(uploaded_file):
+    """Content hash of uploaded file, memoized per upload within the session"""
+    file_id = getattr(uploaded_file, 'file_id', None) or (uploaded_file.name, uploaded_file.size)
+    memo = st.session_state.get('_file_hash')
+    if memo is not None and memo[0] == file_id:
+        return memo[1]
+    file_hash = hash_bytes(uploaded_file.getvalue())
+    st.session_state['_file_hash'] = (file_id, file_hash)
+    return file_hash
+
+def get_dataset_hash(uploaded_file, selection=None):
+    """Content hash of the upload, extended by its sheet selection when that is not the default"""
+    file_hash = get_file_hash(uploaded_file)
+    if selection is None:
+        return file_hash
+    return hash_bytes(f"{file_hash}:{json.dumps(selection, sort_keys=True)}".encode())
+
+def dataset_name(uploaded_file, selection=None):
+    """Display name of a dataset: the file name plus its selected sheets"""
+    if selection is None or 'sheets' not in selection:
+        return uploaded_file.name
+    return f"{uploaded_file.name} [{', '.join(selection['sheets'])}]"
+
+def sheet_controls(uploaded_file):
+    """Sidebar worksheet picker for Excel uploads; returns the sheet selection, or None for the first sheet"""
+    if excel_engine(uploaded_file.name) is None:
+        return None
+    # The workbook is opened once per upload to list its sheets
+    file_hash = get_file_hash(uploaded_file)
+    memo = st.session_state.get('_sheet_names')
+    if memo is None or memo[0] != file_hash:
+        try:
+            uploaded_file.seek(0)
+            memo = (file_hash, list_sheets(uploaded_file, uploaded_file.name))
+        except Exception as e:
+            st.error(f"Error loading file: {str(e)}")
+            return None
+        st.session_state['_sheet_names'] = memo
+    names = memo[1]
+    if len(names) <= 1:
+        return None
+    st.sidebar.caption(f"{len(names)} {get_translation('sheet_count')}")
+    selected = st.sidebar.multiselect(get_translation("sheet_select"), names, default=names[:1],
+                                      help=get_translation("sheet_help"), key=f"sheets_{file_hash[:16]}")
+    if not selected:
+        st.sidebar.warning(get_translation("sheet_none"))
+        return None
+    source_column = len(selected) > 1 and st.sidebar.checkbox(
+        get_translation("sheet_source_column"), value=True, key="sheet_source_column")
+    if selected == names[:1]:
+        return None
+    return {'sheets': list(selected), 'source_column': source_column}
+
+CSV_DELIMITERS = {',': ',', ';': ';', 'Tab': '\t', '|': '|'}
 
-def automatic_association_analysis(df, var1, var2, alpha=0.05):
-    """Perform automatic association analysis based on variable types"""
+def csv_controls(uploaded_file):
+    """Sidebar CSV dialect and dtype options, defaulting to what was sniffed; returns the options or None"""
+    if not uploaded_file.name.endswith('.csv'):
+        return None
+    # The first block is read once per upload; sniffing and sampling only look at it
+    file_hash = get_file_hash(uploaded_file)
+    memo = st.session_state.get('_csv_head')
+    if memo is None or memo[0] != file_hash:
+        uploaded_file.seek(0)
+        head = read_head(uploaded_file)
+        memo = (file_hash, head, sniff_csv(head))
+        st.session_state['_csv_head'] = memo
+    _, head, detected = memo
+    
+    key = file_hash[:16]
+    with st.sidebar.expander(get_translation("csv_options")):
+        labels = list(CSV_DELIMITERS)
+        delimiter = CSV_DELIMITERS[st.selectbox(get_translation("csv_delimiter"), labels,
+                                                index=list(CSV_DELIMITERS.values()).index(detected['delimiter']),
+                                                key=f"csv_delimiter_{key}")]
+        encoding = st.selectbox(get_translation("csv_encoding"), CSV_ENCODINGS,
+                                index=CSV_ENCODINGS.index(detected['encoding']), key=f"csv_encoding_{key}")
+        decimal = st.selectbox(get_translation("csv_decimal"), ['.', ','],
+                               index=['.', ','].index(detected['decimal']), key=f"csv_decimal_{key}")
+        dialect = {'delimiter': delimiter, 'encoding': encoding, 'decimal': decimal}
+        try:
+            kinds = sample_dtypes(head_sample(head, dialect))
+        except Exception as e:
+            st.error(f"Error loading file: {str(e)}")
+            return {'dialect': dialect, 'dtypes': {}}
+        pin = st.checkbox(get_translation("csv_pin_types"), help=get_translation("csv_pin_help"), key=f"csv_pin_{key}")
+        as_category = st.multiselect(get_translation("csv_as_category"), list(kinds), key=f"csv_category_{key}")
+        st.dataframe(pd.DataFrame({
+            get_translation("columns"): list(kinds),
+            get_translation("csv_detected_types"): list(kinds.values())
+        }), hide_index=True)
+    
+    dtypes = dict(kinds) if pin else {}
+    dtypes.update({col: 'category' for col in as_category})
+    if dialect == detected and not dtypes:
+        return None
+    return {'dialect': dialect, 'dtypes': dtypes}
+
+# Column projection
+PROJECTION_MIN_COLUMNS = int(os.environ.get("SURVEY_PROJECTION_MIN_COLUMNS", "100"))
+PROJECTION_DEFAULT_COLUMNS = 30
+
+def read_schema(uploaded_file, selection=None):
+    """Column, type and sampled variable type of the upload, read from its header and first rows only"""
+    schema_key = get_dataset_hash(uploaded_file, selection)
+    memo = st.session_state.get('_schema')
+    if memo is None or memo[0] != schema_key:
+        selection = selection or {}
+        uploaded_file.seek(0)
+        sample = read_sample(uploaded_file, uploaded_file.name, sheets=selection.get('sheets'),
+                             dialect=selection.get('dialect'))
+        kinds = sample_dtypes(sample)
+        schema = pd.DataFrame({
+            get_translation("projection_columns"): list(sample.columns),
+            get_translation("csv_detected_types"): [kinds[col] for col in sample.columns],
+            get_translation("projection_variable_type"): [determine_variable_type(sample[col]) for col in sample.columns]
+        })
+        memo = (schema_key, schema)
+        st.session_state['_schema'] = memo
+    return memo[1]
+
+def apply_column_set(state_key, set_key, names):
+    """Selectbox callback: replace the projected columns with a saved column set"""
+    column_set = load_column_sets().get(st.session_state[set_key])
+    if column_set is not None:
+        st.session_state[state_key] = [col for col in column_set if col in names]
+
+def column_controls(uploaded_file, selection=None):
+    """Sidebar column projection; returns the selection extended by its columns and the schema column names"""
     try:
-        # Determine variable types
-        var1_type = determine_variable_type(df[var1])
-        var2_type = determine_variable_type(df[var2])
-        
-        # Determine analysis type
-        analysis_type = determine_analysis_type(var1_type, var2_type)
-        
-        analysis_type_names = {
-            "chi_square": "Chi-Square Test",
-            "pearson": "Pearson Correlation",
-            "spearman": "Spearman Correlation",
-            "anova": "ANOVA Test"
-        }
-        
-        # Show analysis type
-        st.markdown(f"""
-        <div class="analysis-type-card">
-            <div class="analysis-type-title">🎯 {analysis_type_names.get(analysis_type, 'Unknown')}</div>
-            <div class="analysis-type-desc">Analisis yang direkomendasikan berdasarkan tipe data</div>
-            <div style="margin-top: 1rem; padding: 0.5rem; background: rgba(255,255,255,0.7); border-radius: 6px;">
-                <strong>Variable 1:</strong> {var1} ({var1_type})<br>
-                <strong>Variable 2:</strong> {var2} ({var2_type})
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        results = {
-            'var1': var1,
-            'var2': var2,
-            'var1_type': var1_type,
-            'var2_type': var2_type,
-            'analysis_type': analysis_type,
-            'alpha': alpha,
-            'interpretation': '',
-            'recommendation': '',
-            'visualization': None
+        schema = read_schema(uploaded_file, selection)
+    except Exception as e:
+        st.error(f"Error loading file: {str(e)}")
+        return selection, None
+    names = schema[get_translation("projection_columns")].tolist()
+    key = get_dataset_hash(uploaded_file, selection)[:16]
+    state_key = f"projection_{key}"
+    
+    with st.sidebar.expander(get_translation("projection"), expanded=len(names) > PROJECTION_MIN_COLUMNS):
+        enabled = st.checkbox(get_translation("projection_enable"), value=len(names) > PROJECTION_MIN_COLUMNS,
+                              help=get_translation("projection_help"), key=f"projection_on_{key}")
+        selected = names
+        if enabled:
+            st.session_state.setdefault(state_key, names[:PROJECTION_DEFAULT_COLUMNS])
+            # Variables picked in the association analysis join the projection before the widget is drawn
+            pending = [col for col in st.session_state.pop('_projection_add', []) if col in names]
+            if pending:
+                st.session_state[state_key] = list(st.session_state[state_key]) + [
+                    col for col in pending if col not in st.session_state[state_key]]
+            set_key = f"projection_set_{key}"
+            st.selectbox(get_translation("projection_set"), [""] + list(load_column_sets()), key=set_key,
+                         on_change=apply_column_set, args=(state_key, set_key, names))
+            selected = st.multiselect(get_translation("projection_columns"), names, key=state_key)
+            set_name = st.text_input(get_translation("projection_set_name"), key=f"projection_name_{key}")
+            if st.button(get_translation("projection_save"), key=f"projection_save_{key}", disabled=not (set_name and selected)):
+                try:
+                    save_column_set(set_name, selected)
+                    st.success(get_translation("projection_saved"))
+                except Exception as e:
+                    st.error(f"Error saving column set: {str(e)}")
+            if not selected:
+                st.warning(get_translation("projection_none"))
+                selected = names
+            st.caption(f"{len(selected)} {get_translation('projection_loaded')} {len(names)}")
+        st.dataframe(schema, hide_index=True)
+    
+    if len(selected) == len(names):
+        return selection, names
+    # Keep file order so projected loads of the same columns share a cache entry
+    columns = [col for col in names if col in set(selected)]
+    return {**(selection or {}), 'columns': columns}, names
+
+def load_dataset(uploaded_file, selection=None):
+    """Load uploaded file (its selected sheets) through the dataset cache, returning (hash, entry)"""
+    cache = get_dataset_cache()
+    file_hash = get_dataset_hash(uploaded_file, selection)
+    entry = cache.get(file_hash)
+    if entry is None:
+        uploaded_file.seek(0)
+        df = load_data(uploaded_file, selection)
+        if df is None:
+            return file_hash, None
+        dtype_report = None
+        if OPTIMIZE_DTYPES:
+            df, dtype_report = optimize_dtypes(df)
+        with current_trace().span("get_column_types"):
+            numerical_cols, categorical_cols = get_column_types(df)
+        entry = {
+            'df': df,
+            'numerical_cols': numerical_cols,
+            'categorical_cols': categorical_cols,
+            'dtype_report': dtype_report,
+            'profile': load_profile(df, file_hash),
+            'name': dataset_name(uploaded_file, selection),
+            'nbytes': int(df.memory_usage(deep=True).sum())
         }
-        
-        if analysis_type == "chi_square":
-            # Chi-Square Test
-            contingency_table = pd.crosstab(df[var1], df[var2])
-            chi2, p_value, dof, expected = chi2_contingency(contingency_table)
-            
-            results.update({
-                'test_statistic': chi2,
-                'p_value': p_value,
-                'degrees_of_freedom': dof,
-                'contingency_table': contingency_table,
-                'expected_values': expected
-            })
-            
-            # Interpretation
-            if p_value < alpha:
-                results['interpretation'] = f'Terdapat asosiasi yang signifikan antara {var1} dan {var2} (χ²={chi2:.3f}, p={p_value:.4f})'
-                results['recommendation'] = 'Variabel-variabel ini tidak independen dan memiliki hubungan statistik'
-            else:
-                results['interpretation'] = f'Tidak ada asosiasi signifikan antara {var1} dan {var2} (χ²={chi2:.3f}, p={p_value:.4f})'
-                results['recommendation'] = 'Variabel-variabel ini independen secara statistik'
-            
-            # Visualization
-            fig = px.imshow(
-                contingency_table,
-                title=f'Hubungan antara {var1} dan {var2}',
-                labels=dict(x=var2, y=var1, color="Frekuensi"),
-                color_continuous_scale="Blues"
-            )
-            results['visualization'] = fig
-            
-        elif analysis_type == "anova":
-            # ANOVA Test
-            if var1_type == "nominal":
-                groups = [df[df[var1] == group][var2].dropna() for group in df[var1].unique()]
-                group_labels = df[var1].unique()
-            else:
-                groups = [df[df[var2] == group][var1].dropna() for group in df[var2].unique()]
-                group_labels = df[var2].unique()
-            
-            # Filter out empty groups
-            groups = [group for group in groups if len(group) > 0]
-            
-            if len(groups) < 2:
-                results['interpretation'] = 'Tidak cukup kelompok data untuk melakukan ANOVA'
-                results['recommendation'] = 'Periksa kategori variabel dan pastikan ada cukup data di setiap kelompok'
-                return results
-            
-            f_stat, p_value = f_oneway(*groups)
-            
-            results.update({
-                'test_statistic': f_stat,
-                'p_value': p_value,
-                'group_means': [np.mean(group) for group in groups],
-                'group_stds': [np.std(group) for group in groups],
-                'group_labels': group_labels
-            })
-            
-            # Interpretation
-            if p_value < alpha:
-                results['interpretation'] = f'Terdapat perbedaan signifikan antara kelompok-kelompok (F={f_stat:.3f}, p={p_value:.4f})'
-                results['recommendation'] = 'Setidaknya satu kelompok berbeda secara signifikan dari yang lain'
-            else:
-                results['interpretation'] = f'Tidak ada perbedaan signifikan antara kelompok-kelompok (F={f_stat:.3f}, p={p_value:.4f})'
-                results['recommendation'] = 'Semua kelompok memiliki rata-rata yang tidak berbeda secara signifikan'
-            
-            # Visualization
-            fig = go.Figure()
-            
-            if var1_type == "nominal":
-                for i, group in enumerate(groups):
-                    fig.add_trace(go.Box(
-                        y=group,
-                        name=str(group_labels[i]),
-                        boxpoints='outliers'
-                    ))
-                fig.update_layout(
-                    title=f'Distribusi {var2} berdasarkan {var1}',
-                    xaxis_title=var1,
-                    yaxis_title=var2
-                )
-            else:
-                for i, group in enumerate(groups):
-                    fig.add_trace(go.Box(
-                        y=group,
-                        name=str(group_labels[i]),
-                        boxpoints='outliers'
-                    ))
-                fig.update_layout(
-                    title=f'Distribusi {var1} berdasarkan {var2}',
-                    xaxis_title=var2,
-                    yaxis_title=var1
-                )
-            
-            results['visualization'] = fig
-            
-        elif analysis_type == "pearson":
-            # Pearson Correlation
-            x = df[var1].dropna()
-            y = df[var2].dropna()
-            
-            # Align data
-            common_idx = x.index.intersection(y.index)
-            x = x.loc[common_idx]
-            y = y.loc[common_idx]
-            
-            if len(x) < 3:
-                results['interpretation'] = 'Tidak cukup data untuk melakukan korelasi Pearson'
-                results['recommendation'] = 'Diperlukan setidaknya 3 pasang data yang valid'
-                return results
-            
-            corr, p_value = pearsonr(x, y)
-            
-            results.update({
-                'correlation': corr,
-                'p_value': p_value,
-                'sample_size': len(x)
-            })
-            
-            # Interpretation
-            if p_value < alpha:
-                strength = get_correlation_strength(corr)
-                direction = 'positif' if corr > 0 else 'negatif'
-                results['interpretation'] = f'Terdapat korelasi {direction} yang signifikan dengan kekuatan {strength} (r={corr:.3f}, p={p_value:.4f})'
-                results['recommendation'] = f'Variabel {var1} dan {var2} memiliki hubungan linear {direction} yang {strength}'
-            else:
-                results['interpretation'] = f'Tidak ada korelasi signifikan antara variabel (r={corr:.3f}, p={p_value:.4f})'
-                results['recommendation'] = 'Tidak ada bukti hubungan linear antara variabel-variabel ini'
-            
-            # Visualization
-            fig = px.scatter(
-                x=x, y=y,
-                title=f'Hubungan antara {var1} dan {var2}',
-                labels={'x': var1, 'y': var2}
-            )
-            
-            # Add trendline
-            coeffs = np.polyfit(x, y, 1)
-            trendline = np.poly1d(coeffs)
-            x_trend = np.linspace(x.min(), x.max(), 100)
-            y_trend = trendline(x_trend)
-            
-            fig.add_trace(go.Scatter(
-                x=x_trend, y=y_trend,
-                mode='lines',
-                name=f'Trendline (r={corr:.3f})',
-                line=dict(color='red', dash='dash')
-            ))
-            
-            results['visualization'] = fig
-            
-        elif analysis_type == "spearman":
-            # Spearman Correlation
-            x = df[var1].dropna()
-            y = df[var2].dropna()
-            
-            # Align data
-            common_idx = x.index.intersection(y.index)
-            x = x.loc[common_idx]
-            y = y.loc[common_idx]
-            
-            if len(x) < 3:
-                results['interpretation'] = 'Tidak cukup data untuk melakukan korelasi Spearman'
-                results['recommendation'] = 'Diperlukan setidaknya 3 pasang data yang valid'
-                return results
-            
-            corr, p_value = spearmanr(x, y)
-            
-            results.update({
-                'correlation': corr,
-                'p_value': p_value,
-                'sample_size': len(x)
-            })
-            
-            # Interpretation
-            if p_value < alpha:
-                strength = get_correlation_strength(corr)
-                direction = 'positif' if corr > 0 else 'negatif'
-                results['interpretation'] = f'Terdapat korelasi {direction} yang signifikan dengan kekuatan {strength} (ρ={corr:.3f}, p={p_value:.4f})'
-                results['recommendation'] = f'Variabel {var1} dan {var2} memiliki hubungan monoton {direction} yang {strength}'
-            else:
-                results['interpretation'] = f'Tidak ada korelasi signifikan antara variabel (ρ={corr:.3f}, p={p_value:.4f})'
-                results['recommendation'] = 'Tidak ada bukti hubungan monoton antara variabel-variabel ini'
-            
-            # Visualization
-            fig = px.scatter(
-                x=x, y=y,
-                title=f'Hubungan antara {var1} dan {var2}',
-                labels={'x': var1, 'y': var2}
+        cache.put(file_hash, entry)
+    hold_dataset(file_hash)
+    return file_hash, entry
+
+def render_cache_stats():
+    """Show dataset and result cache statistics in the sidebar"""
+    with st.sidebar.expander(get_translation("cache_stats")):
+        for title_key, cache in [("cache_datasets", get_dataset_cache()), ("cache_results", get_result_cache())]:
+            stats = cache.stats()
+            st.markdown(f"**{get_translation(title_key)}**")
+            col1, col2 = st.columns(2)
+            col1.metric(get_translation("cache_hits"), stats['hits'])
+            col2.metric(get_translation("cache_misses"), stats['misses'])
+            st.markdown(f"{get_translation('cache_entries')}: {stats['entries']}")
+            st.markdown(f"{get_translation('cache_memory')}: {stats['nbytes'] / 1024 / 1024:.1f} / {stats['max_bytes'] / 1024 / 1024:.0f} MB")
+
+# Streaming ingestion
+def load_stream_stats(uploaded_file, approximate=False, selection=None):
+    """Build streaming statistics for an uploaded CSV through the dataset cache"""
+    cache = get_dataset_cache()
+    cache_key = f"{get_dataset_hash(uploaded_file, selection)}:{'approx' if approximate else 'stream'}"
+    entry = cache.get(cache_key)
+    if entry is None:
+        try:
+            uploaded_file.seek(0)
+            progress = st.empty()
+            stats = stream_csv_statistics(
+                uploaded_file,
+                progress_callback=lambda rows: progress.caption(f"{get_translation('rows_processed')}: {rows:,}"),
+                approximate=approximate,
+                **(selection or {})
             )
-            
-            results['visualization'] = fig
-        
+            progress.empty()
+        except Exception as e:
+            st.error(f"Error loading file: {str(e)}")
+            return None
+        entry = {'stats': stats, 'name': uploaded_file.name, 'nbytes': stats.memory_usage()}
+        cache.put(cache_key, entry)
+    hold_dataset(cache_key)
+    return entry['stats']
+
+def sketch_distribution_figures(aggregate, column):
+    """Histogram and box plot of a numeric column drawn from its quantile sketch"""
+    values, weights = aggregate.sketch.weighted_items()
+    fig_hist = go.Figure(go.Histogram(x=values, y=weights, histfunc='sum', nbinsx=30))
+    fig_hist.update_layout(title=f'{get_translation("distribution")} {column}', height=400,
+                           xaxis_title=column, yaxis_title=get_translation("frequency_chart"))
+    q1, median, q3 = aggregate.sketch.quantile(DESCRIBE_QUANTILES)
+    iqr = q3 - q1
+    fig_box = go.Figure(go.Box(
+        name=column,
+        q1=[q1], median=[median], q3=[q3],
+        lowerfence=[max(aggregate.min, q1 - 1.5 * iqr)],
+        upperfence=[min(aggregate.max, q3 + 1.5 * iqr)],
+        mean=[aggregate.mean], sd=[aggregate.std]
+    ))
+    fig_box.update_layout(title=f'Box Plot {column}', height=400)
+    return fig_hist, fig_box
+
+# Columnar dataset store
+def convert_to_columnar(uploaded_file, file_hash, selection=None):
+    """Convert an upload (its selected sheets) to Parquet once per dataset hash and return its path"""
+    os.makedirs(DATASET_DIR, exist_ok=True)
+    path = os.path.join(DATASET_DIR, f"{file_hash}.parquet")
+    if not os.path.exists(path):
+        uploaded_file.seek(0)
+        df = load_data(uploaded_file, selection)
+        if df is None:
+            return None
+        if OPTIMIZE_DTYPES:
+            # Downcast dtypes and dictionary encoding survive the Parquet round trip
+            df, dtype_report = optimize_dtypes(df)
+            dtype_report.to_csv(os.path.join(DATASET_DIR, f"{file_hash}.dtypes.csv"), index=False)
+        write_columnar(df, path)
+    return path
+
+def load_columnar_dataset(uploaded_file, selection=None):
+    """Open the columnar copy of an upload through the dataset cache, returning (hash, entry)"""
+    cache = get_dataset_cache()
+    file_hash = get_dataset_hash(uploaded_file, selection)
+    cache_key = f"{file_hash}:columnar"
+    entry = cache.get(cache_key)
+    if entry is None:
+        try:
+            path = convert_to_columnar(uploaded_file, file_hash, selection)
+            if path is None:
+                return file_hash, None
+            dataset = ColumnarDataset(path)
+            profile = load_profile(dataset, file_hash)
+        except Exception as e:
+            st.error(f"Error loading file: {str(e)}")
+            return file_hash, None
+        with current_trace().span("get_column_types"):
+            numerical_cols, categorical_cols = dataset.column_types()
+        entry = {
+            'df': dataset,
+            'numerical_cols': numerical_cols,
+            'categorical_cols': categorical_cols,
+            'dtype_report': read_dtype_report(file_hash),
+            'profile': profile,
+            'name': dataset_name(uploaded_file, selection),
+            'nbytes': dataset.memory_usage
+        }
+        cache.put(cache_key, entry)
+    hold_dataset(cache_key)
+    return file_hash, entry
+
+# Append-only survey waves
+def wave_controls(uploaded_file):
+    """Sidebar choice of the wave dataset an upload is appended to, or None outside wave mode"""
+    if not st.sidebar.checkbox(get_translation("wave_mode"), help=get_translation("wave_mode_help"), key="wave_mode"):
+        return None
+    new_label = get_translation("wave_new")
+    choice = st.sidebar.selectbox(get_translation("wave_dataset"), [new_label] + list_wave_datasets(), key="wave_dataset")
+    if choice != new_label:
+        return choice
+    name = st.sidebar.text_input(get_translation("wave_name"), value=os.path.splitext(uploaded_file.name)[0], key="wave_name")
+    # The name becomes a directory in the dataset store
+    return re.sub(r'[^\w.-]+', '_', name).strip('._') or None
+
+def wave_frame(uploaded_file, selection, wave_hash):
+    """Parsed upload of a wave, kept by wave hash so its check and its append parse it once"""
+    memo = st.session_state.get('_wave_frame')
+    if memo is None or memo[0] != wave_hash:
+        uploaded_file.seek(0)
+        df = load_data(uploaded_file, selection)
+        if df is None:
+            return None
+        memo = (wave_hash, df)
+        st.session_state['_wave_frame'] = memo
+    return memo[1]
+
+def check_wave(uploaded_file, name, selection, wave_hash, state):
+    """Schema check of an upload against a wave dataset, once per upload and stored wave count
+
+    Returns (Arrow table the wave would be stored as, error message); nothing is written.
+    """
+    key = (name, wave_hash, 0 if state is None else len(state.waves))
+    memo = st.session_state.get('_wave_check')
+    if memo is None or memo[0] != key:
+        df = wave_frame(uploaded_file, selection, wave_hash)
+        if df is None:
+            return None, None
+        try:
+            memo = (key, prepare_wave(name, df, wave_hash, state), None)
+        except ValueError as e:
+            memo = (key, None, str(e))
+        st.session_state['_wave_check'] = memo
+    return memo[1], memo[2]
+
+def wave_append_controls(uploaded_file, name, selection, wave_hash, state):
+    """Sidebar wave hash, schema check and append button; appends the upload when confirmed
+
+    Returns the stored WaveStatistics after the append, or state when nothing was appended.
+    """
+    st.sidebar.caption(f"{get_translation('wave_hash')}: `{wave_hash[:16]}`")
+    position = stored_wave(state, wave_hash)
+    table, error = (None, None) if position is not None else check_wave(uploaded_file, name, selection, wave_hash, state)
+    if position is not None:
+        st.sidebar.info(get_translation("wave_stored").format(wave=position + 1))
+    elif error is not None:
+        st.sidebar.error(f"{get_translation('wave_rejected')}: {error}")
+    elif table is not None:
+        message = "wave_schema_new" if state is None else "wave_schema_ok"
+        st.sidebar.success(get_translation(message).format(rows=table.num_rows, columns=table.num_columns))
+        widened = [] if state is None else [
+            f"{field.name} ({state.schema.field(field.name).type} → {field.type})"
+            for field in table.schema if field.type != state.schema.field(field.name).type
+        ]
+        if widened:
+            st.sidebar.caption(get_translation("wave_widened").format(columns=', '.join(widened)))
+    if not st.sidebar.button(get_translation("wave_append"), disabled=table is None, key="wave_append"):
+        return state
+    try:
+        df = wave_frame(uploaded_file, selection, wave_hash)
+        if df is None:
+            return state
+        with current_trace().span("append_wave"):
+            state = append_wave(name, df, dataset_name(uploaded_file, selection), wave_hash)
+    except ValueError as e:
+        st.sidebar.error(f"{get_translation('wave_rejected')}: {str(e)}")
+        return load_wave_state(name)
+    # A stored wave is read from its part from now on
+    st.session_state.pop('_wave_frame', None)
+    st.sidebar.success(get_translation("wave_appended").format(wave=len(state.waves)))
+    return state
+
+def load_wave_dataset(uploaded_file, name, selection=None):
+    """Open the stored waves of a wave dataset through the dataset cache, returning (hash, entry)
+
+    The upload is appended only when the append button is pressed after its schema check;
+    until the first wave is stored there is no dataset to open.
+    """
+    cache = get_dataset_cache()
+    wave_hash = get_dataset_hash(uploaded_file, selection)
+    path = wave_state_path(name)
+    # The state file changes with every append, from this session or another
+    stamp = (name, os.path.getmtime(path)) if os.path.exists(path) else None
+    memo = st.session_state.get('_wave_dataset')
+    entry = None
+    if stamp is not None and memo is not None and memo[:2] == stamp:
+        dataset_hash = memo[2]
+        entry = cache.get(f"{dataset_hash}:waves")
+    try:
+        state = entry['waves'] if entry is not None else load_wave_state(name)
+        appended = wave_append_controls(uploaded_file, name, selection, wave_hash, state)
+        if appended is None:
+            st.info(get_translation("wave_pending"))
+            return wave_hash, None
+        if appended is not state:
+            state, entry = appended, None
+        if entry is None:
+            dataset = open_waves(name, state)
+    except Exception as e:
+        st.error(f"Error loading file: {str(e)}")
+        return wave_hash, None
+    if entry is None:
+        dataset_hash = wave_dataset_hash(name, state)
+        st.session_state['_wave_dataset'] = (name, os.path.getmtime(path), dataset_hash)
+        with current_trace().span("get_column_types"):
+            numerical_cols, categorical_cols = dataset.column_types()
+        entry = {
+            'df': dataset,
+            'numerical_cols': numerical_cols,
+            'categorical_cols': categorical_cols,
+            'dtype_report': None,
+            'profile': state.profile(),
+            'waves': state,
+            'name': f"{name} ({len(state.waves)})",
+            'nbytes': dataset.memory_usage
+        }
+        cache.put(f"{dataset_hash}:waves", entry)
+    hold_dataset(f"{dataset_hash}:waves")
+    return dataset_hash, entry
+
+# Sampling
+def load_sample(dataset_hash, data, method, size, column=None):
+    """Sample of a loaded dataset through the dataset cache, materialized once per sampling spec"""
+    cache = get_dataset_cache()
+    key = f"sample:{method}:{column}:{size}"
+    cache_key = f"{dataset_hash}:{key}"
+    entry = cache.get(cache_key)
+    if entry is None:
+        strata = select_columns(data, [column])[column] if method == "stratified" else None
+        weights = select_columns(data, [column])[column].to_numpy(dtype=float, na_value=np.nan) if method == "weighted" else None
+        indices = sample_indices(len(data), size, method, strata=strata, weights=weights)
+        sample_df = sample_rows(data, indices)
+        entry = {
+            'df': sample_df,
+            'key': key,
+            'method': method,
+            'n_rows': len(sample_df),
+            'nbytes': int(sample_df.memory_usage(deep=True).sum())
+        }
+        cache.put(cache_key, entry)
+    hold_dataset(cache_key)
+    return entry
+
+def sampling_controls(dataset_hash, data, numerical_cols, categorical_cols):
+    """Sidebar sampling options; returns the sample entry, or None for the full data"""
+    if not st.sidebar.checkbox(get_translation("sample_preview"), help=get_translation("sample_preview_help"), key="sample_preview"):
+        return None
+    methods = {get_translation(f"sample_{m}"): m for m in SAMPLE_METHODS}
+    method = methods[st.sidebar.selectbox(get_translation("sample_method"), list(methods), key="sample_method")]
+    size = int(st.sidebar.number_input(get_translation("sample_size"), min_value=100, value=SAMPLE_DEFAULT_ROWS,
+                                       step=1000, key="sample_size"))
+    column = None
+    if method != "reservoir":
+        options = categorical_cols if method == "stratified" else numerical_cols
+        label = get_translation("sample_strata") if method == "stratified" else get_translation("sample_weight")
+        if not options:
+            st.sidebar.warning(get_translation("sample_no_column"))
+            return None
+        column = st.sidebar.selectbox(label, options, key=f"sample_{method}_column")
+    if size >= len(data):
+        return None
+    return load_sample(dataset_hash, data, method, size, column)
+
+# Instrumentation
+TRACE_HISTORY = 20
+
+def current_trace():
+    """Trace of the running rerun; a no-op trace when instrumentation is off"""
+    return st.session_state.get('_trace', NULL_TRACE)
+
+def start_trace():
+    """Begin tracing this rerun if the sidebar toggle is on"""
+    if st.sidebar.checkbox(get_translation("instrumentation"), help=get_translation("instrumentation_help"),
+                           key="instrumentation"):
+        st.session_state['_reruns'] = st.session_state.get('_reruns', 0) + 1
+        trace = Trace(f"rerun {st.session_state['_reruns']}")
+        trace.open("rerun")
+    else:
+        trace = NULL_TRACE
+    st.session_state['_trace'] = trace
+    return trace
+
+def render_instrumentation(trace):
+    """Close the rerun span and show its stages in the sidebar, with a trace export of recent reruns"""
+    if not trace.enabled:
+        return
+    trace.close()
+    traces = st.session_state.setdefault('traces', [])
+    traces.append(trace)
+    del traces[:-TRACE_HISTORY]
+    with st.sidebar.expander(get_translation("instrumentation_panel"), expanded=True):
+        st.dataframe(trace.frame().rename(columns={
+            'stage': 'Tahap',
+            'wall_ms': 'Wall (ms)',
+            'cpu_ms': 'CPU (ms)',
+            'rss_delta_mb': 'Δ Puncak RSS (MB)',
+            'payload_kb': 'Payload (KB)'
+        }), hide_index=True)
+        st.download_button(get_translation("trace_export"), json.dumps(chrome_trace(traces)),
+                           file_name="survey_trace.json", mime="application/json", key="trace_export")
+
+def show_chart(fig):
+    """st.plotly_chart that counts the figure JSON towards the current trace span"""
+    trace = current_trace()
+    if trace.enabled:
+        trace.add_payload(len(fig.to_json()))
+    st.plotly_chart(fig, use_container_width=True)
+
+def show_frame(frame):
+    """st.dataframe that counts the frame's in-memory size (an estimate of its Arrow payload) towards the trace"""
+    trace = current_trace()
+    if trace.enabled:
+        trace.add_payload(frame.memory_usage(deep=True).sum())
+    st.dataframe(frame, use_container_width=True)
+
+# Per-pair result cache
+RESULT_CACHE_MAX_BYTES = int(os.environ.get("SURVEY_RESULT_CACHE_MAX_MB", "256")) * 1024 * 1024
+
+@st.cache_resource
+def get_result_cache():
+    """Process-wide LRU cache of per-pair analysis results"""
+    return LRUCache(RESULT_CACHE_MAX_BYTES)
+
+def association_results(cache, df, dataset_hash, var1, var2, alpha=0.05, var_types=None, trace=None):
+    """automatic_association_analysis memoized in cache per dataset, pair, alpha, test and type thresholds
+
+    Takes the cache explicitly and raises on failure so background jobs can call it off the script thread.
+    """
+    trace = trace or NULL_TRACE
+    with trace.span("automatic_association_analysis") as span:
+        if dataset_hash is None or var_types is None:
+            return automatic_association_analysis(df, var1, var2, alpha, var_types=var_types, trace=trace)
+        # Variable types come from the profile, so a cache hit reads no column data
+        analysis_type = determine_analysis_type(var_types[var1], var_types[var2])
+        key = (dataset_hash, var1, var2, alpha, analysis_type, ORDINAL_MAX_UNIQUE, NOMINAL_MAX_UNIQUE)
+        entry = cache.get(key)
+        if entry is not None:
+            results = dict(entry['results'])
+            if entry['figure'] is not None:
+                results['visualization'] = pio.from_json(entry['figure'])
+            # The figure JSON is what st.plotly_chart sends to the browser
+            span.update(cached=True, payload=len(entry['figure'] or ''))
+            return results
+
+        results = automatic_association_analysis(df, var1, var2, alpha, var_types=var_types, trace=trace)
+        # Figures are stored serialized; the rest of the results dict is kept as is
+        figure = results['visualization'].to_json() if results['visualization'] is not None else None
+        stored = {k: v for k, v in results.items() if k != 'visualization'}
+        cache.put(key, {
+            'results': stored,
+            'figure': figure,
+            'nbytes': len(pickle.dumps(stored)) + len(figure or '')
+        })
+        span.update(cached=False, payload=len(figure or ''))
         return results
-        
+
+def resampling_results(df, dataset_hash, var1, var2, analysis_type, settings, alpha=0.05):
+    """resampling_inference memoized in the result cache per dataset, pair and resampling settings"""
+    cache = get_result_cache()
+    key = (dataset_hash, var1, var2, 'resampling', analysis_type, alpha, tuple(sorted(settings.items())))
+    entry = cache.get(key) if dataset_hash is not None else None
+    if entry is None:
+        with current_trace().span("resampling_inference"), st.spinner(get_translation("resampling_running")):
+            result = resampling_inference(df, var1, var2, analysis_type, alpha=alpha, **settings)
+        entry = {'result': result, 'nbytes': len(pickle.dumps(result))}
+        if dataset_hash is not None:
+            cache.put(key, entry)
+    return entry['result']
+
+def resampling_controls():
+    """Resampling settings for the pair analysis, or None when resampling is off"""
+    with st.expander(get_translation("resampling")):
+        if not st.checkbox(get_translation("resampling_enable"), help=get_translation("resampling_help"), key="resampling"):
+            return None
+        col1, col2, col3 = st.columns(3)
+        n_resamples = col1.number_input(get_translation("resampling_count"), min_value=100, max_value=100_000,
+                                        value=RESAMPLE_DEFAULT, step=500, key="resampling_count")
+        seed = col2.number_input(get_translation("resampling_seed"), min_value=0, value=0, step=1, key="resampling_seed")
+        early_stop = col3.checkbox(get_translation("resampling_early_stop"), value=True, key="resampling_early_stop")
+    return {'n_resamples': int(n_resamples), 'seed': int(seed), 'early_stop': early_stop}
+
+def cached_association_analysis(df, dataset_hash, var1, var2, alpha=0.05, var_types=None):
+    """association_results on the process-wide result cache, reporting errors in the page"""
+    try:
+        return association_results(get_result_cache(), df, dataset_hash, var1, var2, alpha, var_types, current_trace())
     except Exception as e:
         st.error(f"Error in automatic association analysis: {str(e)}")
         return None
 
-def descriptive_analysis(df, numerical_cols, categorical_cols):
-    """Perform descriptive analysis"""
+# Background jobs
+BACKGROUND_MIN_ROWS = int(os.environ.get("SURVEY_BACKGROUND_MIN_ROWS", "1000000"))
+JOB_POLL_SECONDS = 1
+
+@st.cache_resource
+def get_job_queue():
+    """Process-wide queue running long analyses off the script thread"""
+    return JobQueue()
+
+def submit_job(fn, *args, label="", meta=None):
+    """Queue a job and remember its id in this session's job list"""
+    job_id = get_job_queue().submit(fn, *args, label=label, meta=meta)
+    st.session_state.setdefault('jobs', []).append(job_id)
+    return job_id
+
+def submit_pair_job(df, dataset_hash, var1, var2, var_types, request):
+    """Queue one association analysis on the shared result cache"""
+    cache = get_result_cache()
+    return submit_job(lambda job: association_results(cache, df, dataset_hash, var1, var2, var_types=var_types),
+                      label=f"{get_translation('job_pair')}: {var1} × {var2}",
+                      meta={'kind': 'pair', 'var1': var1, 'var2': var2, 'request': dict(request)})
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def job_progress(job_id):
+    """Progress bar and cancel button of an unfinished job, polled without rerunning the page"""
+    job = get_job_queue().get(job_id)
+    if job is None or job.finished is not None:
+        # A full rerun replaces the progress bar with the results
+        st.rerun()
+    st.progress(job.progress, text=f"{job.label} • {get_translation('job_' + job.status)}")
+    if st.button(get_translation("job_cancel"), key=f"job_cancel_{job_id}"):
+        get_job_queue().cancel(job_id)
+        st.rerun()
+
+def job_outcome(job_id):
+    """Result of a finished job; otherwise shows its progress, error or cancellation and returns None"""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return None
+    if job.finished is None:
+        job_progress(job_id)
+    elif job.status == "failed":
+        st.error(f"{job.label}: {job.error}")
+    elif job.status == "cancelled":
+        st.info(f"{job.label}: {get_translation('job_cancelled')}")
+    else:
+        return job.result
+    return None
+
+def show_job(job_id):
+    """Button callback bringing a finished job's results back into view"""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return
+    if job.meta['kind'] == 'pair':
+        st.session_state['auto_var1'] = job.meta['var1']
+        st.session_state['auto_var2'] = job.meta['var2']
+        st.session_state['pair_request'] = {**job.meta['request'], 'job': job_id}
+    else:
+        st.session_state['all_pairs_columns'] = list(job.meta['columns'])
+        grid = job.meta.get('against') is not None
+        st.session_state['all_pairs_mode'] = get_translation("all_pairs_mode_grid" if grid else "all_pairs_mode_all")
+        if grid:
+            st.session_state['all_pairs_against'] = list(job.meta['against'])
+        st.session_state['all_pairs'] = {'key': job.meta['key'], 'results': job.result}
+        st.session_state.pop('all_pairs_job', None)
+
+def render_job_history():
+    """List this session's jobs in the sidebar, newest first"""
+    with st.sidebar.expander(get_translation("job_history")):
+        jobs = get_job_queue().jobs(st.session_state.get('jobs', []))
+        if not jobs:
+            st.caption(get_translation("job_none"))
+        for job in jobs:
+            st.markdown(f"**{job.label}**  \n{get_translation('job_' + job.status)} • {job.elapsed:.1f} s")
+            if job.status == "done":
+                st.button(get_translation("job_show"), key=f"job_show_{job.id}", on_click=show_job, args=(job.id,))
+
+# All-pairs view
+ALL_PAIRS_DEFAULT_COLUMNS = 30
+ALL_PAIRS_ANNOTATION_LIMIT = 20
+
+# Correlation matrix view
+CORRELATION_ANNOTATION_LIMIT = 20
+CORRELATION_VIEW_LIMIT = 40
+CORRELATION_TOP_K = 30
+
+def correlation_results(data, dataset_hash, profile, method):
+    """Correlation matrix of the profiled numeric columns: Pearson from the profile, Spearman once per dataset"""
+    if method == 'pearson':
+        return profile.correlation
+    columns = list(profile.correlation.columns)
+    if dataset_hash is None:
+        return correlation_matrix(data, columns, method)[0]
+    cache = get_result_cache()
+    key = (dataset_hash, 'correlation', method)
+    entry = cache.get(key)
+    if entry is None:
+        with current_trace().span("correlation_matrix"):
+            corr = correlation_matrix(data, columns, method)[0]
+        entry = {'matrix': corr, 'nbytes': int(corr.memory_usage(deep=True).sum())}
+        cache.put(key, entry)
+    return entry['matrix']
+
+def correlation_section(data, numerical_cols, profile, dataset_hash=None):
+    """Heatmap of a filtered, top-k or clustered view of the cached correlation matrix"""
+    st.markdown(f'<div style="font-size: 1.3rem; font-weight: 600; color: #7c3aed; margin: 1rem 0;">{get_translation("correlation_matrix")}</div>', unsafe_allow_html=True)
+    described = [col for col in numerical_cols if col in profile.correlation.columns]
+    # Wide surveys start from a clustered top-k view instead of the full matrix
+    large = len(described) > CORRELATION_VIEW_LIMIT
+    # View defaults depend on the dataset, so each dataset gets its own view state
+    key = (dataset_hash or "")[:16]
+    col1, col2, col3, col4 = st.columns(4)
+    method = col1.selectbox(get_translation("correlation_method"), [method.capitalize() for method in CORRELATION_METHODS],
+                            key="corr_method").lower()
+    min_abs = col2.slider(get_translation("corr_min_abs"), 0.0, 1.0, 0.0, 0.05, key=f"corr_min_abs_{key}")
+    top_k = col3.number_input(get_translation("corr_top_k"), min_value=0, value=CORRELATION_TOP_K if large else 0,
+                              step=5, help=get_translation("corr_top_k_help"), key=f"corr_top_k_{key}")
+    cluster = col4.checkbox(get_translation("corr_cluster"), value=large, key=f"corr_cluster_{key}")
+    
+    matrix = correlation_results(data, dataset_hash, profile, method).loc[described, described]
+    view = correlation_view(matrix, min_abs, int(top_k) or None, cluster)
+    if view.empty:
+        st.info(get_translation("corr_view_empty"))
+        return
+    st.caption(f"{len(view)} {get_translation('corr_shown')} {len(matrix)}")
+    
+    # Cell labels are unreadable and dominate the payload past a few dozen variables
+    fig_corr = px.imshow(view,
+                         text_auto='.2f' if len(view) <= CORRELATION_ANNOTATION_LIMIT else False,
+                         aspect="auto",
+                         zmin=-1, zmax=1,
+                         color_continuous_scale='RdBu_r',
+                         title=get_translation("correlation_matrix"))
+    fig_corr.update_layout(height=max(500, 18 * len(view)))
+    show_chart(fig_corr)
+    
+    with st.expander(get_translation("corr_top_pairs")):
+        pairs = top_correlations(view, int(top_k) or CORRELATION_TOP_K, min_abs)
+        show_frame(pairs.rename(columns={'var1': 'Variabel 1', 'var2': 'Variabel 2', 'r': 'Korelasi'}))
+
+def descriptive_analysis(df, numerical_cols, categorical_cols, profile, streaming=False, dataset_hash=None, data=None):
+    """Perform descriptive analysis from the dataset profile (running aggregates in streaming mode)
+
+    data is the full dataset behind a sampled df; rank correlations are computed from it.
+    """
     try:
         st.markdown(f'<div class="section-header">{get_translation("descriptive_analysis")}</div>', unsafe_allow_html=True)
         
+        n_rows, n_columns = profile.shape
+        approximate = streaming and profile.approximate
+        
         # Basic Statistics
         col1, col2 = st.columns(2)
         
@@ -747,31 +1536,37 @@ def descriptive_analysis(df, numerical_cols, categorical_cols):
             st.markdown(f'<div style="font-size: 1.3rem; font-weight: 600; color: #1e40af; margin: 1rem 0;">{get_translation("dataset_overview")}</div>', unsafe_allow_html=True)
             st.markdown(f"""
             <div class="metric-card">
-                <strong>{get_translation("total_rows")}:</strong> {df.shape[0]:,}<br>
-                <strong>{get_translation("total_columns")}:</strong> {df.shape[1]}<br>
+                <strong>{get_translation("total_rows")}:</strong> {n_rows:,}<br>
+                <strong>{get_translation("total_columns")}:</strong> {n_columns}<br>
                 <strong>{get_translation("numerical_columns")}:</strong> {len(numerical_cols)}<br>
                 <strong>{get_translation("categorical_columns")}:</strong> {len(categorical_cols)}
             </div>
             """, unsafe_allow_html=True)
             
             # Missing values
-            missing_data = df.isnull().sum()
+            missing_data = profile.null_counts()
             if missing_data.sum() > 0:
                 st.markdown(f'<div style="font-size: 1.3rem; font-weight: 600; color: #f59e0b; margin: 1rem 0;">{get_translation("missing_values")}</div>', unsafe_allow_html=True)
                 missing_df = pd.DataFrame({
                     get_translation("columns"): missing_data.index,
                     'Jumlah Missing': missing_data.values,
-                    'Persentase': (missing_data.values / len(df) * 100).round(2)
+                    'Persentase': (missing_data.values / n_rows * 100).round(2)
                 })
                 missing_df = missing_df[missing_df['Jumlah Missing'] > 0]
-                st.dataframe(missing_df, use_container_width=True)
+                show_frame(missing_df)
         
         with col2:
             # Numerical columns statistics
             if numerical_cols:
                 st.markdown(f'<div style="font-size: 1.3rem; font-weight: 600; color: #059669; margin: 1rem 0;">{get_translation("numerical_stats")}</div>', unsafe_allow_html=True)
-                stats_df = df[numerical_cols].describe().round(2)
-                st.dataframe(stats_df, use_container_width=True)
+                stats_df = profile.describe().round(2)
+                show_frame(stats_df)
+        
+        # Error bounds of sketch-based statistics
+        if approximate:
+            with st.expander(get_translation("error_bounds")):
+                st.caption(get_translation("error_bounds_note"))
+                show_frame(profile.error_bounds())
         
         # Visualizations
         if numerical_cols:
@@ -781,31 +1576,33 @@ def descriptive_analysis(df, numerical_cols, categorical_cols):
             selected_num_col = st.selectbox(get_translation("select_numerical_column"), numerical_cols)
             
             col1, col2 = st.columns(2)
-            with col1:
-                # Histogram
-                fig_hist = px.histogram(df, x=selected_num_col, title=f'{get_translation("distribution")} {selected_num_col}',
-                                       nbins=30, marginal='box')
-                fig_hist.update_layout(height=400)
-                st.plotly_chart(fig_hist, use_container_width=True)
-            
-            with col2:
-                # Box plot
-                fig_box = px.box(df, y=selected_num_col, title=f'Box Plot {selected_num_col}')
-                fig_box.update_layout(height=400)
-                st.plotly_chart(fig_box, use_container_width=True)
-            
-            # Correlation matrix for numerical variables
-            if len(numerical_cols) > 1:
-                st.markdown(f'<div style="font-size: 1.3rem; font-weight: 600; color: #7c3aed; margin: 1rem 0;">{get_translation("correlation_matrix")}</div>', unsafe_allow_html=True)
-                correlation_matrix = df[numerical_cols].corr()
+            if streaming:
+                # Rows are not kept in streaming mode, so charts come from the quantile sketch
+                fig_hist, fig_box = sketch_distribution_figures(profile.aggregates[selected_num_col], selected_num_col)
+                with col1:
+                    show_chart(fig_hist)
+                with col2:
+                    show_chart(fig_box)
+                    st.caption(get_translation("streaming_chart_note"))
+            else:
+                # Binned and summarized server-side so the chart payload does not grow with the row count
+                values = select_columns(df, [selected_num_col])[selected_num_col].to_numpy(dtype=float, na_value=np.nan)
+                with col1:
+                    # Histogram
+                    fig_hist = histogram_figure(values, selected_num_col, get_translation("frequency_chart"),
+                                                f'{get_translation("distribution")} {selected_num_col}')
+                    fig_hist.update_layout(height=400)
+                    show_chart(fig_hist)
                 
-                fig_corr = px.imshow(correlation_matrix, 
-                                    text_auto=True, 
-                                    aspect="auto",
-                                    color_continuous_scale='RdBu_r',
-                                    title=get_translation("correlation_matrix"))
-                fig_corr.update_layout(height=500)
-                st.plotly_chart(fig_corr, use_container_width=True)
+                with col2:
+                    # Box plot
+                    fig_box = box_figure([values], [selected_num_col])
+                    fig_box.update_layout(title=f'Box Plot {selected_num_col}', height=400, showlegend=False)
+                    show_chart(fig_box)
+            
+            # Correlation matrix for numerical variables (needs rows, so skipped in streaming mode)
+            if len(numerical_cols) > 1 and not streaming:
+                correlation_section(df if data is None else data, numerical_cols, profile, dataset_hash)
         
         # Categorical analysis
         if categorical_cols:
@@ -814,7 +1611,7 @@ def descriptive_analysis(df, numerical_cols, categorical_cols):
             selected_cat_col = st.selectbox(get_translation("select_categorical_column"), categorical_cols)
             
             # Value counts
-            value_counts = df[selected_cat_col].value_counts()
+            value_counts = profile.value_counts(selected_cat_col)
             
             col1, col2 = st.columns(2)
             
@@ -824,7 +1621,7 @@ def descriptive_analysis(df, numerical_cols, categorical_cols):
                                 names=value_counts.index, 
                                 title=f'{get_translation("distribution")} {selected_cat_col}')
                 fig_pie.update_layout(height=400)
-                st.plotly_chart(fig_pie, use_container_width=True)
+                show_chart(fig_pie)
             
             with col2:
                 # Bar chart
@@ -832,23 +1629,36 @@ def descriptive_analysis(df, numerical_cols, categorical_cols):
                                y=value_counts.values,
                                title=f'{get_translation("frequency_chart")} {selected_cat_col}')
                 fig_bar.update_layout(height=400, xaxis_title=selected_cat_col, yaxis_title=get_translation("frequency_chart"))
-                st.plotly_chart(fig_bar, use_container_width=True)
+                show_chart(fig_bar)
             
             # Frequency table
             st.markdown(f'<div style="font-size: 1.3rem; font-weight: 600; color: #0891b2; margin: 1rem 0;">{get_translation("frequency_table")}</div>', unsafe_allow_html=True)
             freq_table = pd.DataFrame({
                 get_translation("category"): value_counts.index,
                 get_translation("frequency"): value_counts.values,
-                get_translation("percentage"): (value_counts.values / len(df) * 100).round(2)
+                get_translation("percentage"): (value_counts.values / n_rows * 100).round(2)
             })
-            st.dataframe(freq_table, use_container_width=True)
+            if approximate:
+                freq_table[get_translation("max_error")] = profile.count_errors(selected_cat_col).values
+            show_frame(freq_table)
+            # High-cardinality columns keep only their most frequent levels
+            hidden, hidden_rows = profile.hidden_levels(selected_cat_col)
+            if hidden > 0:
+                st.caption(get_translation("hidden_levels").format(levels=hidden, rows=hidden_rows))
                 
     except Exception as e:
         st.error(f"Error in descriptive analysis: {str(e)}")
 
-def association_analysis(df, numerical_cols, categorical_cols):
-    """Perform automatic association analysis"""
+def association_analysis(df, numerical_cols, categorical_cols, dataset_hash=None, profile=None, sample=None,
+                         background=False, schema_columns=None, waves=None):
+    """Perform automatic association analysis (previewed on the sample when one is given, queued when background)
+
+    With a column projection, schema_columns lists every column of the file; picking one that
+    was not loaded adds it to the projection and reloads. waves are the running statistics of
+    a wave dataset, which answer the all-pairs tests of the full data.
+    """
     try:
+        var_types = profile.variable_types() if profile is not None else None
         st.markdown(f'<div class="section-header">{get_translation("association_analysis")}</div>', unsafe_allow_html=True)
         
         # Automatic Analysis Section
@@ -860,21 +1670,75 @@ def association_analysis(df, numerical_cols, categorical_cols):
             st.warning("You need at least 2 columns to perform association analysis.")
             return
         
+        variable_options = all_columns
+        if schema_columns is not None:
+            variable_options = all_columns + [col for col in schema_columns if col not in df.columns]
+        
         col1, col2 = st.columns(2)
         with col1:
-            var1 = st.selectbox(get_translation("select_variable_1"), all_columns, key='auto_var1')
+            var1 = st.selectbox(get_translation("select_variable_1"), variable_options, key='auto_var1')
         with col2:
-            available_vars = [col for col in all_columns if col != var1]
+            available_vars = [col for col in variable_options if col != var1]
             var2 = st.selectbox(get_translation("select_variable_2"), available_vars, key='auto_var2')
         
+        missing = [col for col in (var1, var2) if col not in df.columns]
+        if missing:
+            st.session_state['_projection_add'] = missing
+            st.rerun()
+        
+        if sample is not None:
+            preview_df, preview_hash = sample['df'], f"{dataset_hash}:{sample['key']}"
+        else:
+            preview_df, preview_hash = df, dataset_hash
+        
+        resampling = resampling_controls()
+        
         if st.button(get_translation("analyze_button"), key="auto_analyze"):
+            request = {'pair': (dataset_hash, var1, var2), 'exact': sample is None}
+            if background:
+                request['job'] = submit_pair_job(preview_df, preview_hash, var1, var2, var_types, request)
+            st.session_state['pair_request'] = request
+        
+        # The request survives reruns so the exact recompute can replace a sample preview
+        request = st.session_state.get('pair_request')
+        if request is not None and request['pair'] == (dataset_hash, var1, var2):
             try:
-                results = automatic_association_analysis(df, var1, var2)
+                if request.get('job') is not None:
+                    results = job_outcome(request['job'])
+                elif request['exact'] or sample is None:
+                    with st.spinner(get_translation("recompute_running")):
+                        results = cached_association_analysis(df, dataset_hash, var1, var2, var_types=var_types)
+                else:
+                    results = cached_association_analysis(preview_df, preview_hash, var1, var2, var_types=var_types)
                 
                 if results:
+                    # Show analysis type
+                    st.markdown(f"""
+                    <div class="analysis-type-card">
+                        <div class="analysis-type-title">🎯 {ANALYSIS_TYPE_NAMES.get(results['analysis_type'], 'Unknown')}</div>
+                        <div class="analysis-type-desc">Analisis yang direkomendasikan berdasarkan tipe data</div>
+                        <div style="margin-top: 1rem; padding: 0.5rem; background: rgba(255,255,255,0.7); border-radius: 6px;">
+                            <strong>Variable 1:</strong> {results['var1']} ({results['var1_type']})<br>
+                            <strong>Variable 2:</strong> {results['var2']} ({results['var2_type']})
+                        </div>
+                    </div>
+                    """, unsafe_allow_html=True)
+                    
                     # Display results
                     st.markdown("### 📈 Hasil Analisis")
                     
+                    if sample is not None and not request['exact']:
+                        st.warning(f"{get_translation('sample_banner')}: n = {sample['n_rows']:,} / {len(df):,} "
+                                   f"({get_translation('sample_' + sample['method'])})")
+                        if st.button(get_translation("recompute_exact"), key="auto_recompute"):
+                            request['exact'] = True
+                            request['job'] = None
+                            if background:
+                                request['job'] = submit_pair_job(df, dataset_hash, var1, var2, var_types, request)
+                            st.rerun()
+                    elif sample is not None:
+                        st.success(f"{get_translation('exact_result')}: n = {len(df):,}")
+                    
                     # Metrics
                     col1, col2, col3 = st.columns(3)
                     
@@ -895,15 +1759,9 @@ def association_analysis(df, numerical_cols, categorical_cols):
                         """, unsafe_allow_html=True)
                     
                     with col3:
-                        analysis_type_names = {
-                            "chi_square": "Chi-Square Test",
-                            "pearson": "Pearson Correlation",
-                            "spearman": "Spearman Correlation",
-                            "anova": "ANOVA Test"
-                        }
                         st.markdown(f"""
                         <div class="metric-card">
-                            <h4>{analysis_type_names.get(results['analysis_type'], 'Unknown')}</h4>
+                            <h4>{ANALYSIS_TYPE_NAMES.get(results['analysis_type'], 'Unknown')}</h4>
                             <p>α = {results['alpha']}</p>
                         </div>
                         """, unsafe_allow_html=True)
@@ -929,6 +1787,26 @@ def association_analysis(df, numerical_cols, categorical_cols):
                         else:
                             st.markdown("🟢 **Tidak Signifikan** (Gagal Tolak H₀)")
                     
+                    # Resampling runs on the same rows as the displayed test
+                    if resampling is not None and results['analysis_type'] in RESAMPLING_TYPES:
+                        data, data_hash = (df, dataset_hash) if request['exact'] or sample is None else (preview_df, preview_hash)
+                        try:
+                            resampled = resampling_results(data, data_hash, var1, var2, results['analysis_type'],
+                                                           resampling, results['alpha'])
+                        except Exception as e:
+                            st.error(f"Error in resampling inference: {str(e)}")
+                        else:
+                            if resampled is None:
+                                st.info(get_translation("resampling_untestable"))
+                            else:
+                                stopped = f" • {get_translation('resampling_stopped')}" if resampled['stopped_early'] else ""
+                                st.markdown(f"**{get_translation('permutation_p')}** ({resampled['statistic_name']}): "
+                                            f"{resampled['p_value']:.4f} ({resampled['resamples']:,} "
+                                            f"{get_translation('resampling_permutations')}{stopped})")
+                                st.markdown(f"**{get_translation('bootstrap_ci')} {resampled['confidence']:.0%}** "
+                                            f"({resampled['effect_measure']} = {resampled['effect_size']:.4f}): "
+                                            f"[{resampled['ci_low']:.4f}, {resampled['ci_high']:.4f}]")
+                    
                     # Interpretation
                     st.markdown("### 📝 Interpretasi")
                     st.markdown(f"""
@@ -948,23 +1826,32 @@ def association_analysis(df, numerical_cols, categorical_cols):
                     # Visualization
                     if results['visualization'] is not None:
                         st.markdown("### 📊 Visualisasi")
-                        st.plotly_chart(results['visualization'], use_container_width=True)
+                        show_chart(results['visualization'])
                     
                     # Additional details based on analysis type
                     if results['analysis_type'] == "chi_square" and 'contingency_table' in results:
                         st.markdown("### 📋 Tabel Kontingensi")
-                        st.dataframe(results['contingency_table'])
+                        if 'g_statistic' in results:
+                            st.markdown(f"**G-test**: {results['g_statistic']:.4f} (p = {results['g_p_value']:.4f}) • "
+                                        f"**Cramér's V**: {results['cramers_v']:.4f} • "
+                                        f"**{get_translation('degrees_of_freedom')}**: {results['degrees_of_freedom']}")
+                        # High-cardinality tables are shown with rare levels collapsed
+                        if results['contingency_table'].shape != tuple(results.get('levels', results['contingency_table'].shape)):
+                            st.caption(f"{CONTINGENCY_DISPLAY_LEVELS} {get_translation('contingency_collapsed')} "
+                                       f"'{OTHER_LEVEL}' ({results['levels'][0]} × {results['levels'][1]} level).")
+                        show_frame(results['contingency_table'])
                     
                     elif results['analysis_type'] == "anova" and 'group_means' in results:
                         st.markdown("### 📊 Statistik Kelompok")
                         
                         group_stats = pd.DataFrame({
                             'Kelompok': results['group_labels'],
+                            'N': results['group_sizes'],
                             'Mean': results['group_means'],
                             'Std Dev': results['group_stds']
                         })
                         
-                        st.dataframe(group_stats)
+                        show_frame(group_stats)
                     
                     elif results['analysis_type'] in ["pearson", "spearman"] and 'sample_size' in results:
                         st.markdown(f"**Ukuran Sampel**: {results['sample_size']}")
@@ -980,10 +1867,180 @@ def association_analysis(df, numerical_cols, categorical_cols):
                         
             except Exception as e:
                 st.error(f"Error in automatic analysis: {str(e)}")
+        
+        all_pairs_analysis(preview_df, all_columns, preview_hash, var_types, background=background,
+                           waves=waves if sample is None else None)
                         
     except Exception as e:
         st.error(f"Error in association analysis section: {str(e)}")
 
+def all_pairs_analysis(df, all_columns, dataset_hash, var_types=None, background=False, waves=None):
+    """Analyze all variable pairs (or a grid of pairs) and show a corrected results table, heatmap and report
+
+    For a wave dataset the batched engine answers from the running wave statistics.
+    """
+    st.markdown(f'<div style="font-size: 1.4rem; font-weight: 600; color: #7c3aed; margin: 1rem 0;">{get_translation("all_pairs_title")}</div>', unsafe_allow_html=True)
+    
+    selected_cols = st.multiselect(get_translation("all_pairs_columns"), all_columns,
+                                   default=all_columns[:ALL_PAIRS_DEFAULT_COLUMNS], key='all_pairs_columns')
+    grid = st.radio(get_translation("all_pairs_mode"),
+                    [get_translation("all_pairs_mode_all"), get_translation("all_pairs_mode_grid")],
+                    horizontal=True, key="all_pairs_mode") == get_translation("all_pairs_mode_grid")
+    pairs = None
+    if grid:
+        against = st.multiselect(get_translation("all_pairs_against"), all_columns, key='all_pairs_against')
+        pairs = pair_grid(selected_cols, against)
+    # Grid columns are the variables that appear in some pair
+    shown_cols = pair_variables(selected_cols, pairs) or []
+    results_key = (dataset_hash, tuple(selected_cols), None if pairs is None else tuple(pairs))
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        method = st.radio(get_translation("all_pairs_method"),
+                          [get_translation("all_pairs_batched"), get_translation("all_pairs_parallel")],
+                          key="all_pairs_method")
+    with col2:
+        max_workers = st.number_input(get_translation("all_pairs_workers"), min_value=1, max_value=os.cpu_count() or 1,
+                                      value=os.cpu_count() or 1, key="all_pairs_workers")
+    
+    # Correction and alpha only relabel stored results, so changing them reruns no test
+    col1, col2 = st.columns(2)
+    with col1:
+        correction_labels = {get_translation(f"correction_{name}"): name for name in MULTIPLE_TESTING_METHODS}
+        correction = correction_labels[st.selectbox(get_translation("correction_method"), list(correction_labels),
+                                                    index=MULTIPLE_TESTING_METHODS.index('holm'), key="all_pairs_correction")]
+    with col2:
+        alpha = st.number_input(get_translation("all_pairs_alpha"), min_value=0.0001, max_value=0.5, value=0.05,
+                                step=0.01, format="%.4f", key="all_pairs_alpha")
+    
+    if st.button(get_translation("all_pairs_button"), key="all_pairs_analyze"):
+        if len(selected_cols) < 2 and not pairs:
+            st.warning("You need at least 2 columns to perform association analysis.")
+        elif background:
+            parallel = method == get_translation("all_pairs_parallel")
+            columns = list(shown_cols)
+            
+            def run(job):
+                if parallel:
+                    return parallel_pair_tests(df, columns, max_workers=max_workers, progress_callback=job.report,
+                                               should_cancel=lambda: job.cancelled, var_types=var_types, pairs=pairs)
+                if waves is not None:
+                    return incremental_pair_tests(waves, df, columns, var_types=var_types, pairs=pairs)
+                return all_pairs_association(df, columns, var_types=var_types, pairs=pairs)
+            
+            job_id = submit_job(run, label=f"{get_translation('job_all_pairs')}: {len(columns)}",
+                                meta={'kind': 'all_pairs', 'key': results_key, 'columns': list(selected_cols),
+                                      'against': list(against) if grid else None})
+            st.session_state['all_pairs_job'] = {'key': results_key, 'job': job_id}
+        else:
+            try:
+                if method == get_translation("all_pairs_parallel"):
+                    # Streamlit interrupts the run on stop or any widget event; the pool is then shut down
+                    progress = st.progress(0.0, text=get_translation("all_pairs_running"))
+                    st.caption(get_translation("all_pairs_cancel_note"))
+                    results = parallel_pair_tests(
+                        df, shown_cols, max_workers=max_workers,
+                        progress_callback=lambda done, total: progress.progress(done / total, text=f"{done}/{total}"),
+                        var_types=var_types, pairs=pairs
+                    )
+                    progress.empty()
+                elif waves is not None:
+                    with st.spinner(get_translation("all_pairs_running")):
+                        results = incremental_pair_tests(waves, df, shown_cols, var_types=var_types, pairs=pairs)
+                else:
+                    with st.spinner(get_translation("all_pairs_running")):
+                        results = all_pairs_association(df, shown_cols, var_types=var_types, pairs=pairs)
+                if results is not None:
+                    st.session_state['all_pairs'] = {'key': results_key, 'results': results}
+            except Exception as e:
+                st.error(f"Error in all-pairs analysis: {str(e)}")
+    
+    pending = st.session_state.get('all_pairs_job')
+    if pending is not None and pending['key'] == results_key:
+        job = get_job_queue().get(pending['job'])
+        results = job_outcome(pending['job'])
+        if job is not None and job.finished is None:
+            return
+        del st.session_state['all_pairs_job']
+        if results is not None:
+            st.session_state['all_pairs'] = {'key': results_key, 'results': results}
+    
+    stored = st.session_state.get('all_pairs')
+    if stored is None or stored['key'] != results_key:
+        return
+    results = correct_results(stored['results'], alpha, correction)
+    
+    st.markdown(f"**{get_translation('all_pairs_count')}**: {len(results)} • "
+                f"**{get_translation('significant')}**: {int(results['significant'].sum())}")
+    if waves is not None and method == get_translation("all_pairs_batched"):
+        st.caption(get_translation("wave_incremental_note"))
+    display = results.assign(analysis_type=results['analysis_type'].map(ANALYSIS_TYPE_NAMES)).rename(columns={
+        'var1': 'Variabel 1',
+        'var2': 'Variabel 2',
+        'analysis_type': 'Tes',
+        'statistic': 'Statistik Uji',
+        'effect_size': 'Ukuran Efek',
+        'effect_measure': 'Jenis Efek',
+        'strength': 'Kekuatan',
+        'p_value': 'P-value',
+        'p_adjusted': 'P-value (koreksi)',
+        'n': 'N',
+        'significant': 'Signifikan',
+        'var1_type': 'Tipe 1',
+        'var2_type': 'Tipe 2'
+    })
+    show_frame(display)
+    
+    strength = association_strength_matrix(results, shown_cols)
+    fig = px.imshow(strength,
+                    text_auto='.2f' if len(shown_cols) <= ALL_PAIRS_ANNOTATION_LIMIT else False,
+                    aspect="auto",
+                    zmin=0, zmax=1,
+                    color_continuous_scale='Blues',
+                    title=get_translation("all_pairs_heatmap"))
+    fig.update_layout(height=max(500, 18 * len(shown_cols)))
+    show_chart(fig)
+    
+    col1, col2 = st.columns(2)
+    col1.download_button(get_translation("all_pairs_download"), results.to_csv(index=False),
+                         file_name="all_pairs_association.csv", mime="text/csv")
+    col2.download_button(get_translation("all_pairs_report"),
+                         hypothesis_report(results, dataset=dataset_hash, columns=shown_cols,
+                                           pairs=None if pairs is None else [list(pair) for pair in pairs]),
+                         file_name="hypothesis_report.json", mime="application/json")
+
+def registry_page():
+    """Admin view of the datasets resident in the shared registry"""
+    st.markdown(f'<h1 class="main-header">{get_translation("registry_title")}</h1>', unsafe_allow_html=True)
+    registry = get_dataset_cache()
+    stats = registry.stats()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric(get_translation("cache_memory"), f"{stats['nbytes'] / 1024 / 1024:.1f} / {stats['max_bytes'] / 1024 / 1024:.0f} MB")
+    col2.metric(get_translation("registry_sessions"), stats['holders'])
+    col3.metric(get_translation("registry_spills"), stats['spills'])
+    col4.metric(get_translation("registry_evictions"), stats['evictions'])
+    
+    rows = registry.resident()
+    if not rows:
+        st.info(get_translation("registry_empty"))
+    else:
+        resident = pd.DataFrame(rows)
+        resident['nbytes'] = resident['nbytes'] / 1024 / 1024
+        resident['last_used'] = pd.to_datetime(resident['last_used'], unit='s')
+        st.dataframe(resident.rename(columns={
+            'key': 'Kunci',
+            'name': 'Nama File',
+            'storage': 'Penyimpanan',
+            'spilled': 'Di Disk',
+            'refs': 'Sesi',
+            'nbytes': 'Memori (MB)',
+            'last_used': 'Terakhir Dipakai'
+        }), use_container_width=True)
+    
+    if st.button(get_translation("registry_spill_idle"), key="registry_spill_idle"):
+        registry.spill_idle()
+        st.rerun()
+
 def profile_page():
     """Display developer profile page"""
     st.markdown(f'<h1 class="profile-header">{get_translation("profile_title")}</h1>', unsafe_allow_html=True)
@@ -1084,12 +2141,16 @@ def profile_page():
     )
 
 def main():
+    setup_page()
     try:
         # Create navigation
         page = st.sidebar.selectbox(
             "Navigation",
-            ["📊 Analisis Data", "👤 Profil Pembuat"]
+            ["📊 Analisis Data", "👤 Profil Pembuat"] + (["🗄️ Registry Dataset"] if ADMIN_VIEW else [])
         )
+        render_cache_stats()
+        render_job_history()
+        trace = start_trace()
         
         # Language buttons
         col1, col2 = st.columns(2)
@@ -1104,6 +2165,8 @@ def main():
         
         if page == "👤 Profil Pembuat":
             profile_page()
+        elif page == "🗄️ Registry Dataset":
+            registry_page()
         else:
             # Main header
             st.markdown(f'<h1 class="main-header">{get_translation("title")}</h1>', unsafe_allow_html=True)
@@ -1121,20 +2184,72 @@ def main():
                 </div>
                 """, unsafe_allow_html=True)
                 
+                # Sheet choice for workbooks, dialect and pinned dtypes for CSV
+                selection = sheet_controls(uploaded_file) or csv_controls(uploaded_file)
+                # Schema-first load: only the projected columns are read
+                selection, schema_columns = column_controls(uploaded_file, selection)
+                # A wave dataset takes the place of the other storage modes
+                wave_name = wave_controls(uploaded_file)
+                streaming_mode = wave_name is None and uploaded_file.name.endswith('.csv') and st.sidebar.checkbox(
+                    get_translation("streaming_mode"), help=get_translation("streaming_help"), key="streaming_mode")
+                approximate_mode = streaming_mode and st.sidebar.checkbox(
+                    get_translation("approximate_mode"), help=get_translation("approximate_help"), key="approximate_mode")
+                columnar_store = st.sidebar.checkbox(
+                    get_translation("columnar_store"), value=True, help=get_translation("columnar_store_help"), key="columnar_store")
+                
                 # Load data
+                stream_stats = None
                 with st.spinner(get_translation("loading_data")):
-                    df = load_data(uploaded_file)
-                
-                if df is not None:
+                    if wave_name is not None:
+                        dataset_hash, dataset = load_wave_dataset(uploaded_file, wave_name, selection)
+                    elif streaming_mode:
+                        stream_stats = load_stream_stats(uploaded_file, approximate=approximate_mode, selection=selection)
+                        dataset = None if stream_stats is None else {
+                            'df': None,
+                            'numerical_cols': stream_stats.numerical_cols,
+                            'categorical_cols': stream_stats.categorical_cols,
+                            'profile': stream_stats
+                        }
+                    elif columnar_store:
+                        dataset_hash, dataset = load_columnar_dataset(uploaded_file, selection)
+                    else:
+                        dataset_hash, dataset = load_dataset(uploaded_file, selection)
+
+                if dataset is not None:
+                    df = dataset['df']
+                    # Streaming aggregates and the dataset profile answer the same summary queries
+                    profile = dataset['profile']
+                    n_rows, n_columns = profile.shape
+
                     # Success message
-                    st.success(f"{get_translation('success_message')} {df.shape[0]} {get_translation('rows_text')} dan {df.shape[1]} {get_translation('columns_text')}.")
+                    st.success(f"{get_translation('success_message')} {n_rows} {get_translation('rows_text')} dan {n_columns} {get_translation('columns_text')}.")
                     
                     # Show raw data
-                    with st.expander(get_translation("see_raw_data")):
-                        st.dataframe(df.head(), use_container_width=True)
+                    if df is not None:
+                        with st.expander(get_translation("see_raw_data")):
+                            st.dataframe(df.head(), use_container_width=True)
                     
-                    # Get column types
-                    numerical_cols, categorical_cols = get_column_types(df)
+                    # Waves appended so far
+                    waves = dataset.get('waves')
+                    if waves is not None:
+                        with st.expander(f"{get_translation('wave_history')} ({len(waves.waves)})"):
+                            st.caption(get_translation("wave_note"))
+                            st.dataframe(pd.DataFrame([
+                                {'Gelombang': k + 1, 'File': wave['label'], 'Baris': wave['rows'], 'Ditambahkan': wave['added']}
+                                for k, wave in enumerate(waves.waves)
+                            ]), use_container_width=True)
+                    
+                    # Load-time dtype optimization report
+                    dtype_report = dataset.get('dtype_report')
+                    if dtype_report is not None:
+                        with st.expander(get_translation("memory_report")):
+                            before = dtype_report['Memori Awal (KB)'].sum() / 1024
+                            after = dtype_report['Memori Baru (KB)'].sum() / 1024
+                            st.markdown(f"**{get_translation('memory_total')}**: {before:.2f} MB → {after:.2f} MB")
+                            show_frame(dtype_report)
+                    
+                    # Column types are computed once and cached with the dataset
+                    numerical_cols, categorical_cols = dataset['numerical_cols'], dataset['categorical_cols']
                     
                     # Show column information
                     col1, col2 = st.columns(2)
@@ -1150,14 +2265,36 @@ def main():
                             for col in categorical_cols:
                                 st.markdown(f"• {col}")
                     
+                    # Sampled preview for interactive exploration
+                    sample = None
+                    if df is not None:
+                        sample = sampling_controls(dataset_hash, df, numerical_cols, categorical_cols)
+                    if sample is not None:
+                        st.info(f"{get_translation('sample_banner')}: n = {sample['n_rows']:,} / {n_rows:,} "
+                                f"({get_translation('sample_' + sample['method'])}). {get_translation('sample_banner_note')}")
+                    
+                    # Large datasets default to the job queue; small sessions stay synchronous
+                    background = df is not None and st.sidebar.checkbox(
+                        get_translation("background_jobs"), value=n_rows >= BACKGROUND_MIN_ROWS,
+                        help=get_translation("background_help"), key="background_jobs")
+                    
                     # Analysis tabs
                     tab1, tab2 = st.tabs([get_translation("descriptive_analysis"), get_translation("association_analysis")])
                     
                     with tab1:
-                        descriptive_analysis(df, numerical_cols, categorical_cols)
+                        with trace.span("descriptive_analysis"):
+                            descriptive_analysis(df if sample is None else sample['df'], numerical_cols, categorical_cols,
+                                                 profile, streaming=stream_stats is not None,
+                                                 dataset_hash=None if stream_stats is not None else dataset_hash, data=df)
                     
                     with tab2:
-                        association_analysis(df, numerical_cols, categorical_cols)
+                        if stream_stats is not None:
+                            st.info(get_translation("streaming_association_note"))
+                        else:
+                            with trace.span("association_analysis"):
+                                association_analysis(df, numerical_cols, categorical_cols, dataset_hash=dataset_hash,
+                                                     profile=profile, sample=sample, background=background,
+                                                     schema_columns=schema_columns, waves=waves)
                     
                     # Export functionality
                     st.markdown("---")
@@ -1168,7 +2305,8 @@ def main():
                             # Create a summary report
                             summary_data = {
                                 'Metric': [get_translation("total_rows"), get_translation("total_columns"), get_translation("numerical_columns"), get_translation("categorical_columns"), 'Missing Values'],
-                                'Value': [df.shape[0], df.shape[1], len(numerical_cols), len(categorical_cols), df.isnull().sum().sum()]
+                                'Value': [n_rows, n_columns, len(numerical_cols), len(categorical_cols),
+                                          profile.null_counts().sum()]
                             }
                             summary_df = pd.DataFrame(summary_data)
                             
@@ -1217,6 +2355,10 @@ def main():
         </div>
         </div>
                 """, unsafe_allow_html=True)
+        
+        # Sessions that moved on to another file stop counting towards the old one
+        release_unused_datasets()
+        render_instrumentation(trace)
             
     except Exception as e:
         st.error(f"Unexpected error in main application: {str(e)}")
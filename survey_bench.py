@@ -0,0 +1,159 @@
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import itertools
+import tempfile
+import tracemalloc
+import numpy as np
+import pandas as pd
+from survey_core import (
+    OPTIMIZE_DTYPES, read_table, optimize_dtypes, get_column_types, determine_variable_type,
+    determine_analysis_type, automatic_association_analysis, DatasetProfile
+)
+
+ANALYSIS_STAGES = ('pearson', 'spearman', 'chi_square', 'anova')
+# Differences below these are timer and allocator noise, never regressions
+MIN_DELTA_SECONDS = 0.005
+MIN_DELTA_MB = 1.0
+
+def make_survey(rows, columns, cardinality, missing, seed=0):
+    """Synthetic survey: continuous scores, 1-5 Likert items and nominal answers with missing values"""
+    rng = np.random.default_rng(seed)
+    data = {}
+    for k in range(columns):
+        kind = ('score', 'likert', 'choice')[k % 3]
+        if kind == 'score':
+            values = pd.Series(rng.normal(50, 15, rows).round(2))
+        elif kind == 'likert':
+            values = pd.Series(rng.integers(1, 6, rows).astype(float))
+        else:
+            values = pd.Series(np.array([f"option_{i}" for i in range(cardinality)], dtype=object)[
+                rng.integers(0, cardinality, rows)])
+        values[rng.random(rows) < missing] = None
+        data[f"{kind}_{k}"] = values
+    return pd.DataFrame(data)
+
+def pick_pairs(df):
+    """First variable pair routed to each analysis type, as the app would route it"""
+    types = {col: determine_variable_type(df[col]) for col in df.columns}
+    pairs = {}
+    for var1, var2 in itertools.combinations(df.columns, 2):
+        pairs.setdefault(determine_analysis_type(types[var1], types[var2]), (var1, var2))
+    return pairs
+
+def measure(fn, repeat):
+    """Median and best wall time over repeat runs, then peak traced memory of one more run"""
+    # The first call pays for lazy imports (plotly templates, scipy submodules)
+    fn()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    # Tracing slows allocation-heavy code, so memory is measured on its own run
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'median_s': float(np.median(times)), 'min_s': float(min(times)), 'peak_mb': peak / 1024 / 1024}
+
+def bench_config(rows, columns, cardinality, missing, repeat, work_dir):
+    """Time every analysis stage on one synthetic dataset"""
+    config = {'rows': rows, 'columns': columns, 'cardinality': cardinality, 'missing': missing}
+    path = os.path.join(work_dir, f"survey_{rows}_{columns}_{cardinality}_{missing}.csv")
+    make_survey(rows, columns, cardinality, missing).to_csv(path, index=False)
+
+    df = read_table(path)
+    if OPTIMIZE_DTYPES:
+        df, _ = optimize_dtypes(df)
+    stages = {
+        'load_data': lambda: read_table(path),
+        'get_column_types': lambda: get_column_types(df),
+        'determine_variable_type': lambda: [determine_variable_type(df[col]) for col in df.columns],
+        'descriptive_analysis': lambda: DatasetProfile.build(df),
+    }
+    if OPTIMIZE_DTYPES:
+        raw = read_table(path)
+        stages['optimize_dtypes'] = lambda: optimize_dtypes(raw)
+    pairs = pick_pairs(df)
+    for analysis_type in ANALYSIS_STAGES:
+        if analysis_type in pairs:
+            var1, var2 = pairs[analysis_type]
+            stages[f"association_{analysis_type}"] = lambda var1=var1, var2=var2: automatic_association_analysis(df, var1, var2)
+
+    results = []
+    for stage, fn in stages.items():
+        results.append({**config, 'stage': stage, **measure(fn, repeat)})
+        print(f"{rows:>9} x {columns:<4} {stage:<28} {results[-1]['median_s'] * 1000:10.1f} ms "
+              f"{results[-1]['peak_mb']:9.1f} MB", file=sys.stderr)
+    return results
+
+def result_key(result):
+    return (result['rows'], result['columns'], result['cardinality'], result['missing'], result['stage'])
+
+def compare(results, baseline, threshold):
+    """Stages slower or hungrier than the baseline by more than threshold (a fraction)"""
+    base = {result_key(result): result for result in baseline['results']}
+    regressions = []
+    for result in results:
+        old = base.get(result_key(result))
+        if old is None:
+            continue
+        for metric, min_delta in (('median_s', MIN_DELTA_SECONDS), ('peak_mb', MIN_DELTA_MB)):
+            delta = result[metric] - old[metric]
+            if delta > min_delta and result[metric] > old[metric] * (1 + threshold):
+                regressions.append({**{k: result[k] for k in ('rows', 'columns', 'cardinality', 'missing', 'stage')},
+                                    'metric': metric, 'baseline': old[metric], 'current': result[metric]})
+    return regressions
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the survey analysis stages on synthetic datasets")
+    parser.add_argument('-r', '--rows', type=int, nargs='+', default=[10_000, 100_000], help="row counts (default: 10000 100000)")
+    parser.add_argument('-c', '--columns', type=int, nargs='+', default=[12], help="column counts (default: 12)")
+    parser.add_argument('-k', '--cardinality', type=int, nargs='+', default=[4], help="levels of nominal columns (default: 4)")
+    parser.add_argument('-m', '--missing', type=float, nargs='+', default=[0.05], help="missing-value fractions (default: 0.05)")
+    parser.add_argument('-n', '--repeat', type=int, default=3, help="timed runs per stage (default: 3)")
+    parser.add_argument('-o', '--output', default='bench_results.json', help="result file (default: bench_results.json)")
+    parser.add_argument('-b', '--baseline', help="earlier result file to compare against")
+    parser.add_argument('-t', '--threshold', type=float, default=0.25, help="allowed slowdown or memory growth (default: 0.25)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = []
+    with tempfile.TemporaryDirectory(prefix="survey_bench_") as work_dir:
+        for rows, columns, cardinality, missing in itertools.product(args.rows, args.columns, args.cardinality, args.missing):
+            results += bench_config(rows, columns, cardinality, missing, args.repeat, work_dir)
+
+    document = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'repeat': args.repeat,
+        'results': results
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2)
+    print(args.output)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for reg in regressions:
+            unit = 's' if reg['metric'] == 'median_s' else 'MB'
+            print(f"Regression in {reg['stage']} ({reg['rows']} x {reg['columns']}, k={reg['cardinality']}, "
+                  f"missing={reg['missing']}): {reg['metric']} {reg['baseline']:.3f} → {reg['current']:.3f} {unit}",
+                  file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
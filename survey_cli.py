@@ -0,0 +1,101 @@
+import os
+import sys
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from survey_core import SUPPORTED_EXTENSIONS, MULTIPLE_TESTING_METHODS, analyze_file, pair_grid
+
+OUTPUT_FORMATS = ('json', 'csv', 'parquet')
+
+def find_surveys(paths):
+    """Expand directories into the survey files they contain; files are kept as given"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += sorted(os.path.join(path, name) for name in os.listdir(path)
+                            if name.endswith(SUPPORTED_EXTENSIONS))
+        else:
+            files.append(path)
+    return files
+
+def write_results(analysis, output_dir, output_format):
+    """Write the summary and association tables of one survey, returning the paths written"""
+    os.makedirs(output_dir, exist_ok=True)
+    # The full file name keeps survey.csv and survey.xlsx apart
+    stem = os.path.basename(analysis['file'])
+    if output_format == 'json':
+        document = {key: analysis[key] for key in ('file', 'hash', 'rows', 'columns', 'alpha', 'correction')}
+        for table in ('summary', 'associations'):
+            document[table] = json.loads(analysis[table].to_json(orient='records'))
+        path = os.path.join(output_dir, f"{stem}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(document, f, ensure_ascii=False, indent=2)
+        return [path]
+
+    paths = []
+    for table in ('summary', 'associations'):
+        path = os.path.join(output_dir, f"{stem}.{table}.{output_format}")
+        if output_format == 'csv':
+            analysis[table].to_csv(path, index=False)
+        else:
+            analysis[table].to_parquet(path, index=False)
+        paths.append(path)
+    return paths
+
+def process_survey(path, variables, alpha, output_dir, output_format, sheets=None, pairs=None, correction='none'):
+    """Analyze one survey file and write its results (runs in a worker process)"""
+    analysis = analyze_file(path, variables, alpha, sheets, pairs, correction)
+    return write_results(analysis, output_dir, output_format)
+
+def parse_pairs(args):
+    """Explicit VAR1:VAR2 pairs plus the grid of --variables against --against, or None for all pairs"""
+    pairs = [tuple(pair.split(':', 1)) for pair in args.pairs or []]
+    if args.against:
+        if not args.variables:
+            raise SystemExit("--against needs --variables")
+        pairs += pair_grid(args.variables, args.against)
+    return pairs or None
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze survey files without the Streamlit interface")
+    parser.add_argument('inputs', nargs='+', help="CSV/Excel files or directories of surveys")
+    parser.add_argument('-v', '--variables', nargs='+', help="variables to analyze (default: all columns)")
+    parser.add_argument('-s', '--sheets', nargs='+', help="Excel sheets to stack with a source-sheet column, or 'all' (default: first sheet)")
+    parser.add_argument('-p', '--pairs', nargs='+', metavar='VAR1:VAR2', help="test only these variable pairs")
+    parser.add_argument('-g', '--against', nargs='+', help="test every --variables variable against these (a grid of pairs)")
+    parser.add_argument('-a', '--alpha', type=float, default=0.05, help="significance level (default: 0.05)")
+    parser.add_argument('-c', '--correction', choices=MULTIPLE_TESTING_METHODS, default='holm',
+                        help="multiple-testing correction of the p-values (default: holm)")
+    parser.add_argument('-o', '--output-dir', default='results', help="directory for result files (default: results)")
+    parser.add_argument('-f', '--format', choices=OUTPUT_FORMATS, default='json', help="result file format (default: json)")
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help="surveys processed in parallel (default: CPU count)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    files = find_surveys(args.inputs)
+    if not files:
+        print("No survey files found", file=sys.stderr)
+        return 1
+
+    pairs = parse_pairs(args)
+    # With explicit pairs, --variables only defines the grid rows
+    variables = None if pairs else args.variables
+    failed = 0
+    jobs = max(1, min(args.jobs or 1, len(files)))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {executor.submit(process_survey, path, variables, args.alpha, args.output_dir, args.format,
+                                   args.sheets, pairs, args.correction): path for path in files}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                for written in future.result():
+                    print(written)
+            except Exception as e:
+                # One bad survey does not stop the rest of the batch
+                failed += 1
+                print(f"Error analyzing {path}: {str(e)}", file=sys.stderr)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
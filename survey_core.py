@@ -0,0 +1,3050 @@
+import io
+import os
+import re
+import sys
+import csv
+import json
+import pickle
+import codecs
+import time
+import uuid
+import hashlib
+import tempfile
+import warnings
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+from scipy.stats import chi2_contingency, pearsonr, spearmanr, rankdata
+from scipy.stats import f as f_distribution, t as t_distribution, chi2 as chi2_distribution
+from scipy import sparse
+from scipy.cluster.hierarchy import linkage, leaves_list
+from scipy.spatial.distance import squareform
+from survey_parallel import run_pair_tests, read_excel_sheets
+try:
+    import resource
+except ImportError:  # Windows has no getrusage
+    resource = None
+
+# Survey analysis core shared by the Streamlit app and the command line; no UI code here
+
+# Loading
+SUPPORTED_EXTENSIONS = ('.csv', '.xlsx', '.xls')
+# openpyxl is opened read-only by pandas and streams rows; legacy .xls needs xlrd
+EXCEL_ENGINES = {'.xlsx': 'openpyxl', '.xls': 'xlrd'}
+SHEET_COLUMN = "sheet"
+
+def excel_engine(name):
+    """pandas engine for an Excel file name, or None for other files"""
+    return next((engine for ext, engine in EXCEL_ENGINES.items() if name.endswith(ext)), None)
+
+def read_table(source, name=None, sheets=None, source_column=True, max_workers=None, dialect=None, dtypes=None,
+               columns=None):
+    """Read a CSV or Excel survey from a path or file-like object (name gives the extension)
+
+    For Excel, sheets selects the worksheets to read (default: the first); several sheets are
+    parsed in parallel and stacked, with their sheet name in a source column if source_column.
+    For CSV, dialect and dtypes are passed to read_csv. columns limits the load to those columns.
+    """
+    name = name or str(source)
+    engine = excel_engine(name)
+    if engine is not None:
+        if not sheets:
+            return pd.read_excel(source, engine=engine, usecols=column_filter(columns))
+        frames = read_sheets(source, name, sheets, max_workers, columns)
+        return combine_sheets(frames, list(sheets), source_column)
+    if name.endswith('.csv'):
+        return read_csv(source, dialect, dtypes, columns)
+    raise ValueError(f"Unsupported file type: {name}")
+
+def column_filter(columns):
+    """usecols argument keeping only the given columns; sheets lacking some of them still load"""
+    if columns is None:
+        return None
+    wanted = set(columns)
+    return lambda col: col in wanted
+
+def list_sheets(source, name=None):
+    """Worksheet names of an Excel workbook, without parsing any sheet data"""
+    name = name or str(source)
+    with pd.ExcelFile(source, engine=excel_engine(name)) as workbook:
+        return list(workbook.sheet_names)
+
+def read_sheets(source, name, sheets, max_workers=None, columns=None):
+    """Parse the given worksheets (and columns) only, in parallel processes when there are several"""
+    engine = excel_engine(name)
+    sheets = list(sheets)
+    workers = min(len(sheets), max_workers or os.cpu_count() or 1)
+    if workers == 1:
+        # One open workbook serves every sheet
+        with pd.ExcelFile(source, engine=engine) as workbook:
+            return [workbook.parse(sheet, usecols=column_filter(columns)) for sheet in sheets]
+    if isinstance(source, (str, os.PathLike)):
+        return read_excel_sheets(source, sheets, engine, workers, columns)
+    # Worker processes open the workbook by path, so uploads are written out once
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    data = source.getvalue() if hasattr(source, 'getvalue') else source.read()
+    fd, path = tempfile.mkstemp(suffix=os.path.splitext(name)[1])
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        return read_excel_sheets(path, sheets, engine, workers, columns)
+    finally:
+        os.remove(path)
+
+def combine_sheets(frames, sheets, source_column=True):
+    """Stack per-sheet frames (columns are aligned by name), optionally tagging rows with their sheet"""
+    if len(frames) == 1 and not source_column:
+        return frames[0]
+    if source_column:
+        column = SHEET_COLUMN
+        while any(column in frame.columns for frame in frames):
+            column = f"_{column}"
+        frames = [frame.assign(**{column: sheet}) for frame, sheet in zip(frames, sheets)]
+        combined = pd.concat(frames, ignore_index=True)
+        return combined[[column] + [col for col in combined.columns if col != column]]
+    return pd.concat(frames, ignore_index=True)
+
+# CSV ingestion
+CSV_SNIFF_BYTES = 1 << 16
+CSV_SNIFF_LINES = 200
+SCHEMA_SAMPLE_ROWS = 1000
+CSV_DELIMITERS = ",;\t|"
+CSV_ENCODINGS = ('utf-8', 'utf-8-sig', 'utf-16', 'cp1252', 'latin-1')
+COMMA_DECIMAL = re.compile(r"^[-+]?\d+,\d+$")
+DOT_DECIMAL = re.compile(r"^[-+]?\d+\.\d+$")
+# Kinds a column can be pinned to, with the Arrow type and the pandas fallback dtype
+CSV_DTYPES = {
+    'int': (pa.int64(), 'Int64'),
+    'float': (pa.float64(), 'float64'),
+    'str': (pa.string(), 'str'),
+    'category': (pa.dictionary(pa.int32(), pa.string()), 'category'),
+    'bool': (pa.bool_(), 'boolean')
+}
+
+def read_head(source, nbytes=CSV_SNIFF_BYTES):
+    """First bytes of a path or buffer, leaving a buffer's position unchanged"""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            return f.read(nbytes)
+    position = source.tell()
+    head = source.read(nbytes)
+    source.seek(position)
+    return head
+
+def detect_encoding(head):
+    """Text encoding from a file's first bytes: byte-order marks, then UTF-8, then Windows-1252 or Latin-1"""
+    if head.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+    try:
+        head.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError as e:
+        # A character cut in half by the block boundary is still UTF-8
+        if e.reason == 'unexpected end of data':
+            return 'utf-8'
+    try:
+        head.decode('cp1252')
+        return 'cp1252'
+    except UnicodeDecodeError:
+        return 'latin-1'
+
+def head_lines(head, encoding):
+    """Complete lines of a first block, dropping the one cut off at the end"""
+    text = head.decode(encoding, errors='replace')
+    lines = text.splitlines()
+    if len(lines) > 1 and len(head) >= CSV_SNIFF_BYTES and not text.endswith(('\n', '\r')):
+        lines = lines[:-1]
+    return lines
+
+def sniff_csv(head):
+    """Delimiter, encoding and decimal separator of a CSV, guessed from its first block"""
+    encoding = detect_encoding(head)
+    lines = head_lines(head, encoding)[:CSV_SNIFF_LINES]
+    try:
+        delimiter = csv.Sniffer().sniff('\n'.join(lines), delimiters=CSV_DELIMITERS).delimiter
+    except csv.Error:
+        delimiter = ','
+    decimal = '.'
+    if delimiter != ',':
+        # Comma decimals only show up unquoted in files that do not use the comma as delimiter
+        fields = [field.strip() for row in csv.reader(lines[1:], delimiter=delimiter) for field in row]
+        if sum(bool(COMMA_DECIMAL.match(field)) for field in fields) > sum(bool(DOT_DECIMAL.match(field)) for field in fields):
+            decimal = ','
+    return {'delimiter': delimiter, 'encoding': encoding, 'decimal': decimal}
+
+def read_sample(source, name=None, sheets=None, dialect=None, nrows=SCHEMA_SAMPLE_ROWS):
+    """Header and first rows of a survey (the first CSV block, or nrows of the first selected sheet)"""
+    name = name or str(source)
+    engine = excel_engine(name)
+    if engine is not None:
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        return pd.read_excel(source, sheet_name=sheets[0] if sheets else 0, nrows=nrows, engine=engine)
+    head = read_head(source)
+    return head_sample(head, dialect or sniff_csv(head), nrows)
+
+def head_sample(head, dialect, nrows=None):
+    """Frame of the complete lines in a CSV head block"""
+    lines = head_lines(head, dialect['encoding'])
+    if nrows is not None:
+        lines = lines[:nrows + 1]
+    return read_csv(io.BytesIO('\n'.join(lines).encode('utf-8')), {**dialect, 'encoding': 'utf-8'})
+
+def sample_dtypes(sample):
+    """Column kind (a CSV_DTYPES key) per column of a sample frame"""
+    kinds = {}
+    for col in sample.columns:
+        dtype = sample[col].dtype
+        if pd.api.types.is_bool_dtype(dtype):
+            kinds[col] = 'bool'
+        elif pd.api.types.is_integer_dtype(dtype):
+            kinds[col] = 'int'
+        elif pd.api.types.is_float_dtype(dtype):
+            kinds[col] = 'float'
+        else:
+            kinds[col] = 'str'
+    return kinds
+
+def read_csv(source, dialect=None, dtypes=None, columns=None):
+    """Parse a CSV with the multithreaded pyarrow reader, sniffing the dialect when not given
+
+    dtypes maps columns to CSV_DTYPES kinds that are used instead of inference; columns limits
+    conversion to those columns. As with pandas' reader, empty fields are missing and dates
+    stay text. Files pyarrow rejects (ragged rows, duplicate headers) are parsed again by
+    pandas' C engine.
+    """
+    if dialect is None:
+        dialect = sniff_csv(read_head(source))
+    dtypes = dtypes or {}
+    start = None if isinstance(source, (str, os.PathLike)) else source.tell()
+    try:
+        table = pacsv.read_csv(
+            source,
+            read_options=pacsv.ReadOptions(encoding=dialect['encoding']),
+            parse_options=pacsv.ParseOptions(delimiter=dialect['delimiter']),
+            convert_options=pacsv.ConvertOptions(
+                decimal_point=dialect['decimal'],
+                column_types={col: CSV_DTYPES[kind][0] for col, kind in dtypes.items()},
+                strings_can_be_null=True,
+                include_columns=list(columns or [])
+            )
+        )
+        if len(set(table.column_names)) != len(table.column_names):
+            raise pa.ArrowInvalid("duplicate column names")
+    except (pa.ArrowInvalid, pa.ArrowKeyError):
+        if start is not None:
+            source.seek(start)
+        return pd.read_csv(source, sep=dialect['delimiter'], encoding=dialect['encoding'], decimal=dialect['decimal'],
+                           dtype={col: CSV_DTYPES[kind][1] for col, kind in dtypes.items()} or None,
+                           usecols=column_filter(columns))
+    for i, field in enumerate(table.schema):
+        if field.name not in dtypes and (pa.types.is_date(field.type) or pa.types.is_timestamp(field.type)
+                                         or pa.types.is_time(field.type)):
+            table = table.set_column(i, field.name, table.column(i).cast(pa.string()))
+    return table.to_pandas()
+
+def hash_bytes(data):
+    """Content hash used to key cached datasets and results"""
+    return hashlib.sha256(data).hexdigest()
+
+def hash_file(path, block_size=1 << 20):
+    """Content hash of a file on disk, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def get_column_types(df):
+    """Identify numerical and categorical columns"""
+    numerical_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
+    return numerical_cols, categorical_cols
+
+# Load-time dtype optimization
+OPTIMIZE_DTYPES = os.environ.get("SURVEY_OPTIMIZE_DTYPES", "1") != "0"
+CATEGORY_MAX_RATIO = 0.5
+
+def downcast_series(series, max_category_ratio=CATEGORY_MAX_RATIO):
+    """Smallest dtype that represents the series exactly"""
+    if pd.api.types.is_bool_dtype(series):
+        return series
+    if pd.api.types.is_integer_dtype(series):
+        return pd.to_numeric(series, downcast='integer')
+    if pd.api.types.is_float_dtype(series):
+        values = series.to_numpy(dtype=float)
+        valid = values[~np.isnan(values)]
+        if valid.size == 0:
+            return series.astype('float32')
+        if valid.size == values.size and np.array_equal(np.floor(valid), valid) \
+                and np.abs(valid).max() < 2 ** 53:
+            return pd.to_numeric(series.astype('int64'), downcast='integer')
+        if np.array_equal(valid.astype('float32').astype(float), valid):
+            return series.astype('float32')
+        return series
+    if pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+        non_null = series.count()
+        if non_null > 0 and series.nunique() / non_null <= max_category_ratio:
+            return series.astype('category')
+    return series
+
+def optimize_dtypes(df, max_category_ratio=CATEGORY_MAX_RATIO):
+    """Downcast numeric columns and encode low-cardinality text as category, with a memory report"""
+    optimized = {}
+    report = []
+    for col in df.columns:
+        series = df[col]
+        new_series = downcast_series(series, max_category_ratio)
+        before = int(series.memory_usage(deep=True, index=False))
+        after = int(new_series.memory_usage(deep=True, index=False))
+        optimized[col] = new_series
+        report.append({
+            'Kolom': str(col),
+            'Tipe Awal': str(series.dtype),
+            'Tipe Baru': str(new_series.dtype),
+            'Memori Awal (KB)': round(before / 1024, 1),
+            'Memori Baru (KB)': round(after / 1024, 1),
+            'Penghematan (%)': round((1 - after / before) * 100, 1) if before else 0.0
+        })
+    return pd.DataFrame(optimized, index=df.index), pd.DataFrame(report)
+
+def encode_categories(series):
+    """Integer codes (-1 for missing) and sorted labels, reusing categorical codes when present"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy().astype(np.int64), series.cat.categories
+    codes, labels = pd.factorize(series, sort=True)
+    return codes.astype(np.int64), labels
+
+def category_counts(series):
+    """value_counts() computed from integer codes"""
+    codes, labels = encode_categories(series)
+    counts = np.bincount(codes[codes >= 0], minlength=len(labels))
+    value_counts = pd.Series(counts, index=labels, name='count')
+    return value_counts[value_counts > 0].sort_values(ascending=False, kind='stable')
+
+# Sparse contingency tables
+CONTINGENCY_BINCOUNT_CELLS = 1 << 22
+CONTINGENCY_DISPLAY_LEVELS = 20
+OTHER_LEVEL = "Lainnya"
+
+def contingency_counts(codes1, n_levels1, codes2, n_levels2):
+    """Sparse contingency counts from integer codes (-1 is missing), over the levels that occur
+
+    Returns (CSR counts, row level codes, column level codes). Small code spaces are counted
+    with one bincount over combined codes, large ones by sorting the combined codes, so memory
+    follows the occupied cells rather than the product of the level counts.
+    """
+    valid = (codes1 >= 0) & (codes2 >= 0)
+    keys = codes1[valid] * n_levels2 + codes2[valid]
+    if n_levels1 * n_levels2 <= CONTINGENCY_BINCOUNT_CELLS:
+        counts = np.bincount(keys, minlength=n_levels1 * n_levels2)
+        keys = np.flatnonzero(counts)
+        counts = counts[keys]
+    else:
+        keys, counts = np.unique(keys, return_counts=True)
+    # Drop levels that never co-occur, as crosstab does
+    row_levels, rows = np.unique(keys // n_levels2, return_inverse=True)
+    col_levels, cols = np.unique(keys % n_levels2, return_inverse=True)
+    table = sparse.csr_array((counts, (rows, cols)), shape=(len(row_levels), len(col_levels)))
+    return table, row_levels, col_levels
+
+def contingency_statistics(table):
+    """Pearson chi-square, G-test, degrees of freedom and Cramér's V of a sparse table
+
+    Only occupied cells are visited: chi² = Σ O²/E - n and G = 2 Σ O ln(O/E). Tables with one
+    degree of freedom are small and go through chi2_contingency for its Yates correction.
+    """
+    table = sparse.coo_array(table)
+    n = int(table.sum())
+    row_totals = np.asarray(table.sum(axis=1), dtype=float).ravel()
+    col_totals = np.asarray(table.sum(axis=0), dtype=float).ravel()
+    dof = (table.shape[0] - 1) * (table.shape[1] - 1)
+    result = {'n': n, 'dof': dof, 'chi2': 0.0, 'p_value': 1.0, 'g_statistic': 0.0, 'g_p_value': 1.0,
+              'cramers_v': np.nan}
+    if dof == 0:
+        return result
+    if dof == 1:
+        dense = table.toarray()
+        chi2, p_value, _, _ = chi2_contingency(dense)
+        g_statistic, g_p_value, _, _ = chi2_contingency(dense, lambda_="log-likelihood")
+    else:
+        observed = table.data.astype(float)
+        expected = row_totals[table.row] * col_totals[table.col] / n
+        chi2 = max(float((observed * observed / expected).sum() - n), 0.0)
+        g_statistic = max(float(2 * (observed * np.log(observed / expected)).sum()), 0.0)
+        p_value = chi2_distribution.sf(chi2, dof)
+        g_p_value = chi2_distribution.sf(g_statistic, dof)
+    result.update({'chi2': float(chi2), 'p_value': float(p_value), 'g_statistic': float(g_statistic),
+                   'g_p_value': float(g_p_value), 'cramers_v': float(np.sqrt(chi2 / (n * (min(table.shape) - 1))))})
+    return result
+
+def collapse_levels(table, row_labels, col_labels, max_levels=CONTINGENCY_DISPLAY_LEVELS, row_name=None, col_name=None):
+    """Dense frame of a sparse table keeping the max_levels most frequent levels per axis, the rest summed into OTHER_LEVEL"""
+    table = sparse.coo_array(table)
+
+    def axis_map(totals, labels):
+        if len(totals) <= max_levels:
+            return np.arange(len(totals)), list(labels)
+        keep = np.sort(np.argsort(-totals, kind='stable')[:max_levels])
+        mapping = np.full(len(totals), max_levels)
+        mapping[keep] = np.arange(max_levels)
+        return mapping, [labels[k] for k in keep] + [OTHER_LEVEL]
+
+    row_map, row_labels = axis_map(np.asarray(table.sum(axis=1)).ravel(), row_labels)
+    col_map, col_labels = axis_map(np.asarray(table.sum(axis=0)).ravel(), col_labels)
+    counts = np.zeros((len(row_labels), len(col_labels)), dtype=np.int64)
+    np.add.at(counts, (row_map[table.row], col_map[table.col]), table.data)
+    return pd.DataFrame(counts, index=pd.Index(row_labels, name=row_name), columns=pd.Index(col_labels, name=col_name))
+
+# Grouped statistics
+def grouped_moments(codes, values, n_groups):
+    """Per-group count, mean and sum of squared deviations from one bincount pass
+
+    Values are shifted by the overall mean first so the sum-of-squares identity
+    does not lose precision on large, offset data.
+    """
+    shift = values.mean() if values.size else 0.0
+    centered = values - shift
+    counts = np.bincount(codes, minlength=n_groups).astype(float)
+    sums = np.bincount(codes, weights=centered, minlength=n_groups)
+    sum_squares = np.bincount(codes, weights=centered * centered, minlength=n_groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        centered_means = sums / counts
+        ss = np.maximum(sum_squares - sums * centered_means, 0.0)
+    return counts, centered_means + shift, ss
+
+def anova_from_moments(counts, means, ss):
+    """One-way ANOVA F statistic and p-value from per-group sufficient statistics"""
+    n_total = counts.sum()
+    n_groups = counts.size
+    grand_mean = (counts * means).sum() / n_total
+    ss_between = (counts * (means - grand_mean) ** 2).sum()
+    ss_within = ss.sum()
+    df_between = n_groups - 1
+    df_within = n_total - n_groups
+    if df_within <= 0:
+        return np.nan, np.nan
+    with np.errstate(invalid='ignore', divide='ignore'):
+        f_stat = (ss_between / df_between) / (ss_within / df_within)
+    return f_stat, f_distribution.sf(f_stat, df_between, df_within)
+
+def batched_anova(codes, n_groups, values):
+    """One-way ANOVA of every column of values grouped by the same codes, from one sparse product
+
+    Returns F, p-value, η² and the number of observations per column (NaN where fewer than two
+    groups are present or no within-group degrees of freedom remain).
+    """
+    valid = (codes >= 0)[:, None] & ~np.isnan(values)
+    rows = np.flatnonzero(codes >= 0)
+    indicator = sparse.csr_array((np.ones(rows.size), (codes[rows], rows)), shape=(n_groups, len(codes)))
+    weights = valid.astype(float)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        # Shifting by the column means keeps the sum-of-squares identity precise
+        shift = np.nan_to_num(np.nanmean(np.where(valid, values, np.nan), axis=0))
+    centered = np.where(valid, values - shift, 0.0)
+    return anova_from_sums(indicator @ weights, indicator @ centered, indicator @ (centered * centered))
+
+def anova_from_sums(counts, sums, sum_squares):
+    """batched_anova from per-group counts, sums and sums of squares (groups x columns, values shifted alike)"""
+    n_total = counts.sum(axis=0)
+    n_present = (counts > 0).sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = np.where(counts > 0, sums / counts, 0.0)
+        ss_within = np.maximum(sum_squares - sums * means, 0.0).sum(axis=0)
+        grand_mean = sums.sum(axis=0) / n_total
+        ss_between = (counts * (means - grand_mean) ** 2).sum(axis=0)
+        df_between = n_present - 1
+        df_within = n_total - n_present
+        usable = (n_present >= 2) & (df_within > 0)
+        f_stat = np.where(usable, (ss_between / df_between) / (ss_within / df_within), np.nan)
+        ss_total = ss_between + ss_within
+        eta_squared = np.where((n_present >= 2) & (ss_total > 0), ss_between / ss_total, np.nan)
+    p_values = np.where(usable, f_distribution.sf(f_stat, np.maximum(df_between, 1), np.maximum(df_within, 1)), np.nan)
+    return f_stat, p_values, eta_squared, n_total.astype(np.int64)
+
+# Bounded cache
+class LRUCache:
+    """LRU cache bounded by a memory budget; each entry carries its size in 'nbytes'"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return cached entry for key (marking it recently used) or None"""
+        with self._lock:
+            return self._lookup(key)
+
+    def put(self, key, entry):
+        """Store entry and evict least recently used entries above the budget"""
+        with self._lock:
+            self._store(key, entry)
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def _store(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        self._evict(keep=key)
+
+    def _evict(self, keep):
+        # Least recently used first; keep stays even if it alone exceeds the budget
+        for key in list(self._entries):
+            if self._total_bytes() <= self.max_bytes:
+                return
+            if key != keep:
+                del self._entries[key]
+                self.evictions += 1
+
+    def _total_bytes(self):
+        return sum(self._entry_bytes(entry) for entry in self._entries.values())
+
+    @staticmethod
+    def _entry_bytes(entry):
+        # nbytes is either a size or a callable for entries that grow as columns load
+        return entry['nbytes']() if callable(entry['nbytes']) else entry['nbytes']
+
+    def stats(self):
+        """Return hit/miss counters and memory usage"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'nbytes': self._total_bytes(),
+                'max_bytes': self.max_bytes
+            }
+
+# Instrumentation
+def peak_rss():
+    """Peak resident set size of this process in bytes, or None where unsupported"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+class Trace:
+    """Nested timing spans of one run: wall time, CPU time, peak RSS growth and payload bytes
+
+    CPU time is that of the calling thread. Spans close in reverse order of opening; phase()
+    splits the innermost open span into consecutive parts and is ignored when no span is open.
+    """
+
+    enabled = True
+
+    def __init__(self, label=""):
+        self.label = label
+        self.spans = []
+        self._open = []
+        self._seq = 0
+
+    def open(self, name, **meta):
+        """Start a span nested in the innermost open one"""
+        self._seq += 1
+        record = {'seq': self._seq, 'name': name, 'depth': len(self._open), 'ts': time.time(), 'payload': 0,
+                  'phase': False, **meta}
+        record['_clock'] = (time.perf_counter(), time.thread_time(), peak_rss())
+        self._open.append(record)
+        return record
+
+    def close(self):
+        """End the innermost open span, along with its current phase"""
+        if self._open and self._open[-1]['phase']:
+            self._finish(self._open.pop())
+        if self._open:
+            self._finish(self._open.pop())
+
+    def phase(self, name):
+        """End the current phase of the innermost open span and start the next one"""
+        if self._open and self._open[-1]['phase']:
+            self._finish(self._open.pop())
+        if self._open:
+            self.open(name, phase=True)
+
+    @contextmanager
+    def span(self, name, **meta):
+        """Span around a with block, yielding its record for extra fields"""
+        record = self.open(name, **meta)
+        try:
+            yield record
+        finally:
+            # Phases opened inside the block end with it
+            while self._open and self._open[-1] is not record:
+                self._finish(self._open.pop())
+            self.close()
+
+    def add_payload(self, nbytes):
+        """Count bytes sent to the browser towards the innermost open span"""
+        if self._open:
+            self._open[-1]['payload'] += int(nbytes)
+
+    def _finish(self, record):
+        wall, cpu, rss = record.pop('_clock')
+        end_rss = peak_rss()
+        record.update({
+            'wall_s': time.perf_counter() - wall,
+            'cpu_s': time.thread_time() - cpu,
+            'rss_delta': None if rss is None else end_rss - rss
+        })
+        self.spans.append(record)
+
+    def frame(self):
+        """Finished spans in opening order, names indented by nesting depth"""
+        spans = sorted(self.spans, key=lambda span: span['seq'])
+        return pd.DataFrame({
+            'stage': ['  ' * span['depth'] + span['name'] for span in spans],
+            'wall_ms': [span['wall_s'] * 1000 for span in spans],
+            'cpu_ms': [span['cpu_s'] * 1000 for span in spans],
+            'rss_delta_mb': [np.nan if span['rss_delta'] is None else span['rss_delta'] / 1024 / 1024 for span in spans],
+            'payload_kb': [span['payload'] / 1024 for span in spans]
+        })
+
+class NullTrace:
+    """Trace stand-in that records nothing, used when instrumentation is off"""
+
+    enabled = False
+    spans = []
+
+    def open(self, name, **meta):
+        return {}
+
+    def close(self):
+        pass
+
+    def phase(self, name):
+        pass
+
+    @contextmanager
+    def span(self, name, **meta):
+        yield {}
+
+    def add_payload(self, nbytes):
+        pass
+
+NULL_TRACE = NullTrace()
+
+def chrome_trace(traces):
+    """Chrome trace-event document (chrome://tracing, Perfetto) of the given traces' spans"""
+    events = []
+    for trace in traces:
+        for span in trace.spans:
+            meta = {key: value for key, value in span.items()
+                    if key not in ('seq', 'name', 'depth', 'ts', 'phase', 'wall_s')}
+            events.append({
+                'name': span['name'],
+                'cat': trace.label or 'run',
+                'ph': 'X',
+                'ts': span['ts'] * 1e6,
+                'dur': span['wall_s'] * 1e6,
+                'pid': os.getpid(),
+                'tid': 1,
+                'args': meta
+            })
+    return {'traceEvents': sorted(events, key=lambda event: event['ts']), 'displayTimeUnit': 'ms'}
+
+# Streaming ingestion
+STREAM_CHUNK_ROWS = 100_000
+DESCRIBE_QUANTILES = [0.25, 0.5, 0.75]
+HLL_PRECISION = 14
+TOPK_CAPACITY = 1000
+
+class QuantileSketch:
+    """Mergeable KLL-style quantile sketch with memory bounded by k"""
+
+    def __init__(self, k=512, seed=0):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def update(self, values):
+        """Add an array of values (NaNs are ignored)"""
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+        self.n += values.size
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other):
+        """Merge another sketch into this one"""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+
+    def _compress(self):
+        while True:
+            over = [h for h in range(len(self.levels)) if self.levels[h].size > self._capacity(h)]
+            if not over:
+                return
+            h = over[0]
+            if h + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(self.levels[h])
+            # Odd item stays behind so total weight is preserved exactly
+            keep = items[:items.size % 2]
+            items = items[items.size % 2:]
+            offset = int(self._rng.integers(2))
+            self.levels[h] = keep
+            self.levels[h + 1] = np.concatenate([self.levels[h + 1], items[offset::2]])
+
+    def weighted_items(self):
+        """Return retained items and their weights, sorted by value"""
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(items.size, 2.0 ** h) for h, items in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        return values[order], weights[order]
+
+    def quantile(self, qs):
+        """Approximate quantiles (exact while nothing has been compacted)"""
+        qs = np.atleast_1d(np.asarray(qs, dtype=float))
+        if self.n == 0:
+            return np.full(qs.shape, np.nan)
+        if len(self.levels) == 1:
+            return np.quantile(self.levels[0], qs)
+        values, weights = self.weighted_items()
+        cumulative = np.cumsum(weights)
+        idx = np.searchsorted(cumulative, qs * cumulative[-1], side='left')
+        return values[np.clip(idx, 0, values.size - 1)]
+
+    def rank_error(self):
+        """Normalized rank error bound (99% confidence, KLL estimate); 0 while nothing has been compacted"""
+        if len(self.levels) == 1:
+            return 0.0
+        return 2.296 / self.k ** 0.9723
+
+class HyperLogLog:
+    """Mergeable distinct-count sketch with 2**p one-byte registers"""
+
+    def __init__(self, p=HLL_PRECISION):
+        self.p = p
+        self.registers = np.zeros(1 << p, dtype=np.uint8)
+
+    def update(self, values):
+        """Add an array of non-missing values"""
+        hashes = pd.util.hash_array(np.asarray(values))
+        if hashes.size == 0:
+            return
+        bits = 64 - self.p
+        index = (hashes >> np.uint64(bits)).astype(np.intp)
+        rest = hashes & np.uint64((1 << bits) - 1)
+        # Rank of the leftmost set bit; frexp reads the exponent exactly where log2 could round up
+        _, exponent = np.frexp(rest.astype(float))
+        rank = np.where(rest > 0, bits - exponent + 1, bits + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other):
+        self.registers = np.maximum(self.registers, other.registers)
+
+    def estimate(self):
+        m = self.registers.size
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.ldexp(1.0, -self.registers.astype(int)).sum()
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            return m * np.log(m / zeros)
+        return raw
+
+    @property
+    def relative_error(self):
+        """Relative standard error of estimate()"""
+        return 1.04 / np.sqrt(self.registers.size)
+
+class SpaceSaving:
+    """Mergeable top-k summary: counts are upper bounds and count - error lower bounds"""
+
+    def __init__(self, capacity=TOPK_CAPACITY):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype='int64')
+        self.errors = pd.Series(dtype='int64')
+        # Upper bound on the count of any value that is not monitored
+        self.floor = 0
+
+    def update(self, values):
+        """Add an array of non-missing values"""
+        chunk = SpaceSaving(self.capacity)
+        chunk.counts = pd.Series(values).value_counts()
+        chunk.errors = pd.Series(0, index=chunk.counts.index, dtype='int64')
+        chunk._truncate(0)
+        self.merge(chunk)
+
+    def merge(self, other):
+        # A value missing from one summary may have occurred there up to that summary's floor times
+        index = self.counts.index.append(other.counts.index).unique()
+        self.counts = (self.counts.reindex(index, fill_value=self.floor)
+                       + other.counts.reindex(index, fill_value=other.floor))
+        self.errors = (self.errors.reindex(index, fill_value=self.floor)
+                       + other.errors.reindex(index, fill_value=other.floor))
+        self._truncate(self.floor + other.floor)
+
+    def _truncate(self, floor):
+        counts = self.counts.sort_values(ascending=False, kind='stable')
+        if len(counts) > self.capacity:
+            floor = max(floor, int(counts.iloc[self.capacity]))
+            counts = counts.iloc[:self.capacity]
+        self.counts = counts
+        self.errors = self.errors.reindex(counts.index)
+        self.floor = floor
+
+class NumericAggregate:
+    """Running count, mean, M2, min/max, nulls and quantile sketch (and optionally distinct count) for one column"""
+
+    kind = "numeric"
+
+    def __init__(self, sketch_k=512, distinct=False):
+        self.count = 0
+        self.nulls = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.sketch = QuantileSketch(sketch_k)
+        self.distinct = HyperLogLog() if distinct else None
+
+    def update(self, series):
+        values = pd.to_numeric(series, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        valid = values[~np.isnan(values)]
+        self.nulls += values.size - valid.size
+        if valid.size == 0:
+            return
+        chunk = NumericAggregate()
+        chunk.count = valid.size
+        chunk.mean = float(valid.mean())
+        chunk.m2 = float(((valid - chunk.mean) ** 2).sum())
+        chunk.min = float(valid.min())
+        chunk.max = float(valid.max())
+        self._merge_moments(chunk)
+        self.sketch.update(valid)
+        if self.distinct is not None:
+            self.distinct.update(valid)
+
+    def merge(self, other):
+        self.nulls += other.nulls
+        self._merge_moments(other)
+        self.sketch.merge(other.sketch)
+        if self.distinct is not None:
+            self.distinct.merge(other.distinct)
+
+    def _merge_moments(self, other):
+        # Chan et al. pairwise update of mean and sum of squared deviations
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+
+    def describe(self):
+        """Statistics in the same order as DataFrame.describe()"""
+        quartiles = self.sketch.quantile(DESCRIBE_QUANTILES)
+        empty = self.count == 0
+        return pd.Series(
+            [self.count, np.nan if empty else self.mean, self.std, np.nan if empty else self.min,
+             *quartiles, np.nan if empty else self.max],
+            index=['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+        )
+
+class CategoricalAggregate:
+    """Running category counts and nulls for one column"""
+
+    kind = "categorical"
+
+    def __init__(self):
+        self.nulls = 0
+        self.counts = pd.Series(dtype='int64')
+
+    def update(self, series):
+        self.nulls += int(series.isnull().sum())
+        self.counts = self.counts.add(series.value_counts(), fill_value=0).astype('int64')
+
+    def merge(self, other):
+        self.nulls += other.nulls
+        self.counts = self.counts.add(other.counts, fill_value=0).astype('int64')
+
+    def value_counts(self):
+        return self.counts.sort_values(ascending=False, kind='stable')
+
+class TopKAggregate:
+    """Bounded-memory categorical aggregate: space-saving top counts and HyperLogLog distinct count"""
+
+    kind = "categorical"
+
+    def __init__(self, capacity=TOPK_CAPACITY):
+        self.nulls = 0
+        self.top = SpaceSaving(capacity)
+        self.distinct = HyperLogLog()
+
+    def update(self, series):
+        # Text keys keep hashes and counts consistent when a chunk parses a column as numbers
+        values = series.dropna().astype(str).to_numpy(dtype=object)
+        self.nulls += len(series) - values.size
+        self.top.update(values)
+        self.distinct.update(values)
+
+    def merge(self, other):
+        self.nulls += other.nulls
+        self.top.merge(other.top)
+        self.distinct.merge(other.distinct)
+
+    def value_counts(self):
+        return self.top.counts
+
+class StreamingStats:
+    """Mergeable per-column aggregates built chunk by chunk, without keeping rows
+
+    In approximate mode categorical columns keep a bounded top-k summary instead of
+    exact counts, and every column gets a HyperLogLog distinct count.
+    """
+
+    def __init__(self, approximate=False):
+        self.approximate = approximate
+        self.n_rows = 0
+        self.columns = []
+        self.aggregates = {}
+
+    def _new_aggregate(self, kind):
+        if kind == "numeric":
+            return NumericAggregate(distinct=self.approximate)
+        return TopKAggregate() if self.approximate else CategoricalAggregate()
+
+    def update(self, chunk):
+        """Fold one DataFrame chunk into the aggregates"""
+        if not self.columns:
+            # Column kinds are fixed by the first chunk; later chunks are coerced to match
+            self.columns = chunk.columns.tolist()
+            for col in self.columns:
+                kind = "numeric" if pd.api.types.is_numeric_dtype(chunk[col]) else "categorical"
+                self.aggregates[col] = self._new_aggregate(kind)
+        self.n_rows += len(chunk)
+        for col in self.columns:
+            self.aggregates[col].update(chunk[col])
+
+    def merge(self, other):
+        """Merge aggregates of another StreamingStats with the same columns"""
+        if not self.columns:
+            self.approximate = other.approximate
+            self.columns = list(other.columns)
+            self.aggregates = {col: self._new_aggregate(agg.kind) for col, agg in other.aggregates.items()}
+        self.n_rows += other.n_rows
+        for col in self.columns:
+            self.aggregates[col].merge(other.aggregates[col])
+
+    @property
+    def shape(self):
+        return self.n_rows, len(self.columns)
+
+    @property
+    def numerical_cols(self):
+        return [col for col in self.columns if self.aggregates[col].kind == "numeric"]
+
+    @property
+    def categorical_cols(self):
+        return [col for col in self.columns if self.aggregates[col].kind == "categorical"]
+
+    def null_counts(self):
+        return pd.Series({col: self.aggregates[col].nulls for col in self.columns}, dtype='int64')
+
+    def describe(self):
+        return pd.DataFrame({col: self.aggregates[col].describe() for col in self.numerical_cols})
+
+    def value_counts(self, col):
+        return self.aggregates[col].value_counts()
+
+    def hidden_levels(self, col):
+        """Levels, and their rows, missing from value_counts(col); estimates in approximate mode"""
+        agg = self.aggregates[col]
+        if not isinstance(agg, TopKAggregate):
+            return 0, 0
+        counts = agg.top.counts
+        return (max(int(round(agg.distinct.estimate())) - len(counts), 0),
+                max(self.n_rows - agg.nulls - int(counts.sum()), 0))
+
+    def count_errors(self, col):
+        """Maximum overcount of each value in value_counts(col); zero in exact mode"""
+        agg = self.aggregates[col]
+        if isinstance(agg, TopKAggregate):
+            return agg.top.errors
+        return pd.Series(0, index=agg.counts.index, dtype='int64')
+
+    def variable_types(self):
+        """Variable types from estimated distinct counts (approximate mode only)"""
+        return {col: classify_variable(agg.kind == "numeric", round(agg.distinct.estimate()))
+                for col, agg in self.aggregates.items()}
+
+    def error_bounds(self):
+        """Per-column error bounds of the approximate statistics, for display"""
+        rows = []
+        for col, agg in self.aggregates.items():
+            numeric = agg.kind == "numeric"
+            rows.append({
+                'Kolom': str(col),
+                'Kardinalitas (≈)': int(round(agg.distinct.estimate())),
+                'Galat Kardinalitas (±%)': round(agg.distinct.relative_error * 100, 2),
+                'Galat Peringkat Kuantil (±%)': round(agg.sketch.rank_error() * 100, 2) if numeric else np.nan,
+                'Galat Frekuensi Maks': np.nan if numeric else int(agg.top.floor)
+            })
+        return pd.DataFrame(rows)
+
+    def memory_usage(self):
+        """Approximate bytes held by sketches and category counts"""
+        total = 0
+        for agg in self.aggregates.values():
+            if agg.kind == "numeric":
+                total += sum(items.nbytes for items in agg.sketch.levels)
+            elif isinstance(agg, TopKAggregate):
+                total += int(agg.top.counts.memory_usage(deep=True) + agg.top.errors.memory_usage(deep=True))
+            else:
+                total += int(agg.counts.memory_usage(deep=True))
+            if getattr(agg, 'distinct', None) is not None:
+                total += agg.distinct.registers.nbytes
+        return total
+
+def stream_csv_statistics(source, chunksize=STREAM_CHUNK_ROWS, progress_callback=None, approximate=False,
+                          dialect=None, dtypes=None, columns=None):
+    """Read a CSV (path or buffer) in chunks and build StreamingStats"""
+    stats = StreamingStats(approximate)
+    if dialect is None:
+        dialect = sniff_csv(read_head(source))
+    # Pinned dtypes also keep a column's type from changing between chunks
+    dtype = {col: CSV_DTYPES[kind][1] for col, kind in (dtypes or {}).items()} or None
+    with pd.read_csv(source, chunksize=chunksize, sep=dialect['delimiter'], encoding=dialect['encoding'],
+                     decimal=dialect['decimal'], dtype=dtype, usecols=column_filter(columns)) as reader:
+        for chunk in reader:
+            stats.update(chunk)
+            if progress_callback is not None:
+                progress_callback(stats.n_rows)
+    return stats
+
+# Columnar dataset store
+DATASET_DIR = os.environ.get("SURVEY_DATASET_DIR", os.path.join(os.path.expanduser("~"), ".survey_datasets"))
+
+class ColumnarDataset:
+    """Read-only, memory-mapped Parquet dataset that materializes columns on demand
+
+    path is one Parquet file or a list of files with the same columns (the waves of an
+    append-only dataset), read as one dataset in list order; schema, when given, is the Arrow
+    schema every file is cast to as it is read (older waves stored in narrower types).
+    """
+
+    def __init__(self, path, schema=None):
+        self.path = path
+        self._files = [pq.ParquetFile(part, memory_map=True) for part in ([path] if isinstance(path, str) else path)]
+        self.schema = self._files[0].schema_arrow if schema is None else schema
+        names = stored_column_names(self.schema)
+        self.columns = list(names.values())
+        self._stored = {name: stored for stored, name in names.items()}
+        self.num_rows = sum(part.metadata.num_rows for part in self._files)
+        self._loaded = {}
+        self._lock = threading.Lock()
+
+    @property
+    def shape(self):
+        return self.num_rows, len(self.columns)
+
+    def __len__(self):
+        return self.num_rows
+
+    def read(self, columns, cache=True):
+        """Return a DataFrame with only the requested columns (cache=False leaves nothing resident)"""
+        columns = list(columns)
+        with self._lock:
+            if not cache:
+                loaded = {col: self._loaded[col] for col in columns if col in self._loaded}
+                missing = [col for col in columns if col not in loaded]
+                if missing:
+                    frame = self._read_table(missing).to_pandas()
+                    loaded.update({col: frame[self._stored[col]] for col in missing})
+                return pd.DataFrame({col: loaded[col] for col in columns})
+            missing = [col for col in columns if col not in self._loaded]
+            if missing:
+                frame = self._read_table(missing).to_pandas()
+                for col in missing:
+                    self._loaded[col] = frame[self._stored[col]]
+            return pd.DataFrame({col: self._loaded[col] for col in columns})
+
+    def _read_table(self, columns):
+        columns = [self._stored[col] for col in columns]
+        schema = pa.schema([self.schema.field(col) for col in columns], metadata=self.schema.metadata)
+        tables = [part.read(columns=columns, use_pandas_metadata=False) for part in self._files]
+        tables = [table if table.schema.equals(schema) else table.cast(schema) for table in tables]
+        return tables[0] if len(tables) == 1 else pa.concat_tables(tables)
+
+    def head(self, n=5):
+        """First rows of all columns without materializing whole columns"""
+        batch = next(self._files[0].iter_batches(batch_size=n), None)
+        if batch is None:
+            return pd.DataFrame(columns=self.columns)
+        return pa.Table.from_batches([batch]).cast(self.schema).to_pandas().set_axis(self.columns, axis=1)
+
+    def null_counts(self):
+        """Per-column null counts from Parquet row-group statistics"""
+        row_groups = [part.metadata.row_group(rg) for part in self._files for rg in range(part.metadata.num_row_groups)]
+        counts = {}
+        for i, col in enumerate(self.columns):
+            total = 0
+            for row_group in row_groups:
+                stats = row_group.column(i).statistics
+                if stats is None or not stats.has_null_count:
+                    total = None
+                    break
+                total += stats.null_count
+            if total is None:
+                total = int(self.read([col])[col].isnull().sum())
+            counts[col] = total
+        return pd.Series(counts, dtype='int64')
+
+    def column_types(self):
+        """Same classification as get_column_types, derived from the schema alone"""
+        return get_column_types(self.schema.empty_table().to_pandas().set_axis(self.columns, axis=1))
+
+    def memory_usage(self):
+        """Bytes held by materialized columns"""
+        return int(sum(series.memory_usage(deep=True) for series in self._loaded.values()))
+
+    def release(self):
+        """Drop materialized columns; later reads go back to the memory-mapped file"""
+        with self._lock:
+            self._loaded.clear()
+
+def select_columns(data, columns):
+    """Column projection for either an in-memory DataFrame or a ColumnarDataset"""
+    if isinstance(data, pd.DataFrame):
+        return data[list(columns)]
+    return data.read(columns)
+
+# Schema metadata key holding column names that Parquet had to store as text
+COLUMN_NAMES_KEY = b'survey_column_names'
+
+def columnar_table(df):
+    """Arrow table of a DataFrame, normalizing what Parquet cannot store
+
+    Parquet column names are text; non-text names (e.g. the integer headers of a header-less
+    sheet) are kept in the schema metadata so ColumnarDataset can restore them.
+    """
+    names = list(df.columns)
+    df = df.copy()
+    df.columns = [str(col) for col in df.columns]
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed-type columns (e.g. numbers and text in one survey item) are stored as text
+        for col in df.columns:
+            is_categorical = isinstance(df[col].dtype, pd.CategoricalDtype)
+            if is_categorical or pd.api.types.is_object_dtype(df[col]):
+                values = df[col].astype(object)
+                df[col] = values.astype(str).where(values.notna())
+                if is_categorical:
+                    df[col] = df[col].astype('category')
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    if any(not isinstance(name, str) for name in names):
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                               COLUMN_NAMES_KEY: json.dumps(names, default=str).encode()})
+    return table
+
+def stored_column_names(schema):
+    """Original column name for each Parquet column name of a schema written by columnar_table"""
+    names = json.loads((schema.metadata or {}).get(COLUMN_NAMES_KEY, b'null'))
+    return dict(zip(schema.names, names if names is not None else schema.names))
+
+def write_columnar(df, path):
+    """Write DataFrame (or Arrow table) to Parquet atomically"""
+    table = df if isinstance(df, pa.Table) else columnar_table(df)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+
+def read_dtype_report(file_hash):
+    """Memory report saved next to a columnar dataset, if any"""
+    path = os.path.join(DATASET_DIR, f"{file_hash}.dtypes.csv")
+    return pd.read_csv(path) if os.path.exists(path) else None
+
+# Shared dataset registry
+DATASET_LEASE_SECONDS = int(os.environ.get("SURVEY_DATASET_LEASE_MIN", "30")) * 60
+
+class DatasetRegistry(LRUCache):
+    """Process-wide, reference-counted registry of read-only datasets shared by all sessions
+
+    Holders (sessions) acquire the entries they use and keep them with a lease that expires if the
+    session goes away. Above the memory ceiling, entries shrink least recently used first, idle
+    ones before held ones: in-memory DataFrames are spilled to Parquet and reopened memory-mapped,
+    memory-mapped datasets drop their materialized columns, and idle entries that cannot shrink
+    are removed. Held entries are never removed. Spill files are written after the lock is
+    released, so a large spill does not block other sessions' lookups.
+    """
+
+    def __init__(self, max_bytes, lease_seconds=DATASET_LEASE_SECONDS, spill_dir=None):
+        super().__init__(max_bytes)
+        self.lease_seconds = lease_seconds
+        self.spill_dir = spill_dir or os.path.join(DATASET_DIR, "spill")
+        self.spills = 0
+        self._holders = {}
+        self._last_used = {}
+        # Frames chosen for spilling whose Parquet file is not written yet, and those no thread has taken
+        self._spilling = {}
+        self._unclaimed = []
+
+    def get(self, key):
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                self._last_used[key] = time.time()
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._last_used[key] = time.time()
+            self._store(key, entry)
+            spills = self._claim_spills()
+        self._write_spills(spills)
+
+    def acquire(self, key, holder):
+        """Count holder as a user of key until its lease runs out or it retains other keys"""
+        with self._lock:
+            keys = self._holders[holder][0] if holder in self._holders else set()
+            keys.add(key)
+            self._holders[holder] = (keys, time.time())
+
+    def retain(self, holder, keys):
+        """Release every key of holder except keys"""
+        with self._lock:
+            keys = set(keys)
+            if keys:
+                self._holders[holder] = (keys, time.time())
+            else:
+                self._holders.pop(holder, None)
+
+    def refcounts(self):
+        """Number of live holders per key"""
+        with self._lock:
+            return self._refcounts()
+
+    def _refcounts(self):
+        expired = time.time() - self.lease_seconds
+        for holder in [holder for holder, (_, seen) in self._holders.items() if seen < expired]:
+            del self._holders[holder]
+        counts = {}
+        for keys, _ in self._holders.values():
+            for key in keys:
+                counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def _evict(self, keep):
+        refs = self._refcounts()
+        # Stable sort: idle entries first, each group in least recently used order
+        for key in sorted(self._entries, key=lambda key: refs.get(key, 0) > 0):
+            if self._total_bytes() <= self.max_bytes:
+                return
+            if key == keep:
+                continue
+            # Spilled entries that use no memory stay, so their sessions skip the re-parse
+            if not self._shrink(key) and not refs.get(key) and self._entry_bytes(self._entries[key]) > 0:
+                self._remove(key)
+
+    def _total_bytes(self):
+        # Frames being spilled are about to leave memory
+        return sum(self._entry_bytes(entry) for key, entry in self._entries.items() if key not in self._spilling)
+
+    def _shrink(self, key):
+        if key in self._spilling:
+            return True
+        entry = self._entries[key]
+        data = entry.get('df')
+        if isinstance(data, pd.DataFrame):
+            path = os.path.join(self.spill_dir, f"{hash_bytes(str(key).encode())}.parquet")
+            self._spilling[key] = entry
+            self._unclaimed.append((key, entry, data, path))
+            return True
+        if isinstance(data, ColumnarDataset) and data.memory_usage() > 0:
+            data.release()
+            return True
+        return False
+
+    def _claim_spills(self):
+        spills, self._unclaimed = self._unclaimed, []
+        return spills
+
+    def _write_spills(self, spills):
+        """Write claimed frames to Parquet without the lock, then swap the memory-mapped copy in"""
+        for key, entry, data, path in spills:
+            try:
+                os.makedirs(self.spill_dir, exist_ok=True)
+                write_columnar(data, path)
+                dataset = ColumnarDataset(path)
+            except Exception:
+                # The frame stays in memory and can be spilled again later
+                with self._lock:
+                    self._spilling.pop(key, None)
+                continue
+            with self._lock:
+                self._spilling.pop(key, None)
+                if self._entries.get(key) is entry:
+                    # Sessions still holding the DataFrame keep it until their run ends
+                    entry['df'] = dataset
+                    entry['nbytes'] = dataset.memory_usage
+                    entry['spilled'] = path
+                    self.spills += 1
+                    continue
+            # Removed or replaced while the file was written
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._last_used.pop(key, None)
+        self._spilling.pop(key, None)
+        self.evictions += 1
+        if entry.get('spilled'):
+            # Open memory maps stay valid after the file is unlinked
+            try:
+                os.remove(entry['spilled'])
+            except OSError:
+                pass
+
+    def spill_idle(self):
+        """Shrink every entry no session holds, regardless of the memory ceiling"""
+        with self._lock:
+            refs = self._refcounts()
+            for key in list(self._entries):
+                if not refs.get(key):
+                    self._shrink(key)
+            spills = self._claim_spills()
+        self._write_spills(spills)
+
+    def resident(self):
+        """One row per entry for the admin view, most recently used first"""
+        with self._lock:
+            refs = self._refcounts()
+            rows = []
+            for key, entry in reversed(self._entries.items()):
+                data = entry.get('df')
+                rows.append({
+                    'key': key,
+                    'name': entry.get('name'),
+                    'storage': 'memory' if isinstance(data, pd.DataFrame) else
+                               'parquet' if isinstance(data, ColumnarDataset) else 'aggregates',
+                    'spilled': bool(entry.get('spilled')),
+                    'refs': refs.get(key, 0),
+                    'nbytes': self._entry_bytes(entry),
+                    'last_used': self._last_used.get(key)
+                })
+            return rows
+
+    def stats(self):
+        stats = super().stats()
+        with self._lock:
+            self._refcounts()
+            stats['spills'] = self.spills
+            stats['holders'] = len(self._holders)
+        return stats
+
+# Variable-type thresholds; part of every result cache key so changing them invalidates results
+ORDINAL_MAX_UNIQUE = 10
+NOMINAL_MAX_UNIQUE = 5
+
+def classify_variable(is_numeric, n_unique):
+    """Variable type from dtype kind and cardinality, so a stored profile can be reclassified"""
+    if is_numeric:
+        if n_unique <= ORDINAL_MAX_UNIQUE:
+            return "ordinal"
+        else:
+            return "continuous"
+    else:
+        if n_unique <= NOMINAL_MAX_UNIQUE:
+            return "nominal"
+        else:
+            return "ordinal"
+
+def determine_variable_type(series):
+    """Determine variable type for automatic analysis"""
+    return classify_variable(pd.api.types.is_numeric_dtype(series), series.nunique())
+
+def determine_analysis_type(var1_type, var2_type):
+    """Determine appropriate analysis type based on variable types"""
+    if var1_type == "nominal" and var2_type == "nominal":
+        return "chi_square"
+    elif var1_type == "nominal" and var2_type in ["ordinal", "continuous"]:
+        return "anova"
+    elif var1_type in ["ordinal", "continuous"] and var2_type == "nominal":
+        return "anova"
+    elif var1_type == "ordinal" and var2_type == "ordinal":
+        return "spearman"
+    elif var1_type in ["ordinal", "continuous"] and var2_type in ["ordinal", "continuous"]:
+        return "pearson"
+    else:
+        return "chi_square"
+
+def numeric_route(analysis_type, n_numeric):
+    """Test actually run for a routed pair with n_numeric numeric sides
+
+    Text "ordinal" columns cannot enter a correlation or be ANOVA values, so such pairs
+    become ANOVA (one numeric side) or chi-square (no numeric side).
+    """
+    if analysis_type in ("pearson", "spearman") and n_numeric < 2:
+        return "anova" if n_numeric == 1 else "chi_square"
+    if analysis_type == "anova" and n_numeric == 0:
+        return "chi_square"
+    return analysis_type
+
+def get_correlation_strength(correlation):
+    """Get correlation strength description"""
+    abs_corr = abs(correlation)
+    if abs_corr >= 0.8:
+        return "sangat kuat"
+    elif abs_corr >= 0.6:
+        return "kuat"
+    elif abs_corr >= 0.4:
+        return "sedang"
+    elif abs_corr >= 0.2:
+        return "lemah"
+    else:
+        return "sangat lemah"
+
+# Rendering: figure payloads stay bounded however many rows are plotted
+SCATTER_WEBGL_MIN_POINTS = 5_000
+SCATTER_DENSITY_MIN_POINTS = 100_000
+DENSITY_BINS = 100
+HISTOGRAM_BINS = 30
+BOX_MAX_OUTLIERS = 500
+FIGURE_COLORS = px.colors.qualitative.Plotly
+
+def scatter_figure(x, y, x_label, y_label, title):
+    """Scatter plot as SVG, WebGL above SCATTER_WEBGL_MIN_POINTS, or a binned density above SCATTER_DENSITY_MIN_POINTS"""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if x.size >= SCATTER_DENSITY_MIN_POINTS:
+        counts, x_edges, y_edges = np.histogram2d(x, y, bins=DENSITY_BINS)
+        # Empty bins stay blank so the shape of the point cloud remains visible
+        fig = go.Figure(go.Heatmap(
+            x=(x_edges[:-1] + x_edges[1:]) / 2,
+            y=(y_edges[:-1] + y_edges[1:]) / 2,
+            z=np.where(counts > 0, counts, np.nan).T,
+            colorscale="Blues",
+            colorbar=dict(title="Frekuensi")
+        ))
+    else:
+        trace = go.Scattergl if x.size >= SCATTER_WEBGL_MIN_POINTS else go.Scatter
+        fig = go.Figure(trace(x=x, y=y, mode='markers', showlegend=False))
+    fig.update_layout(title=title, xaxis_title=x_label, yaxis_title=y_label)
+    return fig
+
+def histogram_figure(values, x_label, y_label, title, nbins=HISTOGRAM_BINS):
+    """Histogram binned server-side, so only bin counts are sent to the browser"""
+    values = np.asarray(values, dtype=float)
+    counts, edges = np.histogram(values[~np.isnan(values)], bins=nbins)
+    fig = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges)))
+    fig.update_layout(title=title, xaxis_title=x_label, yaxis_title=y_label, bargap=0)
+    return fig
+
+def box_statistics(values):
+    """Quartiles, Tukey fences, mean, sd and at most BOX_MAX_OUTLIERS outliers of one group"""
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    q1, median, q3 = np.quantile(values, DESCRIBE_QUANTILES)
+    iqr = q3 - q1
+    is_outlier = (values < q1 - 1.5 * iqr) | (values > q3 + 1.5 * iqr)
+    inside = values[~is_outlier]
+    outliers = np.sort(values[is_outlier])
+    if outliers.size > BOX_MAX_OUTLIERS:
+        # Evenly spaced over the sorted outliers, always keeping both extremes
+        outliers = outliers[np.linspace(0, outliers.size - 1, BOX_MAX_OUTLIERS).round().astype(int)]
+    return {
+        'q1': q1, 'median': median, 'q3': q3,
+        'lowerfence': inside.min(), 'upperfence': inside.max(),
+        'mean': values.mean(), 'sd': values.std(ddof=1) if values.size > 1 else 0.0,
+        'outliers': outliers
+    }
+
+def box_figure(groups, names):
+    """Box plots drawn from precomputed statistics; outliers are a separate marker trace per group"""
+    fig = go.Figure()
+    for i, (group, name) in enumerate(zip(groups, names)):
+        stats = box_statistics(group)
+        color = FIGURE_COLORS[i % len(FIGURE_COLORS)]
+        fig.add_trace(go.Box(
+            x=[name], name=name, legendgroup=name, marker_color=color,
+            q1=[stats['q1']], median=[stats['median']], q3=[stats['q3']],
+            lowerfence=[stats['lowerfence']], upperfence=[stats['upperfence']],
+            mean=[stats['mean']], sd=[stats['sd']]
+        ))
+        if stats['outliers'].size:
+            fig.add_trace(go.Scatter(
+                x=[name] * stats['outliers'].size, y=stats['outliers'], mode='markers',
+                name=name, legendgroup=name, showlegend=False, marker_color=color
+            ))
+    return fig
+
+def automatic_association_analysis(df, var1, var2, alpha=0.05, include_figure=True, var_types=None, trace=None):
+    """Perform automatic association analysis based on variable types (raises on failure)"""
+    # Read, test and visualization become phases of the caller's open trace span
+    trace = trace or NULL_TRACE
+    trace.phase("read")
+    # Only the two analyzed columns are materialized
+    df = select_columns(df, [var1, var2])
+    trace.phase("test")
+    
+    # Determine variable types (from the dataset profile when given)
+    if var_types is not None:
+        var1_type, var2_type = var_types[var1], var_types[var2]
+    else:
+        var1_type = determine_variable_type(df[var1])
+        var2_type = determine_variable_type(df[var2])
+    
+    # Determine analysis type
+    numeric1, numeric2 = pd.api.types.is_numeric_dtype(df[var1]), pd.api.types.is_numeric_dtype(df[var2])
+    analysis_type = numeric_route(determine_analysis_type(var1_type, var2_type), numeric1 + numeric2)
+    
+    results = {
+        'var1': var1,
+        'var2': var2,
+        'var1_type': var1_type,
+        'var2_type': var2_type,
+        'analysis_type': analysis_type,
+        'alpha': alpha,
+        'interpretation': '',
+        'recommendation': '',
+        'visualization': None
+    }
+    
+    if analysis_type == "chi_square":
+        # Chi-Square Test on sparse counts; only the displayed table is dense, with rare levels collapsed
+        codes1, labels1 = encode_categories(df[var1])
+        codes2, labels2 = encode_categories(df[var2])
+        table, row_levels, col_levels = contingency_counts(codes1, len(labels1), codes2, len(labels2))
+        stats = contingency_statistics(table)
+        chi2, p_value = stats['chi2'], stats['p_value']
+        contingency_table = collapse_levels(table, labels1[row_levels], labels2[col_levels], row_name=var1, col_name=var2)
+        
+        results.update({
+            'test_statistic': chi2,
+            'p_value': p_value,
+            'degrees_of_freedom': stats['dof'],
+            'g_statistic': stats['g_statistic'],
+            'g_p_value': stats['g_p_value'],
+            'cramers_v': stats['cramers_v'],
+            'contingency_table': contingency_table,
+            'levels': table.shape
+        })
+        
+        # Interpretation
+        if p_value < alpha:
+            results['interpretation'] = f'Terdapat asosiasi yang signifikan antara {var1} dan {var2} (χ²={chi2:.3f}, p={p_value:.4f})'
+            results['recommendation'] = 'Variabel-variabel ini tidak independen dan memiliki hubungan statistik'
+        else:
+            results['interpretation'] = f'Tidak ada asosiasi signifikan antara {var1} dan {var2} (χ²={chi2:.3f}, p={p_value:.4f})'
+            results['recommendation'] = 'Variabel-variabel ini independen secara statistik'
+        
+        if not include_figure:
+            return results
+        trace.phase("visualization")
+        
+        # Visualization
+        fig = px.imshow(
+            contingency_table,
+            title=f'Hubungan antara {var1} dan {var2}',
+            labels=dict(x=var2, y=var1, color="Frekuensi"),
+            color_continuous_scale="Blues"
+        )
+        results['visualization'] = fig
+        
+    elif analysis_type == "anova":
+        # ANOVA Test, grouped by the non-numeric side
+        if not numeric1:
+            group_var, value_var = var1, var2
+        else:
+            group_var, value_var = var2, var1
+        
+        # Per-group sufficient statistics from integer category codes in one pass
+        codes, labels = encode_categories(df[group_var])
+        values = df[value_var].to_numpy(dtype=float, na_value=np.nan)
+        valid = (codes >= 0) & ~np.isnan(values)
+        codes, values = codes[valid], values[valid]
+        counts, means, ss = grouped_moments(codes, values, len(labels))
+        present = counts > 0
+        
+        if present.sum() < 2:
+            results['interpretation'] = 'Tidak cukup kelompok data untuk melakukan ANOVA'
+            results['recommendation'] = 'Periksa kategori variabel dan pastikan ada cukup data di setiap kelompok'
+            return results
+        
+        counts, means, ss = counts[present], means[present], ss[present]
+        f_stat, p_value = anova_from_moments(counts, means, ss)
+        group_labels = labels[present]
+        
+        results.update({
+            'test_statistic': f_stat,
+            'p_value': p_value,
+            'group_means': means.tolist(),
+            'group_stds': np.sqrt(ss / counts).tolist(),
+            'group_sizes': counts.astype(int).tolist(),
+            'group_labels': group_labels
+        })
+        
+        # Interpretation
+        if p_value < alpha:
+            results['interpretation'] = f'Terdapat perbedaan signifikan antara kelompok-kelompok (F={f_stat:.3f}, p={p_value:.4f})'
+            results['recommendation'] = 'Setidaknya satu kelompok berbeda secara signifikan dari yang lain'
+        else:
+            results['interpretation'] = f'Tidak ada perbedaan signifikan antara kelompok-kelompok (F={f_stat:.3f}, p={p_value:.4f})'
+            results['recommendation'] = 'Semua kelompok memiliki rata-rata yang tidak berbeda secara signifikan'
+        
+        if not include_figure:
+            return results
+        trace.phase("visualization")
+        
+        # Visualization: groups are slices of one array sorted by code
+        order = np.argsort(codes, kind='stable')
+        groups = np.split(values[order], np.cumsum(counts).astype(int)[:-1])
+        fig = box_figure(groups, [str(label) for label in group_labels])
+        
+        if group_var == var1:
+            fig.update_layout(
+                title=f'Distribusi {var2} berdasarkan {var1}',
+                xaxis_title=var1,
+                yaxis_title=var2
+            )
+        else:
+            fig.update_layout(
+                title=f'Distribusi {var1} berdasarkan {var2}',
+                xaxis_title=var2,
+                yaxis_title=var1
+            )
+        
+        results['visualization'] = fig
+        
+    elif analysis_type == "pearson":
+        # Pearson Correlation
+        x = df[var1].dropna()
+        y = df[var2].dropna()
+        
+        # Align data
+        common_idx = x.index.intersection(y.index)
+        x = x.loc[common_idx]
+        y = y.loc[common_idx]
+        
+        if len(x) < 3:
+            results['interpretation'] = 'Tidak cukup data untuk melakukan korelasi Pearson'
+            results['recommendation'] = 'Diperlukan setidaknya 3 pasang data yang valid'
+            return results
+        
+        corr, p_value = pearsonr(x, y)
+        
+        results.update({
+            'correlation': corr,
+            'p_value': p_value,
+            'sample_size': len(x)
+        })
+        
+        # Interpretation
+        if p_value < alpha:
+            strength = get_correlation_strength(corr)
+            direction = 'positif' if corr > 0 else 'negatif'
+            results['interpretation'] = f'Terdapat korelasi {direction} yang signifikan dengan kekuatan {strength} (r={corr:.3f}, p={p_value:.4f})'
+            results['recommendation'] = f'Variabel {var1} dan {var2} memiliki hubungan linear {direction} yang {strength}'
+        else:
+            results['interpretation'] = f'Tidak ada korelasi signifikan antara variabel (r={corr:.3f}, p={p_value:.4f})'
+            results['recommendation'] = 'Tidak ada bukti hubungan linear antara variabel-variabel ini'
+        
+        if not include_figure:
+            return results
+        trace.phase("visualization")
+        
+        # Visualization
+        fig = scatter_figure(x, y, var1, var2, f'Hubungan antara {var1} dan {var2}')
+        
+        # Add trendline
+        coeffs = np.polyfit(x, y, 1)
+        trendline = np.poly1d(coeffs)
+        x_trend = np.linspace(x.min(), x.max(), 100)
+        y_trend = trendline(x_trend)
+        
+        fig.add_trace(go.Scatter(
+            x=x_trend, y=y_trend,
+            mode='lines',
+            name=f'Trendline (r={corr:.3f})',
+            line=dict(color='red', dash='dash')
+        ))
+        
+        results['visualization'] = fig
+        
+    elif analysis_type == "spearman":
+        # Spearman Correlation
+        x = df[var1].dropna()
+        y = df[var2].dropna()
+        
+        # Align data
+        common_idx = x.index.intersection(y.index)
+        x = x.loc[common_idx]
+        y = y.loc[common_idx]
+        
+        if len(x) < 3:
+            results['interpretation'] = 'Tidak cukup data untuk melakukan korelasi Spearman'
+            results['recommendation'] = 'Diperlukan setidaknya 3 pasang data yang valid'
+            return results
+        
+        corr, p_value = spearmanr(x, y)
+        
+        results.update({
+            'correlation': corr,
+            'p_value': p_value,
+            'sample_size': len(x)
+        })
+        
+        # Interpretation
+        if p_value < alpha:
+            strength = get_correlation_strength(corr)
+            direction = 'positif' if corr > 0 else 'negatif'
+            results['interpretation'] = f'Terdapat korelasi {direction} yang signifikan dengan kekuatan {strength} (ρ={corr:.3f}, p={p_value:.4f})'
+            results['recommendation'] = f'Variabel {var1} dan {var2} memiliki hubungan monoton {direction} yang {strength}'
+        else:
+            results['interpretation'] = f'Tidak ada korelasi signifikan antara variabel (ρ={corr:.3f}, p={p_value:.4f})'
+            results['recommendation'] = 'Tidak ada bukti hubungan monoton antara variabel-variabel ini'
+        
+        if not include_figure:
+            return results
+        trace.phase("visualization")
+        
+        # Visualization
+        fig = scatter_figure(x, y, var1, var2, f'Hubungan antara {var1} dan {var2}')
+        
+        results['visualization'] = fig
+    
+    return results
+
+# All-pairs association engine
+ANALYSIS_TYPE_NAMES = {
+    "chi_square": "Chi-Square Test",
+    "pearson": "Pearson Correlation",
+    "spearman": "Spearman Correlation",
+    "anova": "ANOVA Test"
+}
+
+def pairwise_correlation(matrix):
+    """Pairwise-complete correlation matrix, pair counts and p-values from masked matrix products"""
+    values = np.asarray(matrix, dtype=float)
+    mask = ~np.isnan(values)
+    # Centering by column means keeps the sum-of-products identities numerically stable
+    centered = np.where(mask, values - np.nanmean(values, axis=0), 0.0)
+    weights = mask.astype(float)
+    n = weights.T @ weights
+    sums = centered.T @ weights
+    sum_squares = (centered * centered).T @ weights
+    cross = centered.T @ centered
+    corr = correlation_from_sums(n, sums, sum_squares, cross)
+    return corr, n, correlation_p_values(corr, n)
+
+def correlation_p_values(corr, n):
+    """Two-sided t-test p-values of correlations over n pairwise-complete observations"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        dof = n - 2
+        t_stat = np.abs(corr) * np.sqrt(dof / (1.0 - corr ** 2))
+        return np.where(dof > 0, 2 * t_distribution.sf(t_stat, np.maximum(dof, 1)), np.nan)
+
+def pair_grid(rows, columns):
+    """Pairs of every row variable with every column variable, without self or repeated pairs"""
+    pairs, seen = [], set()
+    for var1 in rows:
+        for var2 in columns:
+            if var1 != var2 and frozenset((var1, var2)) not in seen:
+                seen.add(frozenset((var1, var2)))
+                pairs.append((var1, var2))
+    return pairs
+
+def all_pairs(columns):
+    return [(var1, var2) for i, var1 in enumerate(columns) for var2 in columns[i + 1:]]
+
+def route_pairs(df, columns, var_types=None, pairs=None):
+    """Variable types, numeric flags and the routed test for every pair of columns (or the given pairs)"""
+    if var_types is None:
+        var_types = {col: determine_variable_type(df[col]) for col in columns}
+    is_numeric = {col: pd.api.types.is_numeric_dtype(df[col]) for col in columns}
+    routes = {"chi_square": [], "pearson": [], "spearman": [], "anova": []}
+    for var1, var2 in all_pairs(columns) if pairs is None else pairs:
+        analysis_type = determine_analysis_type(var_types[var1], var_types[var2])
+        routes[numeric_route(analysis_type, is_numeric[var1] + is_numeric[var2])].append((var1, var2))
+    return var_types, is_numeric, routes
+
+PAIR_RESULT_COLUMNS = ['var1', 'var2', 'analysis_type', 'statistic', 'effect_size', 'effect_measure', 'strength',
+                       'p_value', 'n']
+
+def pair_results_frame(rows, var_types, alpha, correction='none'):
+    """Results table shared by the batched and the parallel all-pairs engines (rows may be a frame)"""
+    results = pd.DataFrame(rows, columns=PAIR_RESULT_COLUMNS)
+    results['var1_type'] = results['var1'].map(var_types)
+    results['var2_type'] = results['var2'].map(var_types)
+    results = correct_results(results, alpha, correction)
+    return results.sort_values('p_value', kind='stable').reset_index(drop=True)
+
+# Multiple-testing correction
+MULTIPLE_TESTING_METHODS = ('none', 'bonferroni', 'holm', 'fdr_bh')
+
+def adjust_p_values(p_values, method='holm'):
+    """Bonferroni, Holm (step-down FWER) or Benjamini-Hochberg (FDR) adjusted p-values
+
+    Tests without a p-value (NaN) stay NaN and do not count towards the number of tests.
+    """
+    p_values = np.asarray(p_values, dtype=float)
+    adjusted = np.full(p_values.shape, np.nan)
+    valid = ~np.isnan(p_values)
+    p = p_values[valid]
+    m = p.size
+    if method == 'none':
+        adjusted[valid] = p
+    elif method == 'bonferroni':
+        adjusted[valid] = np.minimum(p * m, 1.0)
+    elif method in ('holm', 'fdr_bh'):
+        order = np.argsort(p, kind='stable')
+        ranked = p[order]
+        if method == 'holm':
+            stepped = np.maximum.accumulate(ranked * (m - np.arange(m)))
+        else:
+            stepped = np.minimum.accumulate((ranked * m / np.arange(1, m + 1))[::-1])[::-1]
+        corrected = np.empty(m)
+        corrected[order] = np.minimum(stepped, 1.0)
+        adjusted[valid] = corrected
+    else:
+        raise ValueError(f"Unknown correction method: {method}")
+    return adjusted
+
+def correct_results(results, alpha=0.05, correction='none'):
+    """Results with p_adjusted and significant recomputed for another correction or alpha (no tests are rerun)"""
+    results = results.copy()
+    results['p_adjusted'] = adjust_p_values(results['p_value'], correction)
+    results['significant'] = results['p_adjusted'] < alpha
+    results.attrs.update({'alpha': alpha, 'correction': correction})
+    return results
+
+def hypothesis_report(results, **meta):
+    """Single JSON document of a batch of tests: settings, counts per test and every result"""
+    summary = results.groupby('analysis_type', sort=True).agg(
+        tests=('p_value', 'size'), tested=('p_value', 'count'), significant=('significant', 'sum'))
+    return json.dumps({
+        **meta,
+        'alpha': results.attrs.get('alpha'),
+        'correction': results.attrs.get('correction'),
+        'tests': int(len(results)),
+        'significant': int(results['significant'].sum()),
+        'by_test': json.loads(summary.reset_index().to_json(orient='records')),
+        'results': json.loads(results.to_json(orient='records'))
+    }, ensure_ascii=False, indent=2)
+
+def all_pairs_association(df, columns, alpha=0.05, var_types=None, pairs=None, correction='none'):
+    """Test every pair of columns (or the given pairs), routed like automatic_association_analysis, as batched matrix operations
+
+    Correlation and ANOVA families are computed as whole-family matrix products, so per-test
+    Python work is limited to chi-square tables; p-values are adjusted with correction.
+    """
+    df = select_columns(df, columns)
+    var_types, is_numeric, routes = route_pairs(df, columns, var_types, pairs)
+    frames = []
+
+    # Correlation families as one matrix each; Spearman ranks every column once over its own
+    # non-missing values, approximating per-pair ranking of the complete rows when values are missing
+    for analysis_type in ("pearson", "spearman"):
+        family = routes[analysis_type]
+        if not family:
+            continue
+        cols = sorted({col for pair in family for col in pair}, key=columns.index)
+        matrix = df[cols].astype(float).to_numpy()
+        position = {col: k for k, col in enumerate(cols)}
+        i = np.array([position[var1] for var1, _ in family])
+        j = np.array([position[var2] for _, var2 in family])
+        if analysis_type == "spearman":
+            matrix = column_ranks(matrix)
+        corr, n, p_values = pairwise_correlation(matrix)
+        corr, n, p_values = corr[i, j], n[i, j], p_values[i, j]
+        frames.append(pd.DataFrame({
+            'var1': [var1 for var1, _ in family], 'var2': [var2 for _, var2 in family],
+            'analysis_type': analysis_type, 'statistic': corr, 'effect_size': corr,
+            'effect_measure': 'r' if analysis_type == "pearson" else 'ρ',
+            'strength': np.abs(corr), 'p_value': p_values, 'n': n.astype(np.int64)
+        }))
+    rows = []
+
+    # Categorical families share integer codes computed once per column
+    codes = {}
+    def column_codes(col):
+        if col not in codes:
+            col_codes, labels = encode_categories(df[col])
+            codes[col] = (col_codes, len(labels))
+        return codes[col]
+
+    for var1, var2 in routes["chi_square"]:
+        codes1, n_levels1 = column_codes(var1)
+        codes2, n_levels2 = column_codes(var2)
+        table, _, _ = contingency_counts(codes1, n_levels1, codes2, n_levels2)
+        n_obs = int(table.sum())
+        if min(table.shape) < 2:
+            chi2, p_value, cramers_v = np.nan, np.nan, np.nan
+        else:
+            stats = contingency_statistics(table)
+            chi2, p_value, cramers_v = stats['chi2'], stats['p_value'], stats['cramers_v']
+        rows.append({
+            'var1': var1, 'var2': var2, 'analysis_type': "chi_square",
+            'statistic': chi2, 'effect_size': cramers_v, 'effect_measure': "Cramér's V",
+            'strength': cramers_v, 'p_value': p_value, 'n': n_obs
+        })
+
+    # ANOVA: all value columns of one grouping column share a single grouped product
+    by_group = {}
+    for var1, var2 in routes["anova"]:
+        group_var, value_var = (var2, var1) if is_numeric[var1] else (var1, var2)
+        by_group.setdefault(group_var, []).append((var1, var2, value_var))
+    for group_var, tests in by_group.items():
+        group_codes, n_levels = column_codes(group_var)
+        values = np.column_stack([df[value_var].to_numpy(dtype=float, na_value=np.nan) for _, _, value_var in tests])
+        f_stat, p_values, eta_squared, n_obs = batched_anova(group_codes, n_levels, values)
+        frames.append(pd.DataFrame({
+            'var1': [var1 for var1, _, _ in tests], 'var2': [var2 for _, var2, _ in tests],
+            'analysis_type': "anova", 'statistic': f_stat, 'effect_size': eta_squared, 'effect_measure': 'η²',
+            'strength': np.sqrt(eta_squared), 'p_value': p_values, 'n': n_obs
+        }))
+
+    frames.append(pd.DataFrame(rows, columns=PAIR_RESULT_COLUMNS))
+    frames = [frame for frame in frames if len(frame)]
+    results = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=PAIR_RESULT_COLUMNS)
+    return pair_results_frame(results, var_types, alpha, correction)
+
+def parallel_pair_tests(df, columns, alpha=0.05, max_workers=None, progress_callback=None, should_cancel=None,
+                        var_types=None, pairs=None, correction='none'):
+    """Exact per-pair scipy tests spread over a process pool; None if cancelled"""
+    df = select_columns(df, columns)
+    var_types, is_numeric, routes = route_pairs(df, columns, var_types, pairs)
+    # Pairs are submitted in pair order so results are identical for any worker count
+    order = {pair: k for k, pair in enumerate(all_pairs(columns) if pairs is None else pairs)}
+    tasks = sorted(((var1, var2, analysis_type) for analysis_type, pairs in routes.items() for var1, var2 in pairs),
+                   key=lambda task: order[task[:2]])
+    shared_columns = {}
+    for col in columns:
+        if is_numeric[col]:
+            shared_columns[col] = {'values': df[col].to_numpy(dtype=float, na_value=np.nan), 'kind': 'numeric'}
+        else:
+            codes, labels = encode_categories(df[col])
+            shared_columns[col] = {'values': codes, 'kind': 'codes', 'n_levels': len(labels)}
+    # The dataset directory only exists once something was stored columnar
+    os.makedirs(DATASET_DIR, exist_ok=True)
+    rows = run_pair_tests(shared_columns, tasks, max_workers=max_workers, progress_callback=progress_callback,
+                          should_cancel=should_cancel, work_dir=DATASET_DIR)
+    if rows is None:
+        return None
+    return pair_results_frame(rows, var_types, alpha, correction)
+
+def association_strength_matrix(results, columns):
+    """Symmetric matrix of association strength (|r|, |ρ|, Cramér's V, η) for a heatmap"""
+    position = pd.Index(columns)
+    matrix = np.full((len(columns), len(columns)), np.nan)
+    i, j = position.get_indexer(results['var1']), position.get_indexer(results['var2'])
+    shown = (i >= 0) & (j >= 0)
+    strength = results['strength'].to_numpy(dtype=float)[shown]
+    matrix[i[shown], j[shown]] = strength
+    matrix[j[shown], i[shown]] = strength
+    np.fill_diagonal(matrix, 1.0)
+    return pd.DataFrame(matrix, index=columns, columns=columns)
+
+# Correlation engine
+CORRELATION_METHODS = ('pearson', 'spearman')
+CORRELATION_TILE = 256
+CORRELATION_CHUNK_ROWS = 65536
+
+def correlation_matrix(data, columns, method='pearson', tile=CORRELATION_TILE, chunk_rows=CORRELATION_CHUNK_ROWS):
+    """Pairwise-complete Pearson or Spearman matrix of numeric columns, computed in tiles
+
+    Sufficient statistics (pair counts, masked sums, sums of squares and cross products) are
+    accumulated over row chunks, one BLAS product per tile pair of the upper triangle, so the
+    temporaries stay at chunk_rows x tile. Spearman ranks each column once over its own
+    non-missing values and correlates the ranks pairwise-complete (pandas' rank().corr()).
+    With missing values this approximates ranking within each pair's complete rows, which
+    would re-rank the data once per pair. Returns (correlation, pair counts) as DataFrames.
+    """
+    columns = list(columns)
+    matrix = np.column_stack([read_column(data, col).to_numpy(dtype=float, na_value=np.nan) for col in columns]) \
+        if columns else np.empty((len(data), 0))
+    if method == 'spearman':
+        matrix = column_ranks(matrix)
+    elif method != 'pearson':
+        raise ValueError(f"Unknown correlation method: {method}")
+
+    # Centering by column means keeps the sum-of-products identities numerically stable
+    n, sums, sum_squares, cross = correlation_sums(matrix, column_means(matrix), tile, chunk_rows)
+    corr = correlation_from_sums(n, sums, sum_squares, cross)
+    return (pd.DataFrame(corr, index=columns, columns=columns),
+            pd.DataFrame(n.astype('int64'), index=columns, columns=columns))
+
+def column_ranks(matrix):
+    """Average ranks of each column over its own non-missing values, missing values kept as NaN"""
+    return pd.DataFrame(matrix).rank().to_numpy(dtype=float)
+
+def column_means(matrix):
+    """Column means ignoring NaN (zero for empty columns), used to shift sums of products"""
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return np.nan_to_num(np.nanmean(matrix, axis=0)) if len(matrix) else np.zeros(matrix.shape[1])
+
+def correlation_sums(matrix, shift, tile=CORRELATION_TILE, chunk_rows=CORRELATION_CHUNK_ROWS):
+    """Pair counts, masked sums, sums of squares and cross products of matrix - shift
+
+    Every statistic is a sum over rows, so sums of separate row blocks (with the same shift)
+    add up to the sums of the stacked blocks.
+    """
+    n_cols = matrix.shape[1]
+    tiles = [slice(start, min(start + tile, n_cols)) for start in range(0, n_cols, tile)]
+    n = np.zeros((n_cols, n_cols))
+    sums = np.zeros((n_cols, n_cols))
+    sum_squares = np.zeros((n_cols, n_cols))
+    cross = np.zeros((n_cols, n_cols))
+    for row_start in range(0, len(matrix), chunk_rows):
+        chunk = matrix[row_start:row_start + chunk_rows]
+        mask = ~np.isnan(chunk)
+        centered = np.where(mask, chunk - shift, 0.0)
+        weights = mask.astype(float)
+        squared = centered * centered
+        for a, rows in enumerate(tiles):
+            for b, cols in enumerate(tiles[a:], a):
+                # sums[i, j]: sum of column i over the rows where column j is present
+                n[rows, cols] += weights[:, rows].T @ weights[:, cols]
+                cross[rows, cols] += centered[:, rows].T @ centered[:, cols]
+                sums[rows, cols] += centered[:, rows].T @ weights[:, cols]
+                sum_squares[rows, cols] += squared[:, rows].T @ weights[:, cols]
+                if b != a:
+                    sums[cols, rows] += centered[:, cols].T @ weights[:, rows]
+                    sum_squares[cols, rows] += squared[:, cols].T @ weights[:, rows]
+    # Only the upper tiles of the symmetric statistics were accumulated
+    upper = np.triu(np.ones((n_cols, n_cols), dtype=bool))
+    return np.where(upper, n, n.T), sums, sum_squares, np.where(upper, cross, cross.T)
+
+def correlation_from_sums(n, sums, sum_squares, cross):
+    """Correlation matrix from the sums of correlation_sums (sums[i, j] is column i where j is present)"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = cross - sums * sums.T / n
+        var = sum_squares - sums ** 2 / n
+        return np.clip(cov / np.sqrt(var * var.T), -1.0, 1.0)
+
+def cluster_order(corr):
+    """Columns reordered so strongly correlated variables sit together (average linkage on 1 - |r|)"""
+    if len(corr) < 3:
+        return list(corr.columns)
+    distance = 1.0 - np.nan_to_num(np.abs(corr.to_numpy()), nan=0.0)
+    np.fill_diagonal(distance, 0.0)
+    distance = (distance + distance.T) / 2
+    order = leaves_list(linkage(squareform(distance, checks=False), method='average'))
+    return [corr.columns[k] for k in order]
+
+def top_correlations(corr, k=None, min_abs=0.0):
+    """Variable pairs ordered by |r| (upper triangle only), optionally the first k"""
+    values = corr.to_numpy()
+    i, j = np.triu_indices(len(values), k=1)
+    pairs = pd.DataFrame({'var1': corr.index[i], 'var2': corr.columns[j], 'r': values[i, j]})
+    pairs = pairs[pairs['r'].abs() >= min_abs].dropna(subset=['r'])
+    pairs = pairs.iloc[np.argsort(-pairs['r'].abs().to_numpy(), kind='stable')].reset_index(drop=True)
+    return pairs if k is None else pairs.head(k)
+
+def correlation_view(corr, min_abs=0.0, top_k=None, cluster=False):
+    """Submatrix to draw: variables with an |r| >= min_abs (within the top_k pairs), optionally clustered"""
+    if min_abs > 0 or top_k is not None:
+        pairs = top_correlations(corr, top_k, min_abs)
+        keep = set(pairs['var1']) | set(pairs['var2'])
+        columns = [col for col in corr.columns if col in keep]
+        corr = corr.loc[columns, columns]
+    if cluster:
+        columns = cluster_order(corr)
+        corr = corr.loc[columns, columns]
+    return corr
+
+# Dataset profile
+PROFILE_VERSION = 2
+# Columns with up to PROFILE_FULL_LEVELS levels keep every count; larger ones keep the PROFILE_TOP_K most frequent
+PROFILE_FULL_LEVELS = 1000
+PROFILE_TOP_K = 100
+SUMMARY_COLUMNS = ['column', 'dtype', 'numeric', 'variable_type', 'count', 'missing', 'unique',
+                   'mean', 'std', 'min', '25%', '50%', '75%', 'max', 'top', 'top_count']
+NUMERIC_SUMMARY = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+
+def read_column(data, col):
+    """One column of a DataFrame or ColumnarDataset, without keeping it resident in the dataset"""
+    if isinstance(data, pd.DataFrame):
+        return data[col]
+    return data.read([col], cache=False)[col]
+
+def column_profile(series):
+    """Summary row and top-k value counts (None for numeric columns) of one column"""
+    row = {
+        'dtype': str(series.dtype),
+        'numeric': pd.api.types.is_numeric_dtype(series),
+        'count': int(series.count()),
+        'missing': int(series.isnull().sum()),
+        'unique': int(series.nunique())
+    }
+    row['variable_type'] = classify_variable(row['numeric'], row['unique'])
+    if row['numeric'] and not pd.api.types.is_bool_dtype(series):
+        row.update(series.describe().drop('count').to_dict())
+        return row, None
+    counts = profile_levels(category_counts(series))
+    if len(counts):
+        row.update({'top': str(counts.index[0]), 'top_count': int(counts.iloc[0])})
+    return row, counts
+
+def profile_levels(counts):
+    """Value counts kept in a profile: all of them unless there are more than PROFILE_FULL_LEVELS"""
+    return counts if len(counts) <= PROFILE_FULL_LEVELS else counts.head(PROFILE_TOP_K)
+
+class DatasetProfile:
+    """Per-column statistics built once per dataset; read like StreamingStats by the descriptive tab"""
+
+    def __init__(self, n_rows, summary, top_values, correlation):
+        self.n_rows = n_rows
+        self.summary = summary
+        self.top_values = top_values
+        self.correlation = correlation
+
+    @classmethod
+    def build(cls, data, columns=None):
+        """Profile a DataFrame or ColumnarDataset one column at a time"""
+        columns = list(data.columns) if columns is None else list(columns)
+        rows, top_values = [], {}
+        for col in columns:
+            row, counts = column_profile(read_column(data, col))
+            rows.append(row)
+            if counts is not None:
+                top_values[col] = counts
+        summary = pd.DataFrame(rows, index=pd.Index(columns, name='column'), columns=SUMMARY_COLUMNS[1:])
+        described = [col for col in columns if summary.at[col, 'numeric'] and summary.at[col, 'dtype'] != 'bool']
+        correlation, _ = correlation_matrix(data, described)
+        return cls(len(data), summary, top_values, correlation)
+
+    @property
+    def shape(self):
+        return self.n_rows, len(self.summary)
+
+    def null_counts(self):
+        return self.summary['missing'].astype('int64')
+
+    def describe(self):
+        """Same layout as DataFrame.describe() over the numerical columns"""
+        return self.summary.loc[self.correlation.columns, NUMERIC_SUMMARY].T.astype(float)
+
+    def value_counts(self, col):
+        """Categories of a non-numeric column (the top PROFILE_TOP_K for high-cardinality columns)"""
+        return self.top_values[col]
+
+    def hidden_levels(self, col):
+        """Number of levels, and their rows, left out of value_counts(col)"""
+        counts = self.top_values[col]
+        return int(self.summary.at[col, 'unique']) - len(counts), int(self.summary.at[col, 'count']) - int(counts.sum())
+
+    def variable_types(self):
+        """Variable types under the current thresholds, without touching the data"""
+        return {col: classify_variable(is_numeric, n_unique)
+                for col, is_numeric, n_unique in zip(self.summary.index, self.summary['numeric'], self.summary['unique'])}
+
+    def summary_frame(self):
+        """Flat per-column summary table for export"""
+        summary = self.summary.copy()
+        summary['variable_type'] = summary.index.map(self.variable_types())
+        return summary.reset_index()[SUMMARY_COLUMNS]
+
+    def to_json(self):
+        return json.dumps({
+            'version': PROFILE_VERSION,
+            'n_rows': self.n_rows,
+            'summary': json.loads(self.summary.reset_index().to_json(orient='split', index=False)),
+            'top_values': {col: [[str(label), int(count)] for label, count in counts.items()]
+                           for col, counts in self.top_values.items()},
+            'correlation': json.loads(self.correlation.to_json(orient='split'))
+        }, ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, text):
+        """Inverse of to_json; raises ValueError for profiles written by another version"""
+        document = json.loads(text)
+        if document.get('version') != PROFILE_VERSION:
+            raise ValueError("Profile version mismatch")
+        summary = pd.DataFrame(document['summary']['data'], columns=document['summary']['columns']).set_index('column')
+        summary = summary.astype({'numeric': bool, 'count': 'int64', 'missing': 'int64', 'unique': 'int64',
+                                  **{stat: float for stat in NUMERIC_SUMMARY[1:]}})
+        top_values = {col: pd.Series([count for _, count in pairs], index=[label for label, _ in pairs],
+                                     name='count', dtype='int64')
+                      for col, pairs in document['top_values'].items()}
+        correlation = document['correlation']
+        correlation = pd.DataFrame(correlation['data'], index=correlation['index'],
+                                   columns=correlation['columns'], dtype=float)
+        return cls(document['n_rows'], summary, top_values, correlation)
+
+def profile_path(file_hash):
+    return os.path.join(DATASET_DIR, f"{file_hash}.profile.json")
+
+def load_profile(data, file_hash):
+    """Profile stored next to the dataset, built and saved on first use"""
+    path = profile_path(file_hash)
+    if os.path.exists(path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                return DatasetProfile.from_json(f.read())
+        except (ValueError, KeyError):
+            pass
+    profile = DatasetProfile.build(data)
+    os.makedirs(DATASET_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(profile.to_json())
+    os.replace(tmp_path, path)
+    return profile
+
+# Append-only survey waves
+WAVE_STATE_VERSION = 2
+# Text columns with more levels keep exact counts but leave the pair statistics; their pairs are tested from the rows
+WAVE_MAX_LEVELS = 1000
+_wave_lock = threading.Lock()
+
+def arrow_is_numeric(arrow_type):
+    return pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type) or pa.types.is_boolean(arrow_type)
+
+def arrow_is_text(arrow_type):
+    if pa.types.is_dictionary(arrow_type):
+        return arrow_is_text(arrow_type.value_type)
+    return pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type)
+
+def widen_type(stored, new):
+    """Arrow type that holds both the stored type of a column and a new wave's type, or None when they conflict
+
+    Integers and floats widen to the smallest type that holds both (int8 and float32 give
+    float32), text columns take numbers and keep dictionary encoding only when both sides have
+    it, and a column that has only been empty takes the new type. Booleans only match booleans;
+    other types keep the stored type and the cast decides.
+    """
+    if stored == new or pa.types.is_null(new):
+        return stored
+    if pa.types.is_null(stored):
+        return new
+    if pa.types.is_boolean(stored) or pa.types.is_boolean(new):
+        return None
+    if arrow_is_numeric(stored) and arrow_is_numeric(new):
+        return pa.from_numpy_dtype(np.promote_types(stored.to_pandas_dtype(), new.to_pandas_dtype()))
+    if arrow_is_numeric(stored) and arrow_is_text(new):
+        return None
+    if arrow_is_text(stored) and (arrow_is_text(new) or arrow_is_numeric(new)):
+        values = [arrow_type.value_type if pa.types.is_dictionary(arrow_type) else arrow_type for arrow_type in (stored, new)]
+        value_type = pa.large_string() if pa.large_string() in values else pa.string()
+        if pa.types.is_dictionary(stored) and pa.types.is_dictionary(new):
+            index_type = max(stored.index_type, new.index_type, key=lambda index: index.bit_width)
+            return pa.dictionary(index_type, value_type)
+        return value_type
+    return stored
+
+def conform_wave(table, schema):
+    """A new wave's Arrow table cast to the stored schema, widened where the wave needs it
+
+    Columns must match by name (in any order). Numeric columns widen (int8 to int16 or to
+    float32), numbers may fill a text column and empty columns fit any type; the returned
+    table's schema is the widened dataset schema. Text in a numeric column, booleans mixed with
+    other types, or values the widened type cannot hold reject the wave with ValueError.
+    """
+    missing = [name for name in schema.names if name not in table.column_names]
+    extra = [name for name in table.column_names if name not in schema.names]
+    if missing or extra:
+        raise ValueError(f"Columns do not match the dataset (missing: {', '.join(missing) or '-'}; "
+                         f"unexpected: {', '.join(extra) or '-'})")
+    fields, arrays = [], []
+    for field in schema:
+        column = table.column(field.name)
+        arrow_type = field.type if column.null_count == len(column) else widen_type(field.type, column.type)
+        if arrow_type is None:
+            raise ValueError(f"Column {field.name}: {column.type} values conflict with the stored {field.type}")
+        if column.null_count == len(column):
+            column = pa.nulls(len(column), arrow_type)
+        try:
+            if arrow_is_text(arrow_type) and arrow_is_numeric(column.type):
+                column = column.cast(pa.string())
+            column = column.cast(arrow_type)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+            raise ValueError(f"Column {field.name}: {column.type} values do not fit {arrow_type} ({e})") from e
+        fields.append(field.with_type(arrow_type))
+        arrays.append(column)
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields, metadata=schema.metadata))
+
+class WaveStatistics:
+    """Running statistics of an append-only dataset, updated one wave at a time
+
+    Every statistic is a sum over rows, so a new wave only folds in its own rows: numeric
+    columns keep moments, a quantile sketch and a distinct count; text columns keep exact
+    level counts; numeric pairs keep the sums of correlation_sums (shifted by the first
+    wave's means); text pairs keep sparse contingency counts and each text column keeps
+    per-level counts, sums and sums of squares of every numeric column for ANOVA.
+    """
+
+    def __init__(self, schema):
+        frame = schema.empty_table().to_pandas()
+        self.version = WAVE_STATE_VERSION
+        self.schema = schema
+        self.columns = list(frame.columns)
+        self.dtypes = {col: str(frame[col].dtype) for col in self.columns}
+        self.numeric = {col: pd.api.types.is_numeric_dtype(frame[col]) for col in self.columns}
+        self.value_cols = [col for col in self.columns if self.numeric[col]]
+        self.correlation_cols = [col for col in self.value_cols if self.dtypes[col] != 'bool']
+        self.text_cols = [col for col in self.columns if not self.numeric[col]]
+        self.waves = []
+        self.n_rows = 0
+        self.shift = None
+        self.aggregates = {col: NumericAggregate(distinct=True) for col in self.value_cols}
+        self.levels = {col: pd.Index([], dtype=object) for col in self.text_cols}
+        self.counts = {col: np.zeros(0, dtype=np.int64) for col in self.text_cols}
+        self.nulls = dict.fromkeys(self.text_cols, 0)
+        # Text columns still tracked in the pair statistics, in column order
+        self.paired = list(self.text_cols)
+        self.correlation = None
+        self.contingency = {}
+        self.moments = {}
+
+    def widen(self, schema):
+        """Adopt a widened dataset schema; False when a column moves between numeric and text
+
+        Widening within numeric or within text columns keeps every running statistic valid. A
+        column that turns numeric (one that was only empty so far) changes which statistics
+        exist, and the caller rebuilds them from the stored waves.
+        """
+        frame = schema.empty_table().to_pandas()
+        if any(pd.api.types.is_numeric_dtype(frame[col]) != self.numeric[col] for col in self.columns):
+            return False
+        self.schema = schema
+        self.dtypes = {col: str(frame[col].dtype) for col in self.columns}
+        return True
+
+    def update(self, wave, meta):
+        """Fold one wave (a DataFrame in the stored schema) into the statistics"""
+        values = np.column_stack([wave[col].to_numpy(dtype=float, na_value=np.nan) for col in self.value_cols]) \
+            if self.value_cols else np.empty((len(wave), 0))
+        if self.shift is None:
+            self.shift = column_means(values)
+        for col in self.value_cols:
+            self.aggregates[col].update(wave[col])
+        codes = {col: self._encode(col, wave[col]) for col in self.text_cols}
+        for col in [col for col in self.paired if len(self.levels[col]) > WAVE_MAX_LEVELS]:
+            self.paired.remove(col)
+            self.contingency = {pair: table for pair, table in self.contingency.items() if col not in pair}
+            self.moments.pop(col, None)
+
+        position = [self.value_cols.index(col) for col in self.correlation_cols]
+        sums = correlation_sums(values[:, position], self.shift[position])
+        self.correlation = sums if self.correlation is None else tuple(a + b for a, b in zip(self.correlation, sums))
+
+        for i, var1 in enumerate(self.paired):
+            for var2 in self.paired[i + 1:]:
+                shape = (len(self.levels[var1]), len(self.levels[var2]))
+                table, rows, cols = contingency_counts(codes[var1], shape[0], codes[var2], shape[1])
+                table = sparse.coo_array(table)
+                table = sparse.csr_array((table.data, (rows[table.row], cols[table.col])), shape=shape)
+                stored = self.contingency.get((var1, var2))
+                if stored is not None:
+                    stored.resize(shape)
+                    table = table + stored
+                self.contingency[(var1, var2)] = table
+
+        valid = ~np.isnan(values)
+        centered = np.where(valid, values - self.shift, 0.0)
+        weights = valid.astype(float)
+        for col in self.paired:
+            rows = np.flatnonzero(codes[col] >= 0)
+            indicator = sparse.csr_array((np.ones(rows.size), (codes[col][rows], rows)),
+                                         shape=(len(self.levels[col]), len(wave)))
+            moments = [indicator @ weights, indicator @ centered, indicator @ (centered * centered)]
+            for new, old in zip(moments, self.moments.get(col, ())):
+                new[:len(old)] += old
+            self.moments[col] = moments
+
+        self.n_rows += len(wave)
+        self.waves.append(meta)
+
+    def _encode(self, col, series):
+        """Codes of a text column in stored level order; levels seen for the first time are appended"""
+        wave_codes, labels = pd.factorize(series, sort=True)
+        new = labels[self.levels[col].get_indexer(labels) < 0]
+        if len(new):
+            self.levels[col] = self.levels[col].append(pd.Index(new, dtype=object))
+        mapping = self.levels[col].get_indexer(labels)
+        codes = np.full(len(wave_codes), -1, dtype=np.int64)
+        valid = wave_codes >= 0
+        codes[valid] = mapping[wave_codes[valid]]
+        counts = np.bincount(codes[valid], minlength=len(self.levels[col]))
+        counts[:len(self.counts[col])] += self.counts[col]
+        self.counts[col] = counts
+        self.nulls[col] += int((~valid).sum())
+        return codes
+
+    def value_counts(self, col):
+        """Exact level counts of a text column, ordered like category_counts"""
+        counts = pd.Series(self.counts[col], index=self.levels[col], name='count')
+        return counts.sort_index().sort_values(ascending=False, kind='stable')
+
+    def correlation_frames(self):
+        """Pearson matrix and pair counts of the numeric columns"""
+        corr = correlation_from_sums(*self.correlation)
+        return (pd.DataFrame(corr, index=self.correlation_cols, columns=self.correlation_cols),
+                pd.DataFrame(self.correlation[0].astype('int64'), index=self.correlation_cols, columns=self.correlation_cols))
+
+    def contingency_table(self, var1, var2):
+        """Counts of two paired text columns over the levels that co-occur, as contingency_counts returns them"""
+        table = self.contingency[(var1, var2)] if (var1, var2) in self.contingency else self.contingency[(var2, var1)].T
+        table = sparse.csr_array(table)
+        rows = np.flatnonzero(table.sum(axis=1))
+        cols = np.flatnonzero(table.sum(axis=0))
+        return table[rows][:, cols], rows, cols
+
+    def profile(self):
+        """DatasetProfile of all waves (quartiles come from the sketches, numeric distinct counts from HyperLogLog)"""
+        rows, top_values = [], {}
+        for col in self.columns:
+            row = {'dtype': self.dtypes[col], 'numeric': self.numeric[col]}
+            if self.numeric[col]:
+                aggregate = self.aggregates[col]
+                row.update({'count': aggregate.count, 'missing': aggregate.nulls,
+                            'unique': int(round(aggregate.distinct.estimate()))})
+                if self.dtypes[col] != 'bool':
+                    row.update(aggregate.describe().drop('count').to_dict())
+            else:
+                counts = self.value_counts(col)
+                row.update({'count': int(counts.sum()), 'missing': self.nulls[col], 'unique': len(counts)})
+                top_values[col] = profile_levels(counts)
+                if len(counts):
+                    row.update({'top': str(counts.index[0]), 'top_count': int(counts.iloc[0])})
+            row['variable_type'] = classify_variable(row['numeric'], row['unique'])
+            rows.append(row)
+        summary = pd.DataFrame(rows, index=pd.Index(self.columns, name='column'), columns=SUMMARY_COLUMNS[1:])
+        correlation, _ = self.correlation_frames()
+        return DatasetProfile(self.n_rows, summary, top_values, correlation)
+
+def incremental_pair_tests(state, data, columns, alpha=0.05, var_types=None, pairs=None, correction='none'):
+    """All-pairs tests of a wave dataset answered from its running statistics
+
+    Pearson, chi-square and ANOVA pairs come from the sufficient statistics in state, without
+    reading rows. Spearman pairs (ranks change with every wave) and pairs with a text column
+    outside the pair statistics are tested from data by all_pairs_association.
+    """
+    if var_types is None:
+        var_types = state.profile().variable_types()
+    pearson, chi_square, anova, remaining = [], [], {}, []
+    for var1, var2 in all_pairs(columns) if pairs is None else pairs:
+        analysis_type = numeric_route(determine_analysis_type(var_types[var1], var_types[var2]),
+                                      state.numeric[var1] + state.numeric[var2])
+        if analysis_type == "pearson" and var1 in state.correlation_cols and var2 in state.correlation_cols:
+            pearson.append((var1, var2))
+        elif analysis_type == "chi_square" and var1 in state.paired and var2 in state.paired:
+            chi_square.append((var1, var2))
+        elif analysis_type == "anova" and (var2 if state.numeric[var1] else var1) in state.paired:
+            anova.setdefault(var2 if state.numeric[var1] else var1, []).append((var1, var2))
+        else:
+            remaining.append((var1, var2))
+    frames = []
+
+    if pearson:
+        corr, n = state.correlation_frames()
+        i = corr.index.get_indexer([var1 for var1, _ in pearson])
+        j = corr.index.get_indexer([var2 for _, var2 in pearson])
+        r, n = corr.to_numpy()[i, j], n.to_numpy()[i, j]
+        frames.append(pd.DataFrame({
+            'var1': [var1 for var1, _ in pearson], 'var2': [var2 for _, var2 in pearson],
+            'analysis_type': "pearson", 'statistic': r, 'effect_size': r, 'effect_measure': 'r',
+            'strength': np.abs(r), 'p_value': correlation_p_values(r, n), 'n': n
+        }))
+
+    rows = []
+    for var1, var2 in chi_square:
+        table, _, _ = state.contingency_table(var1, var2)
+        stats = contingency_statistics(table) if min(table.shape) >= 2 else \
+            {'chi2': np.nan, 'p_value': np.nan, 'cramers_v': np.nan}
+        rows.append({
+            'var1': var1, 'var2': var2, 'analysis_type': "chi_square",
+            'statistic': stats['chi2'], 'effect_size': stats['cramers_v'], 'effect_measure': "Cramér's V",
+            'strength': stats['cramers_v'], 'p_value': stats['p_value'], 'n': int(table.sum())
+        })
+    frames.append(pd.DataFrame(rows, columns=PAIR_RESULT_COLUMNS))
+
+    # One pass over the stored moments answers every value column of a grouping column
+    for group_var, tests in anova.items():
+        f_stat, p_values, eta_squared, n_obs = anova_from_sums(*state.moments[group_var])
+        k = [state.value_cols.index(var2 if var1 == group_var else var1) for var1, var2 in tests]
+        frames.append(pd.DataFrame({
+            'var1': [var1 for var1, _ in tests], 'var2': [var2 for _, var2 in tests],
+            'analysis_type': "anova", 'statistic': f_stat[k], 'effect_size': eta_squared[k], 'effect_measure': 'η²',
+            'strength': np.sqrt(eta_squared[k]), 'p_value': p_values[k], 'n': n_obs[k]
+        }))
+
+    if remaining:
+        tested = all_pairs_association(data, pair_variables(None, remaining), alpha, var_types, remaining)
+        frames.append(tested[PAIR_RESULT_COLUMNS])
+    frames = [frame for frame in frames if len(frame)]
+    results = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=PAIR_RESULT_COLUMNS)
+    return pair_results_frame(results, var_types, alpha, correction)
+
+def wave_root():
+    return os.path.join(DATASET_DIR, "waves")
+
+def list_wave_datasets():
+    """Names of the stored wave datasets"""
+    if not os.path.isdir(wave_root()):
+        return []
+    return sorted(name for name in os.listdir(wave_root()) if os.path.exists(wave_state_path(name)))
+
+def wave_state_path(name):
+    return os.path.join(wave_root(), name, "state.pkl")
+
+def wave_paths(name, state):
+    """Parquet parts of a wave dataset in wave order"""
+    return [os.path.join(wave_root(), name, wave['part']) for wave in state.waves]
+
+def open_waves(name, state):
+    """ColumnarDataset of all waves, with parts written before a widening read in the current schema"""
+    return ColumnarDataset(wave_paths(name, state), schema=state.schema)
+
+def build_wave_state(name, waves, schema):
+    """WaveStatistics recomputed from the stored parts of waves, read in schema"""
+    state = WaveStatistics(schema)
+    for wave in waves:
+        table = pq.read_table(os.path.join(wave_root(), name, wave['part']))
+        state.update(table.cast(pa.schema(list(schema), metadata=table.schema.metadata)).to_pandas(), wave)
+    return state
+
+def wave_dataset_hash(name, state):
+    """Content hash of a wave dataset; changes with every appended wave"""
+    return hash_bytes(json.dumps([name] + [wave['hash'] for wave in state.waves]).encode())
+
+def save_wave_state(name, state):
+    path = wave_state_path(name)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+def load_wave_state(name):
+    """Running statistics of a wave dataset (rebuilt from its parts when saved by another version), or None"""
+    path = wave_state_path(name)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        state = pickle.load(f)
+    if getattr(state, 'version', None) != WAVE_STATE_VERSION:
+        schemas = [pq.read_schema(path) for path in wave_paths(name, state)]
+        schema = schemas[0]
+        for part_schema in schemas[1:]:
+            schema = pa.schema([field.with_type(widen_type(field.type, part_schema.field(field.name).type) or field.type)
+                                for field in schema], metadata=schema.metadata)
+        state = build_wave_state(name, state.waves, schema)
+        save_wave_state(name, state)
+    return state
+
+def stored_wave(state, wave_hash):
+    """Position of a wave in a wave dataset by its hash, or None when it is not stored"""
+    hashes = [] if state is None else [wave['hash'] for wave in state.waves]
+    return hashes.index(wave_hash) if wave_hash in hashes else None
+
+def prepare_wave(name, df, wave_hash, state=None):
+    """Arrow table a new wave would be stored as, without writing anything
+
+    The wave goes through the same dtype optimization as any other load. The first wave sets
+    the schema; later waves are conformed to it and may widen it (the table's schema is then
+    the widened one). Raises ValueError when the wave is already stored (same hash) or does
+    not fit the stored schema.
+    """
+    if state is None:
+        state = load_wave_state(name)
+    if state is not None:
+        position = stored_wave(state, wave_hash)
+        if position is not None:
+            raise ValueError(f"Wave already stored as wave {position + 1} ({state.waves[position]['label']})")
+    if OPTIMIZE_DTYPES:
+        df, _ = optimize_dtypes(df)
+    table = columnar_table(df)
+    return table if state is None else conform_wave(table, state.schema)
+
+def append_wave(name, df, label, wave_hash):
+    """Validate a new wave with prepare_wave, store it and fold it into the running statistics
+
+    The state file is replaced last, so an interrupted append leaves the dataset as it was.
+    Returns the updated WaveStatistics; raises ValueError when the wave is already stored or
+    does not fit.
+    """
+    with _wave_lock:
+        state = load_wave_state(name)
+        table = prepare_wave(name, df, wave_hash, state)
+        if state is None:
+            state = WaveStatistics(table.schema)
+        elif not table.schema.equals(state.schema) and not state.widen(table.schema):
+            state = build_wave_state(name, state.waves, table.schema)
+        os.makedirs(os.path.join(wave_root(), name), exist_ok=True)
+        part = f"wave-{len(state.waves):05d}.parquet"
+        write_columnar(table, os.path.join(wave_root(), name, part))
+        state.update(table.to_pandas(), {'label': label, 'hash': wave_hash, 'part': part, 'rows': table.num_rows,
+                                         'added': time.strftime('%Y-%m-%dT%H:%M:%S')})
+        save_wave_state(name, state)
+    return state
+
+# Saved column sets for projected loads
+def column_sets_path():
+    return os.path.join(DATASET_DIR, "column_sets.json")
+
+def load_column_sets():
+    """Saved column sets by name"""
+    try:
+        with open(column_sets_path(), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_column_set(name, columns):
+    """Save (or replace) a named column set"""
+    column_sets = load_column_sets()
+    column_sets[name] = list(columns)
+    os.makedirs(DATASET_DIR, exist_ok=True)
+    path = column_sets_path()
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(column_sets, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+# Sampling for interactive previews
+SAMPLE_METHODS = ("reservoir", "stratified", "weighted")
+SAMPLE_DEFAULT_ROWS = 50_000
+
+def reservoir_keys(weights, rng):
+    """Efraimidis-Spirakis keys: the rows with the largest keys form a weighted reservoir sample"""
+    # log(u) / w orders rows like u ** (1 / w) without underflow; rows without a positive weight never win
+    with np.errstate(divide='ignore', invalid='ignore'):
+        keys = np.log(rng.random(weights.size)) / weights
+    return np.where(weights > 0, keys, -np.inf)
+
+def sample_indices(n_rows, size, method="reservoir", strata=None, weights=None, seed=0):
+    """Sorted row positions of a reservoir, stratified (proportional) or weighted sample of at most size rows"""
+    rng = np.random.default_rng(seed)
+    if method == "weighted":
+        keys = reservoir_keys(np.asarray(weights, dtype=float), rng)
+        size = min(size, int(np.isfinite(keys).sum()))
+    else:
+        keys = rng.random(n_rows)
+    size = min(size, n_rows)
+    if size <= 0:
+        return np.empty(0, dtype=np.intp)
+
+    if method == "stratified":
+        # Proportional allocation with largest remainders; missing values form their own stratum
+        codes = encode_categories(strata)[0] + 1
+        counts = np.bincount(codes)
+        share = counts * size / n_rows
+        quota = np.floor(share).astype(int)
+        quota[np.argsort(quota - share, kind='stable')[:size - quota.sum()]] += 1
+        # Rows ordered by stratum, then by key; each stratum keeps its quota of highest keys
+        order = np.lexsort((-keys, codes))
+        rank = np.arange(n_rows) - np.repeat(np.cumsum(counts) - counts, counts)
+        return np.sort(order[rank < np.repeat(quota, counts)])
+
+    if size == n_rows:
+        return np.arange(n_rows)
+    return np.sort(np.argpartition(-keys, size - 1)[:size])
+
+def sample_rows(data, indices):
+    """Rows at the given positions of a DataFrame or ColumnarDataset, read one column at a time"""
+    if isinstance(data, pd.DataFrame):
+        return data.iloc[indices].reset_index(drop=True)
+    return pd.DataFrame({col: read_column(data, col).iloc[indices].reset_index(drop=True) for col in data.columns})
+
+# Resampling inference
+RESAMPLE_DEFAULT = 2000
+RESAMPLE_BATCH = 250
+# Upper bound on resamples x rows (or x table cells) held by one batch
+RESAMPLE_BATCH_CELLS = 1 << 23
+# Permutation tests may stop once this many resamples put the p-value clearly on one side of alpha
+RESAMPLE_MIN = 500
+RESAMPLE_STOP_Z = 2.576
+RESAMPLE_CONFIDENCE = 0.95
+RESAMPLING_TYPES = ("pearson", "spearman", "anova", "chi_square")
+
+def resample_batches(statistic, n_resamples, seed_sequence, batch, max_workers=None):
+    """Yield statistic(rng, size) for seeded batches in batch order, computed on a thread pool
+
+    Each batch has its own child seed, so results do not depend on the worker count; NumPy
+    releases the GIL in the batched products, so threads use several cores.
+    """
+    sizes = [min(batch, n_resamples - start) for start in range(0, n_resamples, batch)]
+    seeds = seed_sequence.spawn(len(sizes))
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(sizes)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Submitted a wave at a time so an early stop wastes at most one wave
+        for start in range(0, len(sizes), workers):
+            futures = [executor.submit(statistic, np.random.default_rng(seeds[k]), sizes[k])
+                       for k in range(start, min(start + workers, len(sizes)))]
+            for future in futures:
+                yield future.result()
+
+def permutation_p_value(statistic, observed, n_resamples, seed_sequence, batch, alpha=0.05, two_sided=False,
+                        early_stop=True, max_workers=None):
+    """Monte Carlo permutation p-value (k + 1) / (B + 1), stopping early once alpha is clearly on one side"""
+    threshold = abs(observed) if two_sided else observed
+    threshold -= 1e-12 * max(abs(threshold), 1.0)
+    exceed, done = 0, 0
+    for values in resample_batches(statistic, n_resamples, seed_sequence, batch, max_workers):
+        exceed += int(((np.abs(values) if two_sided else values) >= threshold).sum())
+        done += len(values)
+        p_value = (exceed + 1) / (done + 1)
+        if early_stop and RESAMPLE_MIN <= done < n_resamples:
+            se = np.sqrt(p_value * (1 - p_value) / done)
+            if abs(p_value - alpha) > RESAMPLE_STOP_Z * se:
+                break
+    return p_value, done
+
+def bootstrap_interval(statistic, n_resamples, seed_sequence, batch, confidence=RESAMPLE_CONFIDENCE, max_workers=None):
+    """Percentile bootstrap interval of a statistic"""
+    values = np.concatenate(list(resample_batches(statistic, n_resamples, seed_sequence, batch, max_workers)))
+    tail = (1 - confidence) / 2
+    if np.isnan(values).all():
+        return np.nan, np.nan
+    low, high = np.nanquantile(values, [tail, 1 - tail])
+    return float(low), float(high)
+
+def row_correlation(x, y):
+    """Pearson r of each row of two (resamples, n) arrays"""
+    x = x - x.mean(axis=1, keepdims=True)
+    y = y - y.mean(axis=1, keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (x * y).sum(axis=1) / np.sqrt((x * x).sum(axis=1) * (y * y).sum(axis=1))
+
+def correlation_resamplers(x, y, rank):
+    """Observed r (or ρ), permutation and bootstrap statistics of one numeric pair"""
+    if rank:
+        x, y = rankdata(x), rankdata(y)
+    n = len(x)
+    x_std = (x - x.mean()) / x.std()
+    y_std = (y - y.mean()) / y.std()
+    observed = float(x_std @ y_std / n)
+
+    def permuted(rng, size):
+        order = rng.permuted(np.tile(np.arange(n), (size, 1)), axis=1)
+        return y_std[order] @ x_std / n
+
+    def bootstrap(rng, size):
+        rows = rng.integers(0, n, (size, n))
+        x_boot, y_boot = x[rows], y[rows]
+        if rank:
+            x_boot, y_boot = rankdata(x_boot, axis=1), rankdata(y_boot, axis=1)
+        return row_correlation(x_boot, y_boot)
+
+    return observed, observed, permuted, bootstrap
+
+def anova_resamplers(codes, values):
+    """Observed F and η², permutation F and bootstrap η² of one grouped numeric column"""
+    _, codes = np.unique(codes, return_inverse=True)
+    n, n_groups = len(values), int(codes.max()) + 1
+    values = values - values.mean()
+    counts = np.bincount(codes, minlength=n_groups).astype(float)
+    indicator = sparse.csr_array((np.ones(n), (np.arange(n), codes)), shape=(n, n_groups))
+    ss_total = float(values @ values)
+
+    def f_statistic(ss_between):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return (ss_between / (n_groups - 1)) / ((ss_total - ss_between) / (n - n_groups))
+
+    # Group sizes and the total sum of squares are fixed under permutation; only group sums move
+    def between(sums):
+        return (sums * sums / counts).sum(axis=-1)
+
+    observed_between = float(between(values @ indicator))
+    observed_f = float(f_statistic(observed_between))
+    observed_eta = observed_between / ss_total if ss_total > 0 else np.nan
+
+    def permuted(rng, size):
+        order = rng.permuted(np.tile(np.arange(n), (size, 1)), axis=1)
+        return f_statistic(between((indicator.T @ values[order].T).T))
+
+    def bootstrap(rng, size):
+        rows = rng.integers(0, n, (size, n))
+        boot_values = values[rows]
+        flat = (codes[rows] + n_groups * np.arange(size)[:, None]).ravel()
+        boot_counts = np.bincount(flat, minlength=size * n_groups).reshape(size, n_groups)
+        sums = np.bincount(flat, weights=boot_values.ravel(), minlength=size * n_groups).reshape(size, n_groups)
+        grand = boot_values.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ss_between = np.where(boot_counts > 0, sums * sums / boot_counts, 0.0).sum(axis=1) - grand * grand / n
+            ss_boot = (boot_values * boot_values).sum(axis=1) - grand * grand / n
+            return np.where(ss_boot > 0, ss_between / ss_boot, np.nan)
+
+    return observed_f, observed_eta, permuted, bootstrap
+
+def cramers_v_resamplers(codes1, codes2):
+    """Observed Cramér's V, its permutation and bootstrap statistics (uncorrected chi-square)"""
+    _, codes1 = np.unique(codes1, return_inverse=True)
+    _, codes2 = np.unique(codes2, return_inverse=True)
+    n, n_levels1, n_levels2 = len(codes1), int(codes1.max()) + 1, int(codes2.max()) + 1
+    cells = n_levels1 * n_levels2
+    scale = n * (min(n_levels1, n_levels2) - 1)
+
+    def cramers_v(observed, row_totals, col_totals):
+        expected = row_totals[..., :, None] * col_totals[..., None, :] / n
+        with np.errstate(invalid='ignore', divide='ignore'):
+            chi2 = np.where(expected > 0, observed * observed / expected, 0.0).sum(axis=(-2, -1)) - n
+        return np.sqrt(np.maximum(chi2, 0.0) / scale)
+
+    def tables(codes_a, codes_b, size):
+        flat = (codes_a * n_levels2 + codes_b + cells * np.arange(size)[:, None]).ravel()
+        return np.bincount(flat, minlength=size * cells).reshape(size, n_levels1, n_levels2).astype(float)
+
+    table = tables(codes1[None, :], codes2[None, :], 1)
+    row_totals, col_totals = table.sum(axis=2), table.sum(axis=1)
+    observed = float(cramers_v(table, row_totals, col_totals)[0])
+
+    # Both margins are fixed under permutation of one column
+    def permuted(rng, size):
+        shuffled = rng.permuted(np.tile(codes2, (size, 1)), axis=1)
+        return cramers_v(tables(np.broadcast_to(codes1, shuffled.shape), shuffled, size), row_totals, col_totals)
+
+    def bootstrap(rng, size):
+        rows = rng.integers(0, n, (size, n))
+        boot = tables(codes1[rows], codes2[rows], size)
+        return cramers_v(boot, boot.sum(axis=2), boot.sum(axis=1))
+
+    return observed, observed, permuted, bootstrap
+
+def resampling_inference(df, var1, var2, analysis_type, n_resamples=RESAMPLE_DEFAULT, seed=0, alpha=0.05,
+                         confidence=RESAMPLE_CONFIDENCE, early_stop=True, max_workers=None):
+    """Permutation p-value and bootstrap confidence interval of one routed pair
+
+    Correlations are tested two-sided on r (or ρ); ANOVA on F with an interval for η²; chi-square
+    pairs on Cramér's V. Resamples run in seeded batches of matrix operations, so a seed always
+    gives the same result; the permutation test stops early once its p-value is clearly on one
+    side of alpha. Returns None when the pair cannot be tested.
+    """
+    df = select_columns(df, [var1, var2])
+    if analysis_type in ("pearson", "spearman"):
+        x = df[var1].to_numpy(dtype=float, na_value=np.nan)
+        y = df[var2].to_numpy(dtype=float, na_value=np.nan)
+        valid = ~np.isnan(x) & ~np.isnan(y)
+        x, y = x[valid], y[valid]
+        if len(x) < 3 or x.std() == 0 or y.std() == 0:
+            return None
+        observed, effect, permuted, bootstrap = correlation_resamplers(x, y, analysis_type == "spearman")
+        statistic_name = effect_measure = 'r' if analysis_type == "pearson" else 'ρ'
+        two_sided, n, width = True, len(x), len(x)
+    elif analysis_type == "anova":
+        group_var, value_var = (var2, var1) if pd.api.types.is_numeric_dtype(df[var1]) else (var1, var2)
+        codes, _ = encode_categories(df[group_var])
+        values = df[value_var].to_numpy(dtype=float, na_value=np.nan)
+        valid = (codes >= 0) & ~np.isnan(values)
+        codes, values = codes[valid], values[valid]
+        if len(np.unique(codes)) < 2 or len(values) <= len(np.unique(codes)):
+            return None
+        observed, effect, permuted, bootstrap = anova_resamplers(codes, values)
+        statistic_name, effect_measure = 'F', 'η²'
+        two_sided, n, width = False, len(values), len(values)
+    elif analysis_type == "chi_square":
+        codes1, _ = encode_categories(df[var1])
+        codes2, _ = encode_categories(df[var2])
+        valid = (codes1 >= 0) & (codes2 >= 0)
+        codes1, codes2 = codes1[valid], codes2[valid]
+        if min(len(np.unique(codes1)), len(np.unique(codes2))) < 2:
+            return None
+        observed, effect, permuted, bootstrap = cramers_v_resamplers(codes1, codes2)
+        statistic_name = effect_measure = "Cramér's V"
+        two_sided, n = False, len(codes1)
+        width = max(n, len(np.unique(codes1)) * len(np.unique(codes2)))
+    else:
+        raise ValueError(f"Unknown analysis type: {analysis_type}")
+
+    batch = max(1, min(RESAMPLE_BATCH, RESAMPLE_BATCH_CELLS // width))
+    permutation_seed, bootstrap_seed = np.random.SeedSequence(seed).spawn(2)
+    p_value, done = permutation_p_value(permuted, observed, n_resamples, permutation_seed, batch, alpha,
+                                        two_sided, early_stop, max_workers)
+    ci_low, ci_high = bootstrap_interval(bootstrap, n_resamples, bootstrap_seed, batch, confidence, max_workers)
+    return {
+        'analysis_type': analysis_type,
+        'statistic_name': statistic_name,
+        'statistic': observed,
+        'p_value': p_value,
+        'resamples': done,
+        'requested': n_resamples,
+        'stopped_early': done < n_resamples,
+        'effect_measure': effect_measure,
+        'effect_size': effect,
+        'ci_low': ci_low,
+        'ci_high': ci_high,
+        'confidence': confidence,
+        'seed': seed,
+        'n': int(n)
+    }
+
+# Background jobs
+JOB_WORKERS = int(os.environ.get("SURVEY_JOB_WORKERS", "2"))
+JOB_HISTORY = 200
+
+class Job:
+    """State of one background analysis: written by its worker thread, read by the UI"""
+
+    def __init__(self, label, meta=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.label = label
+        self.meta = meta or {}
+        self.status = "queued"
+        self.progress = 0.0
+        self.result = None
+        self.error = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.future = None
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    def report(self, done, total):
+        """Progress callback in the (done, total) form used by the analysis engines"""
+        self.progress = done / total if total else 1.0
+
+class JobQueue:
+    """Thread pool that runs analyses off the Streamlit script thread
+
+    fn(job, *args) may poll job.cancelled and call job.report(done, total). Cancelling
+    a queued job drops it; a running job is flagged and its result discarded when it returns.
+    """
+
+    def __init__(self, max_workers=JOB_WORKERS, history=JOB_HISTORY):
+        self.history = history
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="survey-job")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, label="", meta=None):
+        """Queue fn(job, *args) and return the job id"""
+        job = Job(label, meta)
+        with self._lock:
+            self._jobs[job.id] = job
+            # Oldest finished jobs leave the history first; queued and running jobs are kept
+            finished = [job_id for job_id, old in self._jobs.items() if old.finished is not None]
+            for job_id in finished[:max(0, len(self._jobs) - self.history)]:
+                del self._jobs[job_id]
+        job.future = self._executor.submit(self._run, job, fn, args)
+        return job.id
+
+    def _run(self, job, fn, args):
+        if job.cancelled:
+            return
+        job.status = "running"
+        job.started = time.time()
+        try:
+            result = fn(job, *args)
+            if job.cancelled:
+                job.status = "cancelled"
+            else:
+                job.result = result
+                job.progress = 1.0
+                job.status = "done"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished = time.time()
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is None or job.finished is not None:
+            return
+        job._cancel.set()
+        if job.future.cancel():
+            job.status = "cancelled"
+            job.finished = time.time()
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self, job_ids):
+        """Known jobs among job_ids, newest first"""
+        with self._lock:
+            return [self._jobs[job_id] for job_id in reversed(job_ids) if job_id in self._jobs]
+
+# Batch analysis
+def pair_variables(variables, pairs):
+    """Variables to load for the given variables and pairs, in first-mention order"""
+    return list(dict.fromkeys(list(variables or []) + [var for pair in pairs or [] for var in pair])) or None
+
+def analyze_dataset(df, variables=None, alpha=0.05, pairs=None, correction='none'):
+    """Column summary and association table for every pair of the given variables (or the given pairs)"""
+    variables = pair_variables(variables, pairs) or list(df.columns)
+    unknown = [var for var in variables if var not in df.columns]
+    if unknown:
+        raise ValueError(f"Unknown variables: {', '.join(map(str, unknown))}")
+    profile = DatasetProfile.build(df, variables)
+    return {
+        'summary': profile.summary_frame(),
+        'associations': all_pairs_association(df, variables, alpha, profile.variable_types(), pairs, correction)
+    }
+
+def analyze_file(path, variables=None, alpha=0.05, sheets=None, pairs=None, correction='none'):
+    """Load one survey file and analyze it, with the same dtype handling as the app
+
+    sheets selects Excel worksheets to stack (['all'] for every sheet); they are parsed in this
+    process because batch runs already spread files over processes. pairs limits the tests to
+    those variable pairs, whose p-values are adjusted with correction.
+    """
+    variables = pair_variables(variables, pairs)
+    if sheets and excel_engine(path) is not None:
+        if list(sheets) == ['all']:
+            sheets = list_sheets(path)
+        df = read_table(path, sheets=sheets, max_workers=1, columns=variables)
+    else:
+        df = read_table(path, columns=variables)
+    if OPTIMIZE_DTYPES:
+        df, _ = optimize_dtypes(df)
+    analysis = analyze_dataset(df, variables, alpha, pairs, correction)
+    analysis.update({
+        'file': path,
+        'hash': hash_file(path),
+        'rows': int(df.shape[0]),
+        'columns': int(df.shape[1]),
+        'alpha': alpha,
+        'correction': correction
+    })
+    return analysis
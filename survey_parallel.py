@@ -0,0 +1,139 @@
+import os
+import shutil
+import tempfile
+import warnings
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+from scipy.stats import pearsonr, spearmanr, f_oneway
+
+PAIR_BATCH_SIZE = 16
+
+# Per-worker state: column manifest and memory-mapped arrays opened lazily
+_manifest = {}
+_columns = {}
+
+def _init_worker(manifest):
+    """Pool initializer: remember where the shared column files are"""
+    global _manifest
+    _manifest = manifest
+    _columns.clear()
+
+def _column(name):
+    """Memory-mapped column array, opened once per worker"""
+    if name not in _columns:
+        _columns[name] = np.load(_manifest[name]['path'], mmap_mode='r')
+    return _columns[name]
+
+def _test_pair(var1, var2, analysis_type):
+    """Run the exact scipy test for one routed pair"""
+    row = {'var1': var1, 'var2': var2, 'analysis_type': analysis_type,
+           'statistic': np.nan, 'effect_size': np.nan, 'strength': np.nan, 'p_value': np.nan, 'n': 0}
+
+    if analysis_type in ("pearson", "spearman"):
+        x, y = np.asarray(_column(var1)), np.asarray(_column(var2))
+        valid = ~np.isnan(x) & ~np.isnan(y)
+        row['n'] = int(valid.sum())
+        row['effect_measure'] = 'r' if analysis_type == "pearson" else 'ρ'
+        if row['n'] >= 3:
+            test = pearsonr if analysis_type == "pearson" else spearmanr
+            corr, p_value = test(x[valid], y[valid])
+            row.update({'statistic': corr, 'effect_size': corr, 'strength': abs(corr), 'p_value': p_value})
+
+    elif analysis_type == "chi_square":
+        # Imported here: survey_core imports this module, and workers only need it for chi-square pairs
+        from survey_core import contingency_counts, contingency_statistics
+        codes1, codes2 = np.asarray(_column(var1)), np.asarray(_column(var2))
+        table, _, _ = contingency_counts(codes1, _manifest[var1]['n_levels'], codes2, _manifest[var2]['n_levels'])
+        row['n'] = int(table.sum())
+        row['effect_measure'] = "Cramér's V"
+        if min(table.shape) >= 2:
+            stats = contingency_statistics(table)
+            row.update({'statistic': stats['chi2'], 'effect_size': stats['cramers_v'],
+                        'strength': stats['cramers_v'], 'p_value': stats['p_value']})
+
+    elif analysis_type == "anova":
+        # The grouping column is whichever side was shipped as category codes
+        group_var, value_var = (var1, var2) if _manifest[var1]['kind'] == 'codes' else (var2, var1)
+        codes, values = np.asarray(_column(group_var)), np.asarray(_column(value_var))
+        valid = (codes >= 0) & ~np.isnan(values)
+        codes, values = codes[valid], values[valid]
+        row['n'] = int(valid.sum())
+        row['effect_measure'] = 'η²'
+        order = np.argsort(codes, kind='stable')
+        counts = np.bincount(codes)
+        groups = [group for group in np.split(values[order], np.cumsum(counts)[:-1]) if group.size > 0]
+        if len(groups) >= 2:
+            f_stat, p_value = f_oneway(*groups)
+            ss_total = ((values - values.mean()) ** 2).sum()
+            ss_between = sum(group.size * (group.mean() - values.mean()) ** 2 for group in groups)
+            eta_squared = ss_between / ss_total if ss_total > 0 else np.nan
+            row.update({'statistic': f_stat, 'effect_size': eta_squared,
+                        'strength': np.sqrt(eta_squared), 'p_value': p_value})
+
+    return row
+
+def _run_batch(batch):
+    """Worker entry point: test a batch of (index, var1, var2, analysis_type) tasks"""
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return [(index, _test_pair(var1, var2, analysis_type)) for index, var1, var2, analysis_type in batch]
+
+def _pool_context():
+    # Never fork the multithreaded Streamlit server; fresh interpreters import this module instead
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+def run_pair_tests(columns, tasks, max_workers=None, progress_callback=None, should_cancel=None, work_dir=None):
+    """Run routed pair tests across a process pool reading memory-mapped columns
+
+    columns maps a column name to {'values': array, 'kind': 'numeric' | 'codes', 'n_levels': int};
+    tasks is a list of (var1, var2, analysis_type). Returns one row per task in task order,
+    or None if should_cancel() became true. Results do not depend on the worker count.
+    """
+    column_dir = tempfile.mkdtemp(prefix="pair_columns_", dir=work_dir)
+    executor = None
+    try:
+        # Columns are written once and memory-mapped by every worker instead of pickled per task
+        manifest = {}
+        for k, (name, column) in enumerate(columns.items()):
+            path = os.path.join(column_dir, f"col_{k}.npy")
+            np.save(path, np.ascontiguousarray(column['values']))
+            manifest[name] = {'path': path, 'kind': column['kind'], 'n_levels': column.get('n_levels', 0)}
+
+        indexed = [(index, var1, var2, analysis_type) for index, (var1, var2, analysis_type) in enumerate(tasks)]
+        batches = [indexed[i:i + PAIR_BATCH_SIZE] for i in range(0, len(indexed), PAIR_BATCH_SIZE)]
+        results = [None] * len(tasks)
+        done = 0
+
+        executor = ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(), mp_context=_pool_context(),
+                                       initializer=_init_worker, initargs=(manifest,))
+        futures = [executor.submit(_run_batch, batch) for batch in batches]
+        for future in as_completed(futures):
+            if should_cancel is not None and should_cancel():
+                return None
+            batch_rows = future.result()
+            for index, row in batch_rows:
+                results[index] = row
+            done += len(batch_rows)
+            if progress_callback is not None:
+                progress_callback(done, len(tasks))
+        return results
+    finally:
+        # Also runs when Streamlit interrupts the script (stop button or a new widget event)
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        shutil.rmtree(column_dir, ignore_errors=True)
+
+def _read_sheet(path, sheet, engine, columns):
+    """Worker entry point: parse one worksheet (optionally only some columns) of a workbook on disk"""
+    wanted = None if columns is None else set(columns)
+    return pd.read_excel(path, sheet_name=sheet, engine=engine,
+                         usecols=None if wanted is None else (lambda col: col in wanted))
+
+def read_excel_sheets(path, sheets, engine, max_workers=None, columns=None):
+    """Parse worksheets of one workbook across a process pool, returning frames in sheet order"""
+    n = len(sheets)
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=_pool_context()) as executor:
+        return list(executor.map(_read_sheet, [path] * n, sheets, [engine] * n, [columns] * n))
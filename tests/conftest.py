@@ -0,0 +1,40 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import survey_core
+
+
+def make_survey(n_rows=400, seed=0):
+    """Survey-like frame with every variable type and missing values in each kind of column"""
+    rng = np.random.default_rng(seed)
+    income = rng.normal(5000, 1500, n_rows)
+    likert1 = rng.integers(1, 6, n_rows)
+    df = pd.DataFrame({
+        'income': income,
+        'spend': income * 0.4 + rng.normal(0, 500, n_rows),
+        'likert1': likert1.astype(float),
+        'likert2': np.clip(likert1 + rng.integers(-1, 2, n_rows), 1, 5),
+        'gender': rng.choice(['F', 'M'], n_rows),
+        'region': rng.choice(['north', 'south', 'east', 'west'], n_rows, p=[.4, .3, .2, .1]).astype(object),
+    })
+    df.loc[rng.random(n_rows) < .1, 'income'] = np.nan
+    df.loc[rng.random(n_rows) < .15, 'likert1'] = np.nan
+    df.loc[rng.random(n_rows) < .05, 'region'] = None
+    return df
+
+
+@pytest.fixture
+def survey_frame():
+    return make_survey()
+
+
+@pytest.fixture(autouse=True)
+def dataset_dir(tmp_path, monkeypatch):
+    """Keep stored datasets and pool work files of a test in its own directory"""
+    monkeypatch.setattr(survey_core, 'DATASET_DIR', str(tmp_path))
+    return tmp_path
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+from scipy.stats import pearsonr, spearmanr, f_oneway, chi2_contingency
+
+from survey_core import all_pairs_association, parallel_pair_tests, adjust_p_values, pair_grid
+
+KEY = ['var1', 'var2']
+
+
+def compare(batched, reference):
+    merged = batched.merge(reference, on=KEY, suffixes=('', '_ref'))
+    assert len(merged) == len(batched) == len(reference)
+    assert (merged['analysis_type'] == merged['analysis_type_ref']).all()
+    assert (merged['n'] == merged['n_ref']).all()
+    for col in ('statistic', 'effect_size', 'p_value'):
+        np.testing.assert_allclose(merged[col].astype(float), merged[f'{col}_ref'].astype(float),
+                                   rtol=1e-7, atol=1e-12, err_msg=col)
+
+
+def test_batched_matches_parallel(survey_frame):
+    columns = list(survey_frame.columns)
+    complete = survey_frame.dropna()
+    compare(all_pairs_association(complete, columns), parallel_pair_tests(complete, columns, max_workers=2))
+    # With missing values only Spearman differs: the parallel engine ranks each pair's complete rows
+    batched = all_pairs_association(survey_frame, columns)
+    parallel = parallel_pair_tests(survey_frame, columns, max_workers=2)
+    compare(batched[batched['analysis_type'] != 'spearman'], parallel[parallel['analysis_type'] != 'spearman'])
+
+
+def test_batched_matches_scipy(survey_frame):
+    df = survey_frame
+    results = all_pairs_association(df, list(df.columns)).set_index(KEY)
+    assert set(results['analysis_type']) == {'pearson', 'spearman', 'chi_square', 'anova'}
+
+    def complete(*cols):
+        return df[list(cols)].dropna()
+
+    rows = complete('income', 'spend')
+    r, p = pearsonr(rows['income'], rows['spend'])
+    np.testing.assert_allclose(results.loc[('income', 'spend'), ['statistic', 'p_value']].astype(float), [r, p], rtol=1e-9)
+
+    # Spearman ranks each column once over its own values
+    ranks = df[['likert1', 'likert2']].rank().dropna()
+    rho, p = pearsonr(ranks['likert1'], ranks['likert2'])
+    np.testing.assert_allclose(results.loc[('likert1', 'likert2'), ['statistic', 'p_value']].astype(float), [rho, p], rtol=1e-9)
+    assert results.loc[('likert1', 'likert2'), 'n'] == len(ranks)
+
+    rows = complete('gender', 'region')
+    chi2, p, _, _ = chi2_contingency(pd.crosstab(rows['gender'], rows['region']).to_numpy())
+    np.testing.assert_allclose(results.loc[('gender', 'region'), ['statistic', 'p_value']].astype(float), [chi2, p], rtol=1e-9)
+
+    rows = complete('income', 'region')
+    f_stat, p = f_oneway(*[group['income'] for _, group in rows.groupby('region')])
+    np.testing.assert_allclose(results.loc[('income', 'region'), ['statistic', 'p_value']].astype(float), [f_stat, p], rtol=1e-9)
+
+
+def test_spearman_without_missing_values(survey_frame):
+    df = survey_frame.dropna()
+    results = all_pairs_association(df, list(df.columns)).set_index(KEY)
+    rho, p = spearmanr(df['likert1'], df['likert2'])
+    np.testing.assert_allclose(results.loc[('likert1', 'likert2'), ['statistic', 'p_value']].astype(float), [rho, p], rtol=1e-9)
+
+
+def test_requested_pairs_and_correction(survey_frame):
+    columns = list(survey_frame.columns)
+    pairs = pair_grid(['income', 'gender'], columns)
+    results = all_pairs_association(survey_frame, columns, pairs=pairs, correction='holm')
+    assert set(map(tuple, results[KEY].to_numpy())) == set(pairs)
+    np.testing.assert_allclose(results['p_adjusted'], adjust_p_values(results['p_value'], 'holm'))
+    assert (results['significant'] == (results['p_adjusted'] < 0.05)).all()
+    compare(results, parallel_pair_tests(survey_frame, columns, max_workers=1, pairs=pairs, correction='holm'))
+
+
+def test_columns_without_overlap():
+    df = pd.DataFrame({'a': [1.0, 2.0, np.nan, np.nan, 5.0], 'b': [np.nan, np.nan, 3.0, 4.0, np.nan],
+                       'c': [1.0, 2.0, 3.0, 4.0, 5.0]})
+    results = all_pairs_association(df, ['a', 'b', 'c']).set_index(KEY)
+    assert results.loc[('a', 'b'), 'n'] == 0
+    assert np.isnan(results.loc[('a', 'b'), 'p_value'])
+    assert results.loc[('a', 'c'), 'n'] == 3
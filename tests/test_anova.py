@@ -0,0 +1,77 @@
+import numpy as np
+from scipy.stats import f_oneway
+
+from survey_core import batched_anova, grouped_moments, anova_from_moments, automatic_association_analysis
+
+
+def reference(codes, values):
+    valid = (codes >= 0) & ~np.isnan(values)
+    groups = [values[valid & (codes == k)] for k in np.unique(codes[valid])]
+    values = values[valid]
+    ss_total = ((values - values.mean()) ** 2).sum()
+    ss_between = sum(group.size * (group.mean() - values.mean()) ** 2 for group in groups)
+    f_stat, p_value = f_oneway(*groups)
+    return f_stat, p_value, ss_between / ss_total, valid.sum()
+
+
+def test_batched_anova_matches_f_oneway():
+    rng = np.random.default_rng(1)
+    n_rows, n_groups = 600, 6
+    codes = rng.integers(0, n_groups - 1, n_rows)  # the last group never occurs
+    codes[rng.random(n_rows) < .05] = -1
+    values = np.column_stack([rng.normal(codes * shift, 1.0) for shift in (0.0, 0.3, 2.0)])
+    values[rng.random(values.shape) < .1] = np.nan
+    f_stat, p_values, eta_squared, n_obs = batched_anova(codes, n_groups, values)
+    for k in range(values.shape[1]):
+        np.testing.assert_allclose([f_stat[k], p_values[k], eta_squared[k]], reference(codes, values[:, k])[:3],
+                                   rtol=1e-9, atol=1e-300)
+        assert n_obs[k] == reference(codes, values[:, k])[3]
+
+
+def test_batched_anova_offset_values():
+    # Large offsets would cancel in a plain sum-of-squares identity
+    rng = np.random.default_rng(2)
+    codes = rng.integers(0, 4, 1000)
+    values = (1e9 + rng.normal(codes * 0.1, 1.0))[:, None]
+    f_stat, p_values, _, _ = batched_anova(codes, 4, values)
+    np.testing.assert_allclose([f_stat[0], p_values[0]], reference(codes, values[:, 0])[:2], rtol=1e-6)
+
+
+def test_batched_anova_single_group():
+    codes = np.array([0, 0, 0, 1, 1, 1])
+    values = np.array([[1.0, 1.0], [2.0, 2.0], [3.0, 3.0], [np.nan, 4.0], [np.nan, 5.0], [np.nan, 7.0]])
+    f_stat, p_values, eta_squared, n_obs = batched_anova(codes, 2, values)
+    assert np.isnan(f_stat[0]) and np.isnan(p_values[0]) and np.isnan(eta_squared[0])
+    assert n_obs.tolist() == [3, 6]
+    np.testing.assert_allclose([f_stat[1], p_values[1]], reference(codes, values[:, 1])[:2], rtol=1e-9)
+
+
+def test_grouped_moments_match_f_oneway():
+    rng = np.random.default_rng(3)
+    codes = rng.integers(0, 5, 300)
+    values = 250.0 + rng.normal(codes * 0.2, 1.0)
+    counts, means, ss = grouped_moments(codes, values, 5)
+    for k in range(5):
+        group = values[codes == k]
+        assert counts[k] == group.size
+        np.testing.assert_allclose(means[k], group.mean(), rtol=1e-12)
+        np.testing.assert_allclose(ss[k], ((group - group.mean()) ** 2).sum(), rtol=1e-9)
+    np.testing.assert_allclose(anova_from_moments(counts, means, ss), f_oneway(*[values[codes == k] for k in range(5)]),
+                               rtol=1e-9)
+
+
+def test_grouped_moments_offset_values():
+    # Large offsets would cancel in a plain sum-of-squares identity
+    rng = np.random.default_rng(2)
+    codes = rng.integers(0, 4, 1000)
+    values = 1e6 + rng.normal(codes * 0.1, 1.0)
+    np.testing.assert_allclose(anova_from_moments(*grouped_moments(codes, values, 4)),
+                               f_oneway(*[values[codes == k] for k in range(4)]), rtol=1e-6)
+
+
+def test_automatic_anova_matches_f_oneway(survey_frame):
+    results = automatic_association_analysis(survey_frame, 'region', 'income')
+    rows = survey_frame[['region', 'income']].dropna()
+    groups = [group['income'] for _, group in rows.groupby('region')]
+    np.testing.assert_allclose([results['test_statistic'], results['p_value']], f_oneway(*groups), rtol=1e-9)
+    assert sorted(results['group_sizes']) == sorted(len(group) for group in groups)
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import chi2_contingency
+
+import survey_core
+from survey_core import contingency_counts, contingency_statistics, encode_categories
+
+
+def random_codes(rng, n_rows, n_levels, missing=.05):
+    codes = rng.integers(0, n_levels, n_rows)
+    codes[rng.random(n_rows) < missing] = -1
+    return codes
+
+
+def dense_reference(codes1, codes2):
+    valid = (codes1 >= 0) & (codes2 >= 0)
+    return pd.crosstab(codes1[valid], codes2[valid])
+
+
+@pytest.mark.parametrize('bincount_cells', [survey_core.CONTINGENCY_BINCOUNT_CELLS, 0])
+def test_counts_match_crosstab(monkeypatch, bincount_cells):
+    # bincount_cells=0 sends every table through the sorted-keys path used for large code spaces
+    monkeypatch.setattr(survey_core, 'CONTINGENCY_BINCOUNT_CELLS', bincount_cells)
+    rng = np.random.default_rng(4)
+    codes1, codes2 = random_codes(rng, 2000, 40), random_codes(rng, 2000, 30)
+    codes1[codes1 == 7] = 8  # a level that never occurs is dropped, as crosstab does
+    table, rows, cols = contingency_counts(codes1, 40, codes2, 30)
+    expected = dense_reference(codes1, codes2)
+    assert rows.tolist() == expected.index.tolist()
+    assert cols.tolist() == expected.columns.tolist()
+    np.testing.assert_array_equal(table.toarray(), expected.to_numpy())
+
+
+@pytest.mark.parametrize('shape', [(2, 2), (3, 5), (12, 9)])
+def test_statistics_match_chi2_contingency(shape):
+    rng = np.random.default_rng(sum(shape))
+    codes1, codes2 = random_codes(rng, 1500, shape[0]), random_codes(rng, 1500, shape[1])
+    codes2 = np.where((codes1 == 0) & (rng.random(1500) < .3), 0, codes2)
+    table, _, _ = contingency_counts(codes1, shape[0], codes2, shape[1])
+    stats = contingency_statistics(table)
+    dense = dense_reference(codes1, codes2).to_numpy()
+    chi2, p_value, dof, _ = chi2_contingency(dense)
+    g_statistic, g_p_value, _, _ = chi2_contingency(dense, lambda_="log-likelihood")
+    assert stats['dof'] == dof
+    assert stats['n'] == dense.sum()
+    np.testing.assert_allclose([stats['chi2'], stats['p_value'], stats['g_statistic'], stats['g_p_value']],
+                               [chi2, p_value, g_statistic, g_p_value], rtol=1e-9)
+    np.testing.assert_allclose(stats['cramers_v'], np.sqrt(chi2 / (dense.sum() * (min(dense.shape) - 1))), rtol=1e-12)
+
+
+def test_single_level_table():
+    stats = contingency_statistics(contingency_counts(np.zeros(10, dtype=np.int64), 1, np.arange(10) % 3, 3)[0])
+    assert stats['dof'] == 0 and stats['p_value'] == 1.0 and np.isnan(stats['cramers_v'])
+
+
+def test_categorical_codes_are_reused():
+    series = pd.Series(['b', 'a', None, 'c', 'a'], dtype='category')
+    codes, labels = encode_categories(series)
+    assert codes.tolist() == [1, 0, -1, 2, 0]
+    assert list(labels) == ['a', 'b', 'c']
+    plain_codes, plain_labels = encode_categories(series.astype(object))
+    assert plain_codes.tolist() == codes.tolist() and list(plain_labels) == list(labels)
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from survey_core import correlation_matrix, pairwise_correlation, ColumnarDataset, write_columnar
+
+
+def numeric_frame(seed=5, n_rows=500):
+    rng = np.random.default_rng(seed)
+    base = rng.normal(size=n_rows)
+    df = pd.DataFrame({
+        'a': base + 1e6,
+        'b': base * 2 + rng.normal(size=n_rows),
+        'c': rng.integers(1, 6, n_rows).astype(float),
+        'd': rng.normal(size=n_rows),
+    })
+    for col, share in zip(df.columns, (.1, .2, .05, .3)):
+        df.loc[rng.random(n_rows) < share, col] = np.nan
+    return df
+
+
+@pytest.mark.parametrize('method', ['pearson', 'spearman'])
+@pytest.mark.parametrize('tile, chunk_rows', [(256, 65536), (2, 64)])
+def test_matches_pandas_with_missing_values(method, tile, chunk_rows):
+    df = numeric_frame()
+    corr, n = correlation_matrix(df, list(df.columns), method=method, tile=tile, chunk_rows=chunk_rows)
+    # Spearman ranks each column once over its own values, then correlates the ranks pairwise-complete
+    expected = df.corr() if method == 'pearson' else df.rank().corr()
+    # pandas loses ~1e-11 on the offset column; the exact comparison is test_offset_column_precision
+    np.testing.assert_allclose(corr, expected, rtol=0, atol=1e-9)
+    mask = df.notna().astype(int)
+    np.testing.assert_array_equal(n, mask.T @ mask)
+
+
+@pytest.mark.parametrize('tile, chunk_rows', [(256, 65536), (2, 64)])
+def test_spearman_without_missing_values(tile, chunk_rows):
+    df = numeric_frame().dropna()
+    corr, _ = correlation_matrix(df, list(df.columns), method='spearman', tile=tile, chunk_rows=chunk_rows)
+    np.testing.assert_allclose(corr, df.corr(method='spearman'), rtol=0, atol=1e-12)
+
+
+def test_offset_column_precision():
+    df = numeric_frame()
+    corr, _ = correlation_matrix(df, list(df.columns))
+    for col in ('b', 'c', 'd'):
+        rows = df[['a', col]].dropna().to_numpy(dtype=np.longdouble)
+        x, y = rows[:, 0] - rows[:, 0].mean(), rows[:, 1] - rows[:, 1].mean()
+        expected = (x * y).sum() / np.sqrt((x * x).sum() * (y * y).sum())
+        assert abs(corr.at['a', col] - float(expected)) < 1e-14
+
+
+@pytest.mark.parametrize('method', ['pearson', 'spearman'])
+def test_columnar_dataset_matches_frame(tmp_path, method):
+    df = numeric_frame()
+    path = str(tmp_path / 'numeric.parquet')
+    write_columnar(df, path)
+    corr, _ = correlation_matrix(ColumnarDataset(path), list(df.columns), method=method)
+    np.testing.assert_allclose(corr, correlation_matrix(df, list(df.columns), method=method)[0], rtol=1e-12)
+
+
+def test_pairwise_correlation_counts():
+    df = numeric_frame()
+    corr, n, _ = pairwise_correlation(df.to_numpy())
+    np.testing.assert_allclose(corr, correlation_matrix(df, list(df.columns))[0], rtol=0, atol=1e-14)
+    np.testing.assert_array_equal(n, df.notna().astype(int).T @ df.notna().astype(int))
+
+
+def test_constant_column_has_no_correlation():
+    df = pd.DataFrame({'a': [1.0, 2.0, 3.0, np.nan], 'b': [4.0, 4.0, 4.0, 4.0], 'c': [3.0, 1.0, 2.0, 5.0]})
+    for method in ('pearson', 'spearman'):
+        corr, _ = correlation_matrix(df, list(df.columns), method=method)
+        assert corr['b'].isna().all()
+        assert corr.at['a', 'a'] == 1.0
@@ -0,0 +1,67 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+
+from survey_core import adjust_p_values, correct_results, hypothesis_report, PAIR_RESULT_COLUMNS
+
+
+def holm_reference(p_values):
+    m = len(p_values)
+    order = sorted(range(m), key=lambda k: p_values[k])
+    adjusted, running = [0.0] * m, 0.0
+    for rank, k in enumerate(order):
+        running = max(running, (m - rank) * p_values[k])
+        adjusted[k] = min(running, 1.0)
+    return adjusted
+
+
+def bh_reference(p_values):
+    m = len(p_values)
+    order = sorted(range(m), key=lambda k: p_values[k], reverse=True)
+    adjusted, running = [0.0] * m, 1.0
+    for position, k in enumerate(order):
+        running = min(running, p_values[k] * m / (m - position))
+        adjusted[k] = running
+    return adjusted
+
+
+P_VALUES = [0.01, 0.04, 0.03, 0.005, 0.5, 0.04, 0.2, 0.0001]
+
+
+@pytest.mark.parametrize('method, reference', [('holm', holm_reference), ('fdr_bh', bh_reference)])
+def test_matches_reference(method, reference):
+    np.testing.assert_allclose(adjust_p_values(P_VALUES, method), reference(P_VALUES), rtol=1e-12)
+
+
+def test_random_p_values():
+    p_values = list(np.random.default_rng(6).random(200) ** 3)
+    np.testing.assert_allclose(adjust_p_values(p_values, 'holm'), holm_reference(p_values), rtol=1e-12)
+    np.testing.assert_allclose(adjust_p_values(p_values, 'fdr_bh'), bh_reference(p_values), rtol=1e-12)
+    np.testing.assert_allclose(adjust_p_values(p_values, 'bonferroni'), np.minimum(np.array(p_values) * 200, 1.0))
+    np.testing.assert_array_equal(adjust_p_values(p_values, 'none'), p_values)
+
+
+def test_missing_p_values_are_not_counted():
+    p_values = [0.01, np.nan, 0.04, np.nan, 0.03]
+    adjusted = adjust_p_values(p_values, 'holm')
+    assert np.isnan(adjusted[[1, 3]]).all()
+    np.testing.assert_allclose(adjusted[[0, 2, 4]], holm_reference([0.01, 0.04, 0.03]))
+    np.testing.assert_allclose(adjust_p_values(p_values, 'bonferroni')[[0, 2, 4]], [0.03, 0.12, 0.09])
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        adjust_p_values(P_VALUES, 'sidak')
+
+
+def test_correct_results_and_report():
+    results = pd.DataFrame({'var1': list('abcdefgh'), 'var2': 'z', 'analysis_type': 'pearson', 'p_value': P_VALUES},
+                           columns=PAIR_RESULT_COLUMNS)
+    corrected = correct_results(results, alpha=0.05, correction='fdr_bh')
+    np.testing.assert_allclose(corrected['p_adjusted'], bh_reference(P_VALUES))
+    assert corrected['significant'].tolist() == [p < 0.05 for p in bh_reference(P_VALUES)]
+    assert corrected.attrs == {'alpha': 0.05, 'correction': 'fdr_bh'}
+    report = json.loads(hypothesis_report(corrected, source='test'))
+    assert report['correction'] == 'fdr_bh' and report['tests'] == 8
+    assert report['significant'] == int(corrected['significant'].sum())
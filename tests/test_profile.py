@@ -0,0 +1,67 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+
+import survey_core
+from survey_core import DatasetProfile, load_profile, profile_path, ColumnarDataset, write_columnar
+
+
+def assert_profiles_equal(profile, restored):
+    assert restored.n_rows == profile.n_rows
+    pd.testing.assert_frame_equal(restored.summary, profile.summary, check_dtype=False)
+    assert restored.top_values.keys() == profile.top_values.keys()
+    for col, counts in profile.top_values.items():
+        pd.testing.assert_series_equal(restored.top_values[col], counts, check_index_type=False)
+    pd.testing.assert_frame_equal(restored.correlation, profile.correlation)
+
+
+def test_json_round_trip(survey_frame):
+    profile = DatasetProfile.build(survey_frame)
+    restored = DatasetProfile.from_json(profile.to_json())
+    assert_profiles_equal(profile, restored)
+    assert restored.variable_types() == profile.variable_types()
+    pd.testing.assert_frame_equal(restored.describe(), survey_frame[profile.correlation.columns].describe(),
+                                  check_exact=False, check_names=False)
+    pd.testing.assert_frame_equal(restored.summary_frame(), profile.summary_frame(), check_dtype=False)
+
+
+def test_profile_matches_data(survey_frame):
+    profile = DatasetProfile.build(survey_frame)
+    assert profile.shape == survey_frame.shape
+    pd.testing.assert_series_equal(profile.null_counts(), survey_frame.isnull().sum(), check_names=False)
+    counts = survey_frame['region'].value_counts()
+    pd.testing.assert_series_equal(profile.value_counts('region'), counts, check_names=False, check_index_type=False)
+    np.testing.assert_allclose(profile.correlation, survey_frame[profile.correlation.columns].corr(), atol=1e-9)
+
+
+def test_levels_over_threshold(monkeypatch):
+    monkeypatch.setattr(survey_core, 'PROFILE_FULL_LEVELS', 5)
+    monkeypatch.setattr(survey_core, 'PROFILE_TOP_K', 3)
+    df = pd.DataFrame({'few': list('aabbc') * 4, 'many': [f"level{k % 8}" for k in range(20)]})
+    profile = DatasetProfile.build(df)
+    assert len(profile.value_counts('few')) == 3 and profile.hidden_levels('few') == (0, 0)
+    assert len(profile.value_counts('many')) == 3
+    assert profile.hidden_levels('many') == (5, 20 - int(profile.value_counts('many').sum()))
+    restored = DatasetProfile.from_json(profile.to_json())
+    assert restored.hidden_levels('many') == profile.hidden_levels('many')
+
+
+def test_load_profile_is_stored(survey_frame, tmp_path):
+    path = str(tmp_path / 'survey.parquet')
+    write_columnar(survey_frame, path)
+    profile = load_profile(ColumnarDataset(path), 'abc')
+    with open(profile_path('abc'), encoding='utf-8') as f:
+        assert_profiles_equal(profile, DatasetProfile.from_json(f.read()))
+    assert_profiles_equal(profile, load_profile(None, 'abc'))
+
+
+def test_other_version_is_rebuilt(survey_frame):
+    profile = DatasetProfile.build(survey_frame)
+    document = json.loads(profile.to_json())
+    document['version'] = survey_core.PROFILE_VERSION - 1
+    with pytest.raises(ValueError):
+        DatasetProfile.from_json(json.dumps(document))
+    with open(profile_path('old'), 'w', encoding='utf-8') as f:
+        json.dump(document, f)
+    assert_profiles_equal(profile, load_profile(survey_frame, 'old'))
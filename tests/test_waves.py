@@ -0,0 +1,119 @@
+import pickle
+import numpy as np
+import pandas as pd
+import pytest
+
+import survey_core
+from survey_core import (
+    append_wave, load_wave_state, open_waves, build_wave_state, wave_state_path, incremental_pair_tests,
+    all_pairs_association, correlation_matrix, contingency_counts, encode_categories, DatasetProfile,
+    determine_variable_type
+)
+from conftest import make_survey
+
+
+def append_waves(name, waves):
+    state = None
+    for k, wave in enumerate(waves):
+        state = append_wave(name, wave, f"wave{k + 1}.csv", f"hash{k + 1}")
+    return state
+
+
+@pytest.fixture
+def waves():
+    df = make_survey(900, seed=7)
+    return [df.iloc[:250], df.iloc[250:600].reset_index(drop=True), df.iloc[600:].reset_index(drop=True)]
+
+
+def test_statistics_match_full_recompute(waves):
+    state = append_waves('survey', waves)
+    dataset = open_waves('survey', state)
+    full = dataset.read(dataset.columns)
+    assert state.n_rows == len(full) == 900
+    pd.testing.assert_frame_equal(full.astype(object), pd.concat(waves, ignore_index=True).astype(object),
+                                  check_exact=False, check_dtype=False)
+
+    profile, expected = state.profile(), DatasetProfile.build(full)
+    for col in ('count', 'missing'):
+        pd.testing.assert_series_equal(profile.summary[col], expected.summary[col], check_dtype=False)
+    np.testing.assert_allclose(profile.summary.loc[state.correlation_cols, ['mean', 'std', 'min', 'max']].astype(float),
+                               expected.summary.loc[state.correlation_cols, ['mean', 'std', 'min', 'max']].astype(float),
+                               rtol=1e-5)
+    for col in state.text_cols:
+        pd.testing.assert_series_equal(state.value_counts(col), expected.value_counts(col),
+                                       check_names=False, check_index_type=False, check_categorical=False)
+
+    corr, n = state.correlation_frames()
+    expected_corr, expected_n = correlation_matrix(full, state.correlation_cols)
+    np.testing.assert_allclose(corr, expected_corr, rtol=1e-9, atol=1e-12)
+    pd.testing.assert_frame_equal(n, expected_n)
+
+    codes1, n_levels1 = encode_categories(full['gender'])[0], full['gender'].nunique()
+    codes2, n_levels2 = encode_categories(full['region'])[0], full['region'].nunique()
+    table, _, _ = state.contingency_table('gender', 'region')
+    np.testing.assert_array_equal(table.toarray(), contingency_counts(codes1, n_levels1, codes2, n_levels2)[0].toarray())
+
+
+def test_pair_tests_match_full_recompute(waves):
+    state = append_waves('survey', waves)
+    dataset = open_waves('survey', state)
+    full = dataset.read(dataset.columns)
+    var_types = {col: determine_variable_type(full[col]) for col in full.columns}
+    incremental = incremental_pair_tests(state, dataset, dataset.columns, var_types=var_types, correction='holm')
+    expected = all_pairs_association(full, dataset.columns, var_types=var_types, correction='holm')
+    merged = incremental.merge(expected, on=['var1', 'var2'], suffixes=('', '_full'))
+    assert len(merged) == len(expected) == 15
+    assert (merged['analysis_type'] == merged['analysis_type_full']).all()
+    assert (merged['n'] == merged['n_full']).all()
+    for col in ('statistic', 'effect_size', 'p_value', 'p_adjusted'):
+        np.testing.assert_allclose(merged[col].astype(float), merged[f'{col}_full'].astype(float),
+                                   rtol=1e-7, atol=1e-12, err_msg=col)
+
+
+def test_duplicate_wave_is_refused(waves):
+    append_waves('survey', waves[:2])
+    with pytest.raises(ValueError, match="already stored"):
+        append_wave('survey', waves[0], 'again.csv', 'hash1')
+    state = load_wave_state('survey')
+    assert [wave['hash'] for wave in state.waves] == ['hash1', 'hash2'] and state.n_rows == 600
+
+
+def test_conflicting_wave_is_rejected(waves):
+    append_waves('survey', waves[:1])
+    for bad in (waves[1].assign(likert2='five'), waves[1].assign(gender=True), waves[1].drop(columns='region')):
+        with pytest.raises(ValueError):
+            append_wave('survey', bad, 'bad.csv', 'bad')
+    assert load_wave_state('survey').n_rows == 250
+
+
+def test_numeric_columns_widen(waves):
+    first = waves[0].assign(likert2=waves[0]['likert2'].astype('int64'), empty=None)
+    second = waves[1].assign(likert2=waves[1]['likert2'] * 100, income=waves[1]['income'].round(),
+                             empty=np.linspace(0, 1, len(waves[1])))
+    state = append_wave('survey', first, 'wave1.csv', 'hash1')
+    assert str(state.schema.field('likert2').type) == 'int8'
+    assert not state.numeric['empty']
+    state = append_wave('survey', second, 'wave2.csv', 'hash2')
+    assert str(state.schema.field('likert2').type) == 'int16'
+    assert state.numeric['empty'] and 'empty' in state.correlation_cols
+    dataset = open_waves('survey', state)
+    full = dataset.read(dataset.columns)
+    expected = pd.concat([first, second], ignore_index=True)
+    np.testing.assert_array_equal(full['likert2'], expected['likert2'])
+    np.testing.assert_allclose(full['empty'].to_numpy(dtype=float), expected['empty'].to_numpy(dtype=float))
+
+    rebuilt = build_wave_state('survey', state.waves, state.schema)
+    np.testing.assert_allclose(state.correlation_frames()[0], rebuilt.correlation_frames()[0], rtol=1e-12)
+    np.testing.assert_allclose(state.correlation_frames()[0], correlation_matrix(full, state.correlation_cols)[0],
+                               rtol=1e-9, atol=1e-12)
+
+
+def test_state_of_another_version_is_rebuilt(waves):
+    state = append_waves('survey', waves)
+    state.version = survey_core.WAVE_STATE_VERSION - 1
+    with open(wave_state_path('survey'), 'wb') as f:
+        pickle.dump(state, f)
+    rebuilt = load_wave_state('survey')
+    assert rebuilt.version == survey_core.WAVE_STATE_VERSION
+    assert rebuilt.n_rows == state.n_rows and rebuilt.waves == state.waves
+    np.testing.assert_allclose(rebuilt.correlation_frames()[0], state.correlation_frames()[0], rtol=1e-12)